@@ -1,16 +1,22 @@
-import httpx
+from typing import Any
+
 from aioinject import Injected
 from aioinject.ext.fastapi import inject
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from starlette import status
 
 from app.application.domain_info import DomainInfoService
-from app.db.models.domain_info import DomainInfo
+from app.application.scan_jobs import ScanJobService
+from app.core.enums import RefreshMode
+from app.db.models.scan_job import ScanJob
 from app.schemas.domain_info import (
     DomainInfoCreate,
-    DomainInfoRead,
+    DomainInfoFilters,
     DomainInfoResponse,
+    ImportBatchRead,
+    ImportResponse,
     RefreshResponse,
+    ScanJobRead,
 )
 
 router = APIRouter(
@@ -23,34 +29,82 @@ router = APIRouter(
 @inject
 async def get_domains_info(
     service: Injected[DomainInfoService],
+    filters: DomainInfoFilters = Depends(),
     limit: int = Query(25, ge=1, le=100),
     offset: int = Query(0, ge=0),
-) -> dict[str, int | None | list[DomainInfo]]:
-    total, items = await service.get_domains_info(limit=limit, offset=offset)
-    return {"total": total, "items": items}
+    cursor: str | None = Query(None),
+    include_total: bool = Query(True),
+) -> dict[str, Any]:
+    total, items = await service.get_domains_info(
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        filters=filters.model_dump(exclude_none=True),
+        include_total=include_total,
+    )
+    next_cursor = items[-1].domain_name if len(items) == limit else None
+    return {"total": total, "items": items, "next_cursor": next_cursor}
 
 
-@router.post("/", response_model=list[DomainInfoRead])
+@router.post(
+    "/",
+    response_model=ScanJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 @inject
 async def add_domain(
-    data: DomainInfoCreate, service: Injected[DomainInfoService]
-) -> list[DomainInfo]:
-    try:
-        return await service.add_domain(data.domain_name)
-    except HTTPException as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
-    except httpx.HTTPStatusError as exc:
-        status_code = exc.response.status_code
-        if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
-            detail = (
-                "External service is temporarily unavailable. Please try again later."
-            )
-        else:
-            detail = exc.response.json()
-        raise HTTPException(status_code=400, detail=detail)
-
-
-@router.post("/refresh", response_model=RefreshResponse)
+    data: DomainInfoCreate, service: Injected[ScanJobService]
+) -> ScanJob:
+    return await service.enqueue(data.domain_name)
+
+
+@router.post(
+    "/refresh", response_model=RefreshResponse, response_model_exclude_none=True
+)
 @inject
-async def refresh_domains_info(service: Injected[DomainInfoService]) -> dict[str, str]:
+async def refresh_domains_info(
+    service: Injected[DomainInfoService],
+    mode: RefreshMode = Query(RefreshMode.FULL),
+    cursor: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1, le=5000),
+) -> dict[str, Any]:
+    if mode == RefreshMode.INCREMENTAL:
+        return await service.refresh_stale_domains(cursor=cursor, limit=limit)
     return await service.refresh_domains_info()
+
+
+@router.get("/jobs/{job_id}", response_model=ScanJobRead)
+@inject
+async def get_scan_job(job_id: int, service: Injected[ScanJobService]) -> ScanJob:
+    job = await service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job
+
+
+@router.post(
+    "/import",
+    response_model=ImportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@inject
+async def import_domains(
+    request: Request, service: Injected[ScanJobService]
+) -> dict[str, Any]:
+    body = await request.body()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8")
+    return await service.import_domains(text.splitlines())
+
+
+@router.get("/imports/{batch_id}", response_model=ImportBatchRead)
+@inject
+async def get_import(
+    batch_id: str, service: Injected[ScanJobService]
+) -> dict[str, Any]:
+    batch = await service.get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return batch
@@ -1,8 +1,21 @@
+from typing import Any
+
+from aioinject import Injected
+from aioinject.ext.fastapi import inject
 from fastapi import APIRouter
 
+from app.infrastructure.dns_cache import DnsCache
+from app.schemas.utils import DnsCacheStats
+
 router = APIRouter(prefix="/utils", tags=["utils"])
 
 
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/dns-cache/", response_model=DnsCacheStats)
+@inject
+async def dns_cache_stats(cache: Injected[DnsCache]) -> dict[str, Any]:
+    return cache.stats()
@@ -0,0 +1,66 @@
+import re
+from collections import Counter
+
+from app.core.enums import CandidateDropReason
+from app.core.utils import normalize_domain
+
+LABEL_RE = re.compile(r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?")
+MAX_HOSTNAME_LENGTH = 253
+
+
+def to_hostname(raw: str) -> str | None:
+    """Normalized, IDNA-encoded form of ``raw``, or None if it is not a valid
+    hostname."""
+    name = normalize_domain(raw).rstrip(".")
+    if not name.isascii():
+        try:
+            name = name.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    if len(name) > MAX_HOSTNAME_LENGTH or not all(
+        LABEL_RE.fullmatch(label) for label in name.split(".")
+    ):
+        return None
+    return name
+
+
+class CandidateFilter:
+    """Turns raw CT-log names into unique hostnames under ``root``.
+
+    Names are normalized, ``*.`` wildcards are reduced to the name they cover,
+    unicode labels are IDNA-encoded, and names that are malformed, outside
+    ``root`` (label-boundary match) or already seen are dropped. ``dropped``
+    counts the dropped names per reason.
+    """
+
+    def __init__(self, root: str, dropped: Counter[str] | None = None) -> None:
+        self.root = root
+        self.seen = {root}
+        self.dropped: Counter[str] = dropped if dropped is not None else Counter()
+
+    def __call__(self, raw: str) -> str | None:
+        name = normalize_domain(raw).rstrip(".")
+        wildcard = name.startswith("*.")
+        if wildcard:
+            name = name[2:]
+
+        hostname = to_hostname(name)
+        if hostname is None:
+            reason = CandidateDropReason.INVALID
+        else:
+            check = self._check(hostname)
+            if check is None:
+                self.seen.add(hostname)
+                return hostname
+            reason = check
+        if reason == CandidateDropReason.DUPLICATE and wildcard:
+            reason = CandidateDropReason.WILDCARD
+        self.dropped[reason.value] += 1
+        return None
+
+    def _check(self, name: str) -> CandidateDropReason | None:
+        if name in self.seen:
+            return CandidateDropReason.DUPLICATE
+        if name != self.root and not name.endswith(f".{self.root}"):
+            return CandidateDropReason.OUT_OF_SCOPE
+        return None
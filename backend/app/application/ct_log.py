@@ -0,0 +1,89 @@
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from app.db.models.ct_log_cache import CtLogCache
+
+
+@dataclass
+class CtLogState:
+    """What is known about a root domain's CT-log entries between scans.
+
+    ``names`` are the pruned subdomains found so far. Certificates up to
+    ``max_certificate_id`` have been read completely, so only newer ones need
+    processing. ``stale`` is set when crt.sh failed and ``names`` were served
+    from the cache instead.
+    """
+
+    root_domain: str
+    names: list[str] = field(default_factory=list)
+    max_certificate_id: int = 0
+    last_entry_timestamp: str | None = None
+    fetched_at: datetime | None = None
+    stale: bool = False
+
+    @classmethod
+    def from_row(cls, row: CtLogCache) -> "CtLogState":
+        return cls(
+            root_domain=row.root_domain,
+            names=list(row.names),
+            max_certificate_id=row.max_certificate_id,
+            last_entry_timestamp=row.last_entry_timestamp,
+            fetched_at=row.fetched_at,
+        )
+
+    def update(self, other: "CtLogState") -> None:
+        """Take over what ``other`` found out about the same root."""
+        self.names = list(other.names)
+        self.max_certificate_id = other.max_certificate_id
+        self.last_entry_timestamp = other.last_entry_timestamp
+        self.fetched_at = other.fetched_at
+        self.stale = other.stale
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "root_domain": self.root_domain,
+            "names": self.names,
+            "max_certificate_id": self.max_certificate_id,
+            "last_entry_timestamp": self.last_entry_timestamp,
+            "fetched_at": self.fetched_at,
+        }
+
+
+class CtLogFeed:
+    """The names of one running crt.sh read of a root domain.
+
+    Every reader iterates all names from the start and then follows new ones
+    until the read is closed, so callers joining a running read see the same
+    names as the one that started it. ``dropped`` counts the pruned CT-log
+    names per reason.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.dropped: Counter[str] = Counter()
+        self.started = False
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def add(self, name: str) -> None:
+        self.names.append(name)
+        self._changed.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._changed.set()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        i = 0
+        while True:
+            while i < len(self.names):
+                yield self.names[i]
+                i += 1
+            if self.closed:
+                return
+            self._changed.clear()
+            await self._changed.wait()
@@ -1,129 +1,543 @@
 import asyncio
+import contextlib
 import logging
-import socket
+from collections import Counter
+from collections.abc import AsyncGenerator, Iterable
+from dataclasses import dataclass, field
+from datetime import timedelta
 from typing import Any
 
+import dns.exception
 import dns.resolver
-import tldextract
+import httpx
 from fastapi import HTTPException
 
+from app.application.candidates import CandidateFilter
+from app.application.ct_log import CtLogFeed, CtLogState
+from app.core import metrics
 from app.core.enums import DomainTypes
+from app.core.settings import ScanSettings
 from app.core.uow import SaSessionUnitOfWork
+from app.core.utils import gather_bounded, gather_or_cancel, utcnow
 from app.db.models.domain_info import DomainInfo
-from app.infrastructure.crt_sh_client import CrtShClient
+from app.db.writer import DbWriter
+from app.infrastructure.crt_sh_client import CertificateLimitReached, CrtShClient
+from app.infrastructure.dns_resolver import DnsResolver
+from app.infrastructure.domain_parser import DomainParser
 from app.infrastructure.ipinfo_client import IpInfoClient
 from app.infrastructure.ipwhois_client import IpWhoIsClient
+from app.infrastructure.single_flight import SingleFlight
 
 logger = logging.getLogger("app")
 
 
+@dataclass
+class ScanProgress:
+    discovered: int = 0
+    enriched: int = 0
+    failed: int = 0
+    dropped: Counter[str] = field(default_factory=Counter)
+
+
 class DomainInfoService:
     DNS_RECORD_TYPES = ["A", "AAAA", "MX", "NS", "CNAME", "SOA", "TXT"]
+    IP_INFO_FIELDS = (
+        "geo_city",
+        "geo_country",
+        "network_owner_name",
+        "is_active",
+        "is_anycast_node",
+    )
+    INACTIVE_FIELDS: dict[str, Any] = {
+        "ip_address": None,
+        "dns_settings": None,
+        "geo_city": None,
+        "geo_country": None,
+        "network_owner_name": None,
+        "is_active": False,
+        "is_anycast_node": False,
+    }
 
     def __init__(
         self,
         uow: SaSessionUnitOfWork,
+        writer: DbWriter,
         crt_sh_cl: CrtShClient,
         ip_who_is_cl: IpWhoIsClient,
         ip_info_cl: IpInfoClient,
+        dns_resolver: DnsResolver,
+        domain_parser: DomainParser,
+        scan_cfg: ScanSettings,
     ):
         self.uow = uow
+        self.writer = writer
         self.crt_sh_cl = crt_sh_cl
         self.ip_who_is_cl = ip_who_is_cl
         self.ip_info_cl = ip_info_cl
+        self.dns_resolver = dns_resolver
+        self.domain_parser = domain_parser
+        self.scan_cfg = scan_cfg
+        self._dns_settings: SingleFlight[str, dict[str, Any]] = SingleFlight()
+        self._ct_reads: SingleFlight[str, CtLogState] = SingleFlight()
+        self._ct_feeds: dict[str, CtLogFeed] = {}
+        self._scans: SingleFlight[str, None] = SingleFlight()
+        self._scan_progress: dict[str, ScanProgress] = {}
 
-    @staticmethod
-    async def resolve_ip(host: str) -> str:
-        return await asyncio.to_thread(socket.gethostbyname, host)
+    async def resolve_ip(self, host: str) -> str | None:
+        """Liveness probe: the first A, or else AAAA, address of ``host``;
+        None when the name does not exist or has no address."""
+        # Answers are cached, so get_dns_settings reuses these lookups.
+        for rdtype in ("A", "AAAA"):
+            try:
+                records = await self.dns_resolver.resolve(host, rdtype)
+            except dns.resolver.NXDOMAIN:
+                return None
+            except dns.resolver.NoAnswer:
+                continue
+            return records[0]
+        return None
 
-    @staticmethod
-    async def get_domain_type(domain: str) -> DomainTypes:
-        ext = await asyncio.to_thread(tldextract.extract, domain)
-        if ext.subdomain:
-            return DomainTypes.SUBDOMAIN
-        return DomainTypes.ROOT
+    def get_domain_type(self, domain: str) -> DomainTypes:
+        return self.domain_parser.domain_type(domain)
 
     async def get_dns_settings(self, domain: str) -> dict[str, Any]:
+        return await self._dns_settings.do(
+            domain, lambda: self._get_dns_settings(domain)
+        )
+
+    async def _get_dns_settings(self, domain: str) -> dict[str, Any]:
+        answers = await asyncio.gather(
+            *(self.dns_resolver.resolve(domain, r) for r in self.DNS_RECORD_TYPES),
+            return_exceptions=True,
+        )
         result = {}
 
-        for record in self.DNS_RECORD_TYPES:
-            try:
-                answers = await asyncio.to_thread(dns.resolver.resolve, domain, record)
-                r = [r.to_text() for r in answers]
-                if r:
-                    result[record] = r
-            except Exception as exc:
-                logger.error(f"Failed to resolve {record}: {exc}")
+        for record, answer in zip(self.DNS_RECORD_TYPES, answers, strict=True):
+            if isinstance(answer, Exception):
+                logger.error(f"Failed to resolve {record}: {answer}")
                 continue
+            if isinstance(answer, BaseException):
+                raise answer
+            if answer:
+                result[record] = answer
 
         return result
 
-    async def get_target_domains(self, domain: str) -> list[str]:
-        data = await self.crt_sh_cl.get_subdomains(domain)
-        subs = set()
-        for item in data:
-            name: str = item["name_value"]
-            for sub in name.split("\n"):
-                if sub.endswith(domain):
-                    subs.add(sub.lower())
-        subs.add(domain)
-        return list(subs)
+    async def iter_target_domains(
+        self,
+        domain: str,
+        dropped: Counter[str] | None = None,
+        ct_state: CtLogState | None = None,
+    ) -> AsyncGenerator[str]:
+        """``domain``, its cached names and then each new subdomain as crt.sh
+        streams it.
 
-    async def collect_domain_info(self, data: dict[str, Any]) -> dict[str, Any]:
-        ip_address = await self.resolve_ip(data["domain_name"])
+        Scans and refreshes of a root share one read of its CT log: callers
+        arriving while it runs get every name read so far and then follow the
+        rest. The read uses the ``ct_state`` of the caller that starts it, or
+        else loads the stored one, and saves it when done; the ``ct_state`` of
+        a caller that joined is updated to it. Names pruned by CandidateFilter
+        are counted per reason in ``dropped``.
+        """
+        feed = self._ct_feeds.get(domain)
+        if feed is None or (feed.started and domain not in self._ct_reads):
+            # No read is running, or only a cancelled one that is winding down.
+            feed = self._ct_feeds[domain] = CtLogFeed()
+        read = asyncio.ensure_future(
+            self._ct_reads.do(domain, lambda: self._read_ct_log(domain, feed, ct_state))
+        )
+        try:
+            yield domain
+            async for name in feed:
+                yield name
+            state = await read
+        finally:
+            if not read.done():
+                read.cancel()
+                await asyncio.wait([read])
+        if dropped is not None:
+            dropped.update(feed.dropped)
+        if ct_state is not None and state is not ct_state:
+            ct_state.update(state)
 
-        ip_info_data, ip_who_is_data, dns_settings, domain_type = await asyncio.gather(
-            self.ip_info_cl.get_ip_info(ip_address),
-            self.ip_who_is_cl.get_ip_info(ip_address),
-            self.get_dns_settings(data["domain_name"]),
-            self.get_domain_type(data["domain_name"]),
+    async def get_target_domains(
+        self, domain: str, ct_state: CtLogState | None = None
+    ) -> list[str]:
+        """All names of ``domain``; see iter_target_domains."""
+        return [name async for name in self.iter_target_domains(domain, None, ct_state)]
+
+    async def _read_ct_log(
+        self, domain: str, feed: CtLogFeed, ct_state: CtLogState | None
+    ) -> CtLogState:
+        feed.started = True
+        try:
+            if ct_state is None:
+                ct_state = (await self.load_ct_states([domain]))[domain]
+            await self._read_certificates(domain, feed, ct_state)
+            await self.save_ct_states([ct_state])
+            return ct_state
+        finally:
+            feed.close()
+            if self._ct_feeds.get(domain) is feed:
+                del self._ct_feeds[domain]
+
+    async def _read_certificates(
+        self, domain: str, feed: CtLogFeed, state: CtLogState
+    ) -> None:
+        """Add the names cached in ``state`` and then those of certificates
+        newer than ``state.max_certificate_id`` to ``feed``, updating ``state``
+        in place. If crt.sh fails and CT_CACHE_SERVE_STALE is set, the cached
+        names are all that is added."""
+        candidates = CandidateFilter(domain, feed.dropped)
+        for cached in list(state.names):
+            name = candidates(cached)
+            if name is not None:
+                feed.add(name)
+
+        max_id, last_entry = state.max_certificate_id, state.last_entry_timestamp
+        complete = False
+        try:
+            async for cert in self.crt_sh_cl.iter_certificates(
+                domain, after_id=state.max_certificate_id
+            ):
+                max_id = max(max_id, cert.id)
+                last_entry = max(last_entry or "", cert.entry_timestamp or "") or None
+                for raw in cert.names:
+                    name = candidates(raw)
+                    if name is not None:
+                        state.names.append(name)
+                        feed.add(name)
+            complete = True
+        except CertificateLimitReached:
+            pass  # keep what was read; the next scan reads everything again
+        except (httpx.HTTPError, ValueError) as exc:
+            if not (self.scan_cfg.CT_CACHE_SERVE_STALE and state.fetched_at):
+                raise
+            logger.warning(
+                "crt.sh failed, serving cached names",
+                extra={"domain": domain, "result": repr(exc)},
+            )
+            state.stale = True
+        if not state.stale:
+            state.fetched_at = utcnow()
+        # The response order is not guaranteed, so the high-water mark only
+        # moves once every certificate has been read.
+        if complete:
+            state.max_certificate_id = max_id
+            state.last_entry_timestamp = last_entry
+
+        if candidates.dropped:
+            logger.info(
+                "Pruned CT-log names",
+                extra={"domain": domain, "dropped": dict(candidates.dropped)},
+            )
+
+    async def load_ct_states(self, root_domains: list[str]) -> dict[str, CtLogState]:
+        async with self.uow:
+            rows = await self.uow.ct_log_cache.get_many(root_domains)
+        states = {row.root_domain: CtLogState.from_row(row) for row in rows}
+        return {root: states.get(root) or CtLogState(root) for root in root_domains}
+
+    async def save_ct_states(self, states: Iterable[CtLogState]) -> None:
+        rows = [
+            state.to_row() for state in states if state.fetched_at and not state.stale
+        ]
+        if rows:
+            async with self.uow:
+                await self.uow.ct_log_cache.upsert(rows)
+
+    async def resolve_domain(self, data: dict[str, Any]) -> dict[str, Any]:
+        with metrics.DOMAINS_IN_PROGRESS.track_inprogress():
+            return await self._resolve_domain(data)
+
+    async def _resolve_domain(self, data: dict[str, Any]) -> dict[str, Any]:
+        ip_address = await metrics.timed(
+            metrics.RESOLVE_IP_SECONDS, self.resolve_ip(data["domain_name"])
+        )
+        with metrics.DOMAIN_TYPE_SECONDS.time():
+            domain_type = self.get_domain_type(data["domain_name"])
+        if ip_address is None:
+            # Dead names skip the full DNS query set and the IP APIs.
+            return data | self.INACTIVE_FIELDS | {"domain_type": domain_type}
+
+        dns_settings = await metrics.timed(
+            metrics.DNS_SETTINGS_SECONDS, self.get_dns_settings(data["domain_name"])
         )
 
         data["domain_type"] = domain_type
         data["ip_address"] = ip_address
-        data["geo_city"] = ip_who_is_data.get("city", "")
-        data["geo_country"] = ip_who_is_data.get("country", "")
-        data["network_owner_name"] = ip_who_is_data.get("connection", {}).get("org", "")
-        data["is_active"] = ip_who_is_data.get("success", False)
-        data["is_anycast_node"] = ip_info_data.get("anycast", False)
         data["dns_settings"] = dns_settings
         return data
 
-    async def handle_domain_name(self, domain_name: str) -> list[DomainInfo]:
-        domains = await self.get_target_domains(domain_name)
-        tasks = [self.collect_domain_info({"domain_name": d}) for d in domains]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def fetch_ip_info(self, ip_address: str) -> dict[str, Any]:
+        ip_info_data, ip_who_is_data = await asyncio.gather(
+            metrics.timed(
+                metrics.IP_INFO_SECONDS, self.ip_info_cl.get_ip_info(ip_address)
+            ),
+            metrics.timed(
+                metrics.IP_WHOIS_SECONDS, self.ip_who_is_cl.get_ip_info(ip_address)
+            ),
+        )
+        return {
+            "ip_address": ip_address,
+            "geo_city": ip_who_is_data.get("city", ""),
+            "geo_country": ip_who_is_data.get("country", ""),
+            "network_owner_name": ip_who_is_data.get("connection", {}).get("org", ""),
+            "is_active": ip_who_is_data.get("success", False),
+            "is_anycast_node": ip_info_data.get("anycast", False),
+        }
 
-        valid_results: list[dict[str, Any]] = []
+    async def get_ips_info(
+        self, ip_addresses: Iterable[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Geo/ASN/anycast data per unique IP, served from the ip_info table
+        while fresh and fetched from the IP APIs once per IP otherwise."""
+        ips = set(ip_addresses)
+        since = utcnow() - timedelta(seconds=self.scan_cfg.IP_INFO_TTL)
+        async with self.uow:
+            cached = await self.uow.ip_info.get_fresh(ips, since=since)
+
+        result = {
+            row.ip_address: {
+                field: getattr(row, field) for field in self.IP_INFO_FIELDS
+            }
+            for row in cached
+        }
+        missing = list(ips - result.keys())
+        fetched = await gather_bounded(
+            (self.fetch_ip_info(ip) for ip in missing),
+            self.scan_cfg.MAX_CONCURRENT_DOMAINS,
+        )
+
+        new_rows: list[dict[str, Any]] = []
+        for ip, info in zip(missing, fetched, strict=True):
+            if isinstance(info, dict):
+                new_rows.append(info)
+                result[ip] = {field: info[field] for field in self.IP_INFO_FIELDS}
+            if isinstance(info, Exception):
+                logger.warning(
+                    "Failed to fetch ip info", extra={"ip": ip, "result": repr(info)}
+                )
 
-        for domain, result in zip(domains, results, strict=True):
+        if new_rows:
+            try:
+                await self.writer.run(lambda uow: uow.ip_info.upsert(new_rows))
+            except Exception as exc:
+                # The cache only saves API calls; the scan keeps the fetched data.
+                logger.warning(
+                    "Failed to cache ip info",
+                    extra={"size": len(new_rows), "result": repr(exc)},
+                )
+        return result
+
+    async def collect_domains_info(
+        self, items: list[dict[str, Any]], progress: ScanProgress | None = None
+    ) -> list[dict[str, Any]]:
+        progress = progress or ScanProgress()
+        results = await gather_bounded(
+            (self.resolve_domain(item) for item in items),
+            self.scan_cfg.MAX_CONCURRENT_DOMAINS,
+        )
+
+        resolved: list[dict[str, Any]] = []
+        for item, result in zip(items, results, strict=True):
             if isinstance(result, dict):
-                valid_results.append(result)
+                resolved.append(result)
             if isinstance(result, Exception):
+                progress.failed += 1
                 logger.warning(
                     "Failed to collect",
-                    extra={"domain": domain, "result": repr(result)},
+                    extra={"domain": item["domain_name"], "result": repr(result)},
                 )
-        async with self.uow:
-            return await self.uow.domain_info.bulk_insert(valid_results)
 
-    async def add_domain(self, domain_name: str) -> list[DomainInfo]:
+        return await self.add_ips_info(resolved, progress)
+
+    async def add_ips_info(
+        self, resolved: list[dict[str, Any]], progress: ScanProgress
+    ) -> list[dict[str, Any]]:
+        ips_info = await self.get_ips_info(
+            data["ip_address"] for data in resolved if data["ip_address"] is not None
+        )
+
+        valid_results: list[dict[str, Any]] = []
+        for data in resolved:
+            if data["ip_address"] is None:
+                progress.enriched += 1
+                valid_results.append(data)
+                continue
+            ip_info = ips_info.get(data["ip_address"])
+            if ip_info is None:
+                progress.failed += 1
+                logger.warning(
+                    "Failed to collect",
+                    extra={"domain": data["domain_name"], "result": "no ip info"},
+                )
+                continue
+            progress.enriched += 1
+            valid_results.append(data | ip_info)
+        return valid_results
+
+    async def handle_domain_name(
+        self, domain_name: str, progress: ScanProgress | None = None
+    ) -> None:
+        """Scan ``domain_name``, counting the outcome in ``progress``; a caller
+        arriving while the same root is already being scanned waits for that
+        scan and gets its counters instead of starting a second one. The scan
+        is cancelled once every caller waiting for it is."""
+        progress = progress or ScanProgress()
+        if domain_name not in self._scans:
+            self._scan_progress[domain_name] = progress
+        shared = self._scan_progress.get(domain_name, progress)
+        try:
+            await self._scans.do(
+                domain_name, lambda: self._run_shared_scan(domain_name, shared)
+            )
+        finally:
+            if shared is not progress:
+                progress.discovered = shared.discovered
+                progress.enriched = shared.enriched
+                progress.failed = shared.failed
+                progress.dropped.update(shared.dropped)
+
+    async def _run_shared_scan(self, domain_name: str, progress: ScanProgress) -> None:
+        # The counters live as long as the scan, not as its first caller.
+        try:
+            await self._scan_domain_name(domain_name, progress)
+        finally:
+            if self._scan_progress.get(domain_name) is progress:
+                del self._scan_progress[domain_name]
+
+    async def _scan_domain_name(self, domain_name: str, progress: ScanProgress) -> None:
+        """Scan ``domain_name`` as a pipeline: names discovered on crt.sh are
+        resolved by MAX_CONCURRENT_DOMAINS workers right away, resolved rows
+        are grouped into batches of UPSERT_BATCH_SIZE, or fewer once
+        WRITE_FLUSH_INTERVAL passes, and up to MAX_CONCURRENT_BATCHES batches
+        are enriched with IP info and stored at a time.
+
+        Every queue between the stages is bounded, so a slow stage holds back
+        the ones before it, and stored rows are only counted.
+        """
+        with metrics.SCANS_IN_PROGRESS.track_inprogress():
+            await self._run_scan_pipeline(domain_name, progress)
+
+    async def _run_scan_pipeline(
+        self, domain_name: str, progress: ScanProgress
+    ) -> None:
+        workers = self.scan_cfg.MAX_CONCURRENT_DOMAINS
+        enrichers = self.scan_cfg.MAX_CONCURRENT_BATCHES
+        names: asyncio.Queue[str | None] = asyncio.Queue(
+            maxsize=self.scan_cfg.UPSERT_BATCH_SIZE
+        )
+        resolved: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(
+            maxsize=self.scan_cfg.UPSERT_BATCH_SIZE
+        )
+        batches: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(
+            maxsize=enrichers
+        )
+
+        async def discover() -> None:
+            async with contextlib.aclosing(
+                self.iter_target_domains(domain_name, progress.dropped)
+            ) as discovered:
+                async for name in discovered:
+                    progress.discovered += 1
+                    await names.put(name)
+            for _ in range(workers):
+                await names.put(None)
+
+        async def resolve() -> None:
+            while (name := await names.get()) is not None:
+                try:
+                    data = await self.resolve_domain(
+                        {"domain_name": name, "root_domain": domain_name}
+                    )
+                except Exception as exc:
+                    progress.failed += 1
+                    logger.warning(
+                        "Failed to collect",
+                        extra={"domain": name, "result": repr(exc)},
+                    )
+                    continue
+                await resolved.put(data)
+
+        async def resolve_all() -> None:
+            await asyncio.gather(*(resolve() for _ in range(workers)))
+            await resolved.put(None)
+
+        async def collect_batches() -> None:
+            batch: list[dict[str, Any]] = []
+            while True:
+                timeout = self.scan_cfg.WRITE_FLUSH_INTERVAL if batch else None
+                try:
+                    row = await asyncio.wait_for(resolved.get(), timeout)
+                except TimeoutError:
+                    await batches.put(batch)
+                    batch = []
+                    continue
+                if row is None:
+                    break
+                batch.append(row)
+                if len(batch) >= self.scan_cfg.UPSERT_BATCH_SIZE:
+                    await batches.put(batch)
+                    batch = []
+            if batch:
+                await batches.put(batch)
+            for _ in range(enrichers):
+                await batches.put(None)
+
+        async def enrich() -> None:
+            while (batch := await batches.get()) is not None:
+                rows = await self.add_ips_info(batch, progress)
+                if rows:
+                    await self._store(rows)
+
+        await gather_or_cancel(
+            discover(),
+            resolve_all(),
+            collect_batches(),
+            *(enrich() for _ in range(enrichers)),
+        )
+
+    async def ensure_domain_resolves(self, domain_name: str) -> None:
+        """Reject names without an address, waiting at most
+        SCAN_VALIDATION_TIMEOUT seconds for the (cached) lookup."""
+        try:
+            async with asyncio.timeout(self.scan_cfg.VALIDATION_TIMEOUT):
+                ip_address = await self.resolve_ip(domain_name)
+        except (TimeoutError, dns.exception.Timeout):
+            raise HTTPException(status_code=400, detail="Domain name lookup timed out")
+        except dns.exception.DNSException:
+            ip_address = None
+        if ip_address is None:
+            raise HTTPException(status_code=400, detail="Domain name not found")
+
+    async def validate_new_domain(self, domain_name: str) -> None:
+        await self.ensure_domain_resolves(domain_name)
+        await self.ensure_new_domain(domain_name)
+
+    async def ensure_new_domain(self, domain_name: str) -> None:
         async with self.uow:
             existing = await self.uow.domain_info.get_by_domain_name(domain_name)
             if existing is not None:
                 raise HTTPException(
                     status_code=400, detail="Domain name already exists"
                 )
-        return await self.handle_domain_name(domain_name)
 
     async def get_domains_info(
         self,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: str | None = None,
+        filters: dict[str, Any] | None = None,
+        include_total: bool = True,
     ) -> tuple[int | None, list[DomainInfo]]:
         async with self.uow:
             return await self.uow.domain_info.get_domains_info(
-                limit=limit, offset=offset
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                filters=filters,
+                include_total=include_total,
             )
 
     async def refresh_domains_info(self) -> dict[str, str]:
@@ -131,44 +545,69 @@ class DomainInfoService:
             root_domains = await self.uow.domain_info.get_root_domain_names()
             if not root_domains:
                 return {"status": "ok"}
-        root_domains_results = await asyncio.gather(
-            *(self.get_target_domains(d) for d in root_domains),
-            return_exceptions=True,
+        ct_states = await self.load_ct_states(root_domains)
+        root_domains_results = await gather_bounded(
+            (self.get_target_domains(d, ct_states[d]) for d in root_domains),
+            self.scan_cfg.MAX_CONCURRENT_DOMAINS,
         )
 
-        domains_to_update: set[str] = set()
+        # Domain name -> root it was discovered under; the most specific root wins.
+        domains_to_update: dict[str, str] = {}
 
-        for res in root_domains_results:
+        for root, res in sorted(
+            zip(root_domains, root_domains_results, strict=True),
+            key=lambda pair: len(pair[0]),
+        ):
             if isinstance(res, list):
-                domains_to_update.update(res)
+                domains_to_update.update(dict.fromkeys(res, root))
 
         if not domains_to_update:
             return {"status": "ok"}
 
-        async with self.uow:
-            rows = await self.uow.domain_info.get_domain_names()
-        domains: dict[str, int] = {domain: id_ for id_, domain in rows}
-        tasks = [
-            self.collect_domain_info({"domain_name": d, "id": domains.get(d)})
-            for d in domains_to_update
-        ]
+        await self._refresh_domains(
+            [
+                {"domain_name": d, "root_domain": root}
+                for d, root in domains_to_update.items()
+            ]
+        )
+        return {"status": "ok"}
+
+    async def refresh_stale_domains(
+        self, cursor: int | None = None, limit: int | None = None
+    ) -> dict[str, Any]:
+        """Re-enrich one batch of domains whose DNS data is older than
+        SCAN_DNS_REFRESH_INTERVAL, in id order starting after ``cursor``.
 
-        results: list[dict[str, Any] | BaseException] = await asyncio.gather(
-            *tasks, return_exceptions=True
+        Geo data is refreshed per IP once older than SCAN_IP_INFO_TTL, so the
+        cost is proportional to what is stale. Pass ``next_cursor`` back to
+        process the following batch.
+        """
+        limit = limit or self.scan_cfg.REFRESH_BATCH_SIZE
+        updated_before = utcnow() - timedelta(
+            seconds=self.scan_cfg.DNS_REFRESH_INTERVAL
         )
+        async with self.uow:
+            rows = await self.uow.domain_info.get_stale_domain_names(
+                updated_before=updated_before, after_id=cursor, limit=limit
+            )
 
-        valid_results: list[dict[str, Any]] = []
+        await self._refresh_domains([{"domain_name": domain} for _, domain in rows])
+        return {
+            "status": "ok",
+            "processed": len(rows),
+            "next_cursor": rows[-1][0] if len(rows) == limit else None,
+        }
 
-        for domain, result in zip(domains_to_update, results, strict=True):
-            if isinstance(result, dict):
-                valid_results.append(result)
-            if isinstance(result, Exception):
-                logger.warning(
-                    "Failed to refresh domain",
-                    extra={"domain": domain, "result": repr(result)},
-                )
+    async def _refresh_domains(self, items: list[dict[str, Any]]) -> None:
+        valid_results = await self.collect_domains_info(items)
+        if not valid_results:
+            return
+        # upsert bumps updated_at even when nothing changed, so the row is not due again.
+        await self._store(valid_results)
 
-        if valid_results:
-            async with self.uow:
-                await self.uow.domain_info.update_domains_info(data=valid_results)
-        return {"status": "ok"}
+    async def _store(self, rows: list[dict[str, Any]]) -> None:
+        await self.writer.run(
+            lambda uow: uow.domain_info.upsert(
+                rows, batch_size=self.scan_cfg.UPSERT_BATCH_SIZE
+            )
+        )
@@ -0,0 +1,39 @@
+import csv
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from app.application.candidates import to_hostname
+
+HEADER_NAMES = {"domain", "domain_name", "domain name"}
+
+
+@dataclass
+class DomainList:
+    names: list[str] = field(default_factory=list)
+    invalid: int = 0
+    duplicate: int = 0
+
+
+def parse_domain_list(lines: Iterable[str]) -> DomainList:
+    """Reads root domains from CSV or plain text, one per line.
+
+    Only the first column is used; blank lines, ``#`` comments and a header
+    row are skipped. Names are normalized and deduplicated in input order.
+    """
+    result = DomainList()
+    seen: set[str] = set()
+    for row_number, row in enumerate(csv.reader(lines)):
+        value = row[0].strip() if row else ""
+        if not value or value.startswith("#"):
+            continue
+        if row_number == 0 and value.lower() in HEADER_NAMES:
+            continue
+        name = to_hostname(value)
+        if name is None:
+            result.invalid += 1
+        elif name in seen:
+            result.duplicate += 1
+        else:
+            seen.add(name)
+            result.names.append(name)
+    return result
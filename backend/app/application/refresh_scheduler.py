@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+import zlib
+
+from app.application.scan_jobs import ScanJobService
+from app.core.settings import ScanSettings
+from app.core.uow import SaSessionUnitOfWork
+
+logger = logging.getLogger("app")
+
+
+def shard_of(domain_name: str, shards: int) -> int:
+    return zlib.crc32(domain_name.encode()) % shards
+
+
+class RefreshScheduler:
+    """Rescans every root domain once per SCAN_REFRESH_PERIOD.
+
+    Roots are split into SCAN_REFRESH_SHARDS shards by a stable hash and the
+    period into as many time slots. At the start of each slot, delayed by a
+    random jitter, the slot's shard is queued as a batch of scan jobs, so
+    upstream and database load is spread over the whole period. A slot is
+    queued at most once, also with several schedulers on the same database:
+    its jobs are inserted in the transaction that claims its refresh_slot row.
+    """
+
+    def __init__(
+        self,
+        uow: SaSessionUnitOfWork,
+        scan_jobs: ScanJobService,
+        scan_cfg: ScanSettings,
+    ) -> None:
+        self.uow = uow
+        self.scan_jobs = scan_jobs
+        self.scan_cfg = scan_cfg
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def slot_length(self) -> float:
+        return self.scan_cfg.REFRESH_PERIOD / self.scan_cfg.REFRESH_SHARDS
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="refresh-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def refresh_slot(self, slot: int) -> int:
+        """Queues the roots of the shard that belongs to ``slot`` (a slot
+        number counted from the epoch) and returns how many jobs were added."""
+        shard = slot % self.scan_cfg.REFRESH_SHARDS
+        batch_id = f"refresh-{slot}"
+        async with self.uow:
+            # Cheap early exit; the claim in enqueue_many is what is atomic.
+            if await self.uow.scan_job.batch_exists(batch_id):
+                return 0
+            roots = await self.uow.domain_info.get_root_domain_names()
+        names = [
+            name
+            for name in roots
+            if shard_of(name, self.scan_cfg.REFRESH_SHARDS) == shard
+        ]
+        job_ids = await self.scan_jobs.enqueue_many(names, batch_id, slot=slot)
+        logger.info(
+            "Scheduled refresh",
+            extra={"batch_id": batch_id, "shard": shard, "jobs": len(job_ids)},
+        )
+        return len(job_ids)
+
+    async def _run(self) -> None:
+        while True:
+            slot = int(time.time() // self.slot_length)
+            try:
+                await self.refresh_slot(slot)
+            except Exception:
+                logger.exception("Scheduled refresh failed", extra={"slot": slot})
+            jitter = random.uniform(0, self.scan_cfg.REFRESH_JITTER * self.slot_length)
+            next_start = (slot + 1) * self.slot_length + jitter
+            await asyncio.sleep(max(0.0, next_start - time.time()))
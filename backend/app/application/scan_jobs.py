@@ -0,0 +1,239 @@
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.application.domain_info import DomainInfoService, ScanProgress
+from app.application.imports import parse_domain_list
+from app.core.enums import ScanJobStatus
+from app.core.settings import ScanSettings
+from app.core.uow import SaSessionUnitOfWork
+from app.core.utils import utcnow
+from app.db.models.scan_job import ScanJob
+
+logger = logging.getLogger("app")
+
+
+class ScanJobService:
+    """Runs DomainInfoService.handle_domain_name for queued scan jobs.
+
+    Jobs are queued in the scan_job table. Workers claim them with a lease
+    that is renewed with every progress report, so any number of worker
+    processes can share the queue and jobs of a crashed worker are picked up
+    again once its lease expires.
+    """
+
+    def __init__(
+        self,
+        uow: SaSessionUnitOfWork,
+        domain_info_service: DomainInfoService,
+        scan_cfg: ScanSettings,
+    ) -> None:
+        self.uow = uow
+        self.domain_info_service = domain_info_service
+        self.scan_cfg = scan_cfg
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(
+                self._worker(f"{self.worker_id}:{i}"), name=f"scan-worker-{i}"
+            )
+            for i in range(self.scan_cfg.JOB_WORKERS)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, domain_name: str) -> ScanJob:
+        """Queues a scan of ``domain_name``, or returns its pending or running
+        job if there is one."""
+        async with self.uow:
+            job = await self.uow.scan_job.get_unfinished(domain_name)
+        if job is not None:
+            return job
+        await self.domain_info_service.validate_new_domain(domain_name)
+        async with self.uow:
+            job = await self.uow.scan_job.create(domain_name)
+        self._wakeup.set()
+        return job
+
+    async def import_domains(self, lines: Iterable[str]) -> dict[str, Any]:
+        """Queues one scan job per new root domain in ``lines``.
+
+        Names already stored in domain_info or with a pending or running job
+        are skipped, one query each; the jobs share a batch id and run on the
+        same worker pool as individually queued scans.
+        """
+        domains = parse_domain_list(lines)
+        if len(domains.names) > self.scan_cfg.IMPORT_MAX_DOMAINS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {self.scan_cfg.IMPORT_MAX_DOMAINS} domain names can be imported at once",
+            )
+
+        batch_id = uuid.uuid4().hex
+        async with self.uow:
+            existing = await self.uow.domain_info.get_existing_names(domains.names)
+            candidates = [name for name in domains.names if name not in existing]
+            busy = await self.uow.scan_job.get_unfinished_domain_names(candidates)
+            new_names = [name for name in candidates if name not in busy]
+            job_ids = await self.uow.scan_job.create_many(new_names, batch_id)
+        if job_ids:
+            self._wakeup.set()
+        logger.info(
+            "Domain import queued", extra={"batch_id": batch_id, "jobs": len(job_ids)}
+        )
+        return {
+            "batch_id": batch_id if job_ids else None,
+            "queued": len(job_ids),
+            "existing": len(existing),
+            "already_queued": len(busy),
+            "invalid": domains.invalid,
+            "duplicate": domains.duplicate,
+        }
+
+    async def enqueue_many(
+        self, domain_names: list[str], batch_id: str, slot: int | None = None
+    ) -> list[int]:
+        """Queues jobs under ``batch_id`` for the names that have no pending or
+        running job yet.
+
+        With ``slot`` the refresh slot is claimed in the same transaction, and
+        nothing is queued if it was claimed before. Claiming a slot deletes the
+        markers of slots more than one SCAN_REFRESH_PERIOD older.
+        """
+        async with self.uow:
+            if slot is not None:
+                if not await self.uow.refresh_slot.claim(slot):
+                    return []
+                await self.uow.refresh_slot.delete_before(
+                    slot - self.scan_cfg.REFRESH_SHARDS
+                )
+            busy = await self.uow.scan_job.get_unfinished_domain_names(domain_names)
+            job_ids = await self.uow.scan_job.create_many(
+                [name for name in domain_names if name not in busy], batch_id
+            )
+        if job_ids:
+            self._wakeup.set()
+        return job_ids
+
+    async def get_batch(self, batch_id: str) -> dict[str, Any] | None:
+        async with self.uow:
+            return await self.uow.scan_job.get_batch_summary(batch_id)
+
+    async def get_job(self, job_id: int) -> ScanJob | None:
+        async with self.uow:
+            return await self.uow.scan_job.get(job_id)
+
+    async def _worker(self, worker_id: str) -> None:
+        while True:
+            try:
+                async with self.uow:
+                    job = await self.uow.scan_job.claim_next(
+                        worker_id, self.scan_cfg.JOB_LEASE_TIMEOUT
+                    )
+            except Exception:
+                logger.exception("Claiming a scan job failed")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), self.scan_cfg.JOB_POLL_INTERVAL
+                    )
+                continue
+            try:
+                await self.run_job(job, worker_id)
+            except Exception:
+                logger.exception("Scan job crashed", extra={"job_id": job.id})
+
+    async def run_job(self, job: ScanJob, worker_id: str) -> None:
+        progress = ScanProgress()
+        error: str | None = None
+        reporter = asyncio.create_task(
+            self._report_progress(self._new_uow(), job.id, worker_id, progress)
+        )
+        try:
+            await self.domain_info_service.handle_domain_name(job.domain_name, progress)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back to the queue right away instead
+            # of waiting for the lease to expire.
+            async with self.uow:
+                await self.uow.scan_job.update_job(
+                    job.id,
+                    owner=worker_id,
+                    status=ScanJobStatus.PENDING,
+                    locked_by=None,
+                    lease_expires_at=None,
+                )
+            raise
+        except Exception as exc:
+            logger.warning(
+                "Scan job failed", extra={"job_id": job.id, "result": repr(exc)}
+            )
+            status, error = ScanJobStatus.FAILED, repr(exc)
+        else:
+            status = ScanJobStatus.DONE
+        finally:
+            reporter.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reporter
+
+        async with self.uow:
+            await self.uow.scan_job.update_job(
+                job.id,
+                owner=worker_id,
+                status=status,
+                error=error,
+                finished_at=utcnow(),
+                locked_by=None,
+                lease_expires_at=None,
+                discovered=progress.discovered,
+                enriched=progress.enriched,
+                failed=progress.failed,
+                dropped=dict(progress.dropped),
+            )
+
+    def _new_uow(self) -> SaSessionUnitOfWork:
+        """A unit of work of its own for a task running next to the scan, so
+        its sessions never mix with the ones the scan opens."""
+        return SaSessionUnitOfWork(self.uow.session_factory)
+
+    async def _report_progress(
+        self,
+        uow: SaSessionUnitOfWork,
+        job_id: int,
+        worker_id: str,
+        progress: ScanProgress,
+    ) -> None:
+        lease = timedelta(seconds=self.scan_cfg.JOB_LEASE_TIMEOUT)
+        while True:
+            await asyncio.sleep(self.scan_cfg.JOB_PROGRESS_INTERVAL)
+            async with uow:
+                renewed = await uow.scan_job.update_job(
+                    job_id,
+                    owner=worker_id,
+                    lease_expires_at=utcnow() + lease,
+                    discovered=progress.discovered,
+                    enriched=progress.enriched,
+                    failed=progress.failed,
+                    dropped=dict(progress.dropped),
+                )
+            if not renewed:
+                logger.warning(
+                    "Scan job lease lost", extra={"job_id": job_id, "worker": worker_id}
+                )
+                return
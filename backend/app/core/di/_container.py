@@ -2,18 +2,26 @@ import aioinject
 from aioinject.ext.fastapi import FastAPIExtension
 
 from app.application.domain_info import DomainInfoService
+from app.application.refresh_scheduler import RefreshScheduler
+from app.application.scan_jobs import ScanJobService
 from app.core import settings
 from app.core.server import new_server
 from app.db.providers import (
+    create_db_writer,
     create_engine,
     create_session,
     make_async_sessionmaker,
     sa_session_uow,
 )
 from app.db.repositories.domain_info import DomainInfoRepository
-from app.infrastructure.crt_sh_client import CrtShClient
-from app.infrastructure.ipinfo_client import IpInfoClient
-from app.infrastructure.ipwhois_client import IpWhoIsClient
+from app.infrastructure.dns_cache import DnsCache
+from app.infrastructure.dns_resolver import DnsResolver
+from app.infrastructure.domain_parser import DomainParser
+from app.infrastructure.providers import (
+    create_crt_sh_client,
+    create_ip_info_client,
+    create_ip_who_is_client,
+)
 
 
 def new_container() -> aioinject.Container:
@@ -24,13 +32,22 @@ def new_container() -> aioinject.Container:
         aioinject.Singleton(settings.CrtShClientSettings.new),
         aioinject.Singleton(settings.IpWhoIsClientSettings.new),
         aioinject.Singleton(settings.IpInfoClientSettings.new),
-        aioinject.Singleton(CrtShClient),
-        aioinject.Singleton(IpWhoIsClient),
-        aioinject.Singleton(IpInfoClient),
+        aioinject.Singleton(settings.DnsResolverSettings.new),
+        aioinject.Singleton(settings.DomainParserSettings.new),
+        aioinject.Singleton(settings.ScanSettings.new),
+        aioinject.Singleton(create_crt_sh_client),
+        aioinject.Singleton(create_ip_who_is_client),
+        aioinject.Singleton(create_ip_info_client),
+        aioinject.Singleton(DnsCache),
+        aioinject.Singleton(DnsResolver),
+        aioinject.Singleton(DomainParser),
         aioinject.Singleton(DomainInfoService),
+        aioinject.Singleton(ScanJobService),
+        aioinject.Singleton(RefreshScheduler),
         aioinject.Singleton(DomainInfoRepository),
         aioinject.Singleton(create_engine),
         aioinject.Singleton(make_async_sessionmaker),
+        aioinject.Singleton(create_db_writer),
         aioinject.Singleton(new_server),
         aioinject.Scoped(create_session),
         aioinject.Scoped(sa_session_uow),
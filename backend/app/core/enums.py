@@ -4,3 +4,22 @@ from enum import Enum
 class DomainTypes(str, Enum):
     ROOT = "root"
     SUBDOMAIN = "subdomain"
+
+
+class ScanJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class RefreshMode(str, Enum):
+    FULL = "full"
+    INCREMENTAL = "incremental"
+
+
+class CandidateDropReason(str, Enum):
+    INVALID = "invalid"
+    OUT_OF_SCOPE = "out_of_scope"
+    WILDCARD = "wildcard"
+    DUPLICATE = "duplicate"
@@ -0,0 +1,65 @@
+"""Prometheus metrics of the API and the scan pipeline.
+
+Everything is registered in the default prometheus_client registry and served
+on ``/metrics``. Label values known up front are bound here once, so the hot
+path only pays for the observation itself.
+"""
+
+from collections.abc import Awaitable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+SCAN_STAGE_SECONDS = Histogram(
+    "scan_stage_duration_seconds",
+    "Duration of one enrichment stage for a single domain or IP.",
+    ["stage"],
+)
+RESOLVE_IP_SECONDS = SCAN_STAGE_SECONDS.labels("resolve_ip")
+DNS_SETTINGS_SECONDS = SCAN_STAGE_SECONDS.labels("dns_settings")
+DOMAIN_TYPE_SECONDS = SCAN_STAGE_SECONDS.labels("domain_type")
+IP_INFO_SECONDS = SCAN_STAGE_SECONDS.labels("ipinfo")
+IP_WHOIS_SECONDS = SCAN_STAGE_SECONDS.labels("ipwhois")
+
+SCANS_IN_PROGRESS = Gauge("scans_in_progress", "Root domain scans running.")
+DOMAINS_IN_PROGRESS = Gauge(
+    "scan_domains_in_progress", "Domains being resolved by scan workers."
+)
+
+DNS_QUERY_SECONDS = Histogram(
+    "dns_query_duration_seconds",
+    "Duration of DNS queries sent upstream (cache misses), per record type.",
+    ["rdtype"],
+)
+DNS_QUERIES_IN_PROGRESS = Gauge(
+    "dns_queries_in_progress", "DNS queries waiting for an upstream answer."
+)
+
+UPSTREAM_RESPONSES = Counter(
+    "upstream_responses_total",
+    "Responses of external APIs per client and HTTP status "
+    '("error" when no response arrived).',
+    ["client", "status"],
+)
+UPSTREAM_REQUESTS_IN_PROGRESS = Gauge(
+    "upstream_requests_in_progress",
+    "Requests to external APIs holding a concurrency slot.",
+    ["client"],
+)
+
+DB_FLUSH_SECONDS = Histogram(
+    "db_flush_duration_seconds",
+    "Duration of one batched upsert statement.",
+    ["table"],
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency per route template.",
+    ["method", "route", "status"],
+)
+
+
+async def timed[T](histogram: Histogram, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable`` and observe its duration in ``histogram``."""
+    with histogram.time():
+        return await awaitable
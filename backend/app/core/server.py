@@ -8,6 +8,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
 from app.adapters.api.main import api_router
+from app.adapters.api.middleware import MetricsMiddleware
+from app.adapters.api.routes.metrics import router as metrics_router
+from app.application.refresh_scheduler import RefreshScheduler
+from app.application.scan_jobs import ScanJobService
 from app.core import di, settings
 
 logger = logging.getLogger("app")
@@ -16,7 +20,22 @@ logger = logging.getLogger("app")
 @contextlib.asynccontextmanager
 async def lifespan(_: fastapi.FastAPI) -> AsyncIterator[None]:
     logger.info("Application is starting...")
-    yield
+    # Closing the container disposes the singletons: the HTTP clients, the
+    # DB writer and the engines.
+    async with di.container:
+        async with di.container.context() as ctx:
+            scan_jobs = await ctx.resolve(ScanJobService)
+            scheduler = await ctx.resolve(RefreshScheduler)
+            scan_cfg = await ctx.resolve(settings.ScanSettings)
+        if scan_cfg.EMBEDDED_WORKERS:
+            await scan_jobs.start()
+        if scan_cfg.REFRESH_SCHEDULER:
+            await scheduler.start()
+        try:
+            yield
+        finally:
+            await scheduler.stop()
+            await scan_jobs.stop()
     logger.info("Application has stopped")
 
 
@@ -32,6 +51,7 @@ def new_server(
     )
 
     app.add_middleware(AioInjectMiddleware, container=di.container)
+    app.add_middleware(MetricsMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -42,6 +62,7 @@ def new_server(
         allow_headers=["*"],
     )
     app.include_router(api_router)
+    app.include_router(metrics_router)
     if not app_cfg.DEVELOP:
         app.mount("/", StaticFiles(directory="static", html=True), name="frontend")
     return app
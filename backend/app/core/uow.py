@@ -1,3 +1,5 @@
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
 from typing import Any, Self, TypeVar
 
 from sqlalchemy.ext.asyncio import (
@@ -6,34 +8,113 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 
+from app.db.repositories.ct_log_cache import CtLogCacheRepository
 from app.db.repositories.domain_info import DomainInfoRepository
+from app.db.repositories.ip_info import IpInfoRepository
+from app.db.repositories.refresh_slot import RefreshSlotRepository
+from app.db.repositories.scan_job import ScanJobRepository
 
 TExc = TypeVar("TExc", bound=BaseException)
 
 
-class SaSessionUnitOfWork:
+@dataclass(slots=True)
+class _Unit:
+    """Session, transaction and repositories of one ``async with`` block."""
+
     session: AsyncSession
-    session_factory: async_sessionmaker[AsyncSession]
     transaction: AsyncSessionTransaction
     domain_info: DomainInfoRepository
+    ip_info: IpInfoRepository
+    scan_job: ScanJobRepository
+    ct_log_cache: CtLogCacheRepository
+    refresh_slot: RefreshSlotRepository
+    token: Token["_Unit | None"] | None = None
+
+
+class SaSessionUnitOfWork:
+    """Opens a session and a transaction per ``async with`` block.
+
+    The open unit lives in a context variable rather than on the instance, so
+    one instance can be shared (the services are singletons): concurrent tasks
+    each see the session they opened, and a nested block restores the outer one
+    when it exits.
+    """
+
+    session_factory: async_sessionmaker[AsyncSession]
 
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
         self.session_factory = session_factory
+        self._current: ContextVar[_Unit | None] = ContextVar(
+            f"uow_{id(self)}", default=None
+        )
+
+    @property
+    def _unit(self) -> _Unit:
+        unit = self._current.get()
+        if unit is None:
+            raise RuntimeError("Unit of work used outside of 'async with'")
+        return unit
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._unit.session
+
+    @property
+    def transaction(self) -> AsyncSessionTransaction:
+        return self._unit.transaction
+
+    @property
+    def domain_info(self) -> DomainInfoRepository:
+        return self._unit.domain_info
+
+    @property
+    def ip_info(self) -> IpInfoRepository:
+        return self._unit.ip_info
+
+    @property
+    def scan_job(self) -> ScanJobRepository:
+        return self._unit.scan_job
+
+    @property
+    def ct_log_cache(self) -> CtLogCacheRepository:
+        return self._unit.ct_log_cache
+
+    @property
+    def refresh_slot(self) -> RefreshSlotRepository:
+        return self._unit.refresh_slot
 
     async def __aenter__(self) -> Self:
-        self.session = self.session_factory()
-        self.domain_info = DomainInfoRepository(self.session)
-        self.transaction: AsyncSessionTransaction = await self.session.begin()
+        session = self.session_factory()
+        try:
+            transaction = await session.begin()
+        except BaseException:
+            await session.close()
+            raise
+        unit = _Unit(
+            session=session,
+            transaction=transaction,
+            domain_info=DomainInfoRepository(session),
+            ip_info=IpInfoRepository(session),
+            scan_job=ScanJobRepository(session),
+            ct_log_cache=CtLogCacheRepository(session),
+            refresh_slot=RefreshSlotRepository(session),
+        )
+        unit.token = self._current.set(unit)
         return self
 
     async def __aexit__(
         self, exc_type: type[TExc] | None, exc: TExc | None, traceback: Any | None
     ) -> None:
-        if exc_type is None:
-            await self.commit()
-        else:
-            await self.transaction.rollback()
-        await self.session.close()
+        unit = self._unit
+        try:
+            if exc_type is None:
+                await unit.transaction.commit()
+            else:
+                await unit.transaction.rollback()
+        finally:
+            await unit.session.close()
+            if unit.token is not None:
+                self._current.reset(unit.token)
 
     async def commit(self) -> None:
         await self.transaction.commit()
@@ -1,3 +1,7 @@
+import asyncio
+from collections.abc import Awaitable, Iterable
+from datetime import UTC, datetime
+from typing import Any
 from urllib.parse import urlparse
 
 
@@ -18,3 +22,33 @@ def normalize_domain(value: str) -> str:
     host = host.split(":")[0]
 
     return host
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, matching what CURRENT_TIMESTAMP stores."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+async def gather_bounded[T](
+    aws: Iterable[Awaitable[T]], limit: int
+) -> list[T | BaseException]:
+    """asyncio.gather(..., return_exceptions=True) running at most ``limit``
+    awaitables at a time."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> None:
+    """Run ``aws`` concurrently; if one fails, cancel the rest and re-raise."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
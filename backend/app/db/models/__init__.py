@@ -1 +1,5 @@
+from app.db.models.ct_log_cache import CtLogCache  # noqa: F401
 from app.db.models.domain_info import DomainInfo  # noqa: F401
+from app.db.models.ip_info import IpInfo  # noqa: F401
+from app.db.models.refresh_slot import RefreshSlot  # noqa: F401
+from app.db.models.scan_job import ScanJob  # noqa: F401
@@ -2,9 +2,13 @@ from datetime import datetime
 from typing import Any
 
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.types import JSON
 
+# Binary, indexable JSONB on PostgreSQL; JSON (stored as text) elsewhere.
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -18,4 +22,4 @@ class Base(DeclarativeBase):
         onupdate=func.now(),
     )
 
-    type_annotation_map = {dict[str, Any]: JSON}
+    type_annotation_map = {dict[str, Any]: JSONVariant}
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base, JSONVariant
+
+
+class CtLogCache(Base):
+    __tablename__ = "ct_log_cache"
+
+    root_domain: Mapped[str] = mapped_column(unique=True, nullable=False)
+    names: Mapped[list[str]] = mapped_column(type_=JSONVariant, nullable=False)
+    max_certificate_id: Mapped[int] = mapped_column(
+        BigInteger, server_default="0", nullable=False
+    )
+    last_entry_timestamp: Mapped[str | None] = mapped_column(nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(nullable=False)
@@ -1,15 +1,26 @@
 from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import JSON
 
 from app.core.enums import DomainTypes
-from app.db.models.base import Base
+from app.db.models.base import Base, JSONVariant
 
 
 class DomainInfo(Base):
     __tablename__ = "domain_info"
+    __table_args__ = (
+        Index("ix_domain_info_updated_at", "updated_at"),
+        # (filter, domain_name) pairs keep filtered keyset pages on an index range.
+        Index("ix_domain_info_root_domain", "root_domain", "domain_name"),
+        Index("ix_domain_info_domain_type", "domain_type", "domain_name"),
+        Index("ix_domain_info_geo_country", "geo_country", "domain_name"),
+        Index("ix_domain_info_network_owner_name", "network_owner_name", "domain_name"),
+        Index("ix_domain_info_is_active", "is_active", "domain_name"),
+    )
 
     domain_name: Mapped[str] = mapped_column(unique=True, nullable=False)
+    root_domain: Mapped[str | None] = mapped_column(nullable=True)
     domain_type: Mapped[DomainTypes] = mapped_column(
         SQLEnum(
             DomainTypes,
@@ -19,7 +30,7 @@ class DomainInfo(Base):
         nullable=False,
         server_default=DomainTypes.SUBDOMAIN,
     )
-    dns_settings: Mapped[JSON | None] = mapped_column(type_=JSON, nullable=True)
+    dns_settings: Mapped[JSON | None] = mapped_column(type_=JSONVariant, nullable=True)
 
     ip_address: Mapped[str | None] = mapped_column(nullable=True)
 
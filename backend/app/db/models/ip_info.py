@@ -0,0 +1,19 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base
+
+
+class IpInfo(Base):
+    __tablename__ = "ip_info"
+
+    ip_address: Mapped[str] = mapped_column(unique=True, nullable=False)
+
+    geo_city: Mapped[str | None] = mapped_column(nullable=True)
+    geo_country: Mapped[str | None] = mapped_column(nullable=True)
+
+    network_owner_name: Mapped[str | None] = mapped_column(nullable=True)
+
+    is_active: Mapped[bool] = mapped_column(server_default="false", nullable=False)
+    is_anycast_node: Mapped[bool] = mapped_column(
+        server_default="false", nullable=False
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base
+
+
+class RefreshSlot(Base):
+    __tablename__ = "refresh_slot"
+
+    slot: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
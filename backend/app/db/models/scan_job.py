@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.enums import ScanJobStatus
+from app.db.models.base import Base, JSONVariant
+
+
+class ScanJob(Base):
+    __tablename__ = "scan_job"
+
+    domain_name: Mapped[str] = mapped_column(nullable=False)
+    batch_id: Mapped[str | None] = mapped_column(nullable=True, index=True)
+    status: Mapped[ScanJobStatus] = mapped_column(
+        SQLEnum(
+            ScanJobStatus,
+            name="scanjobstatus",
+            values_callable=lambda enum: [e.value for e in enum],
+        ),
+        nullable=False,
+        server_default=ScanJobStatus.PENDING,
+        index=True,
+    )
+
+    discovered: Mapped[int] = mapped_column(server_default="0", nullable=False)
+    enriched: Mapped[int] = mapped_column(server_default="0", nullable=False)
+    failed: Mapped[int] = mapped_column(server_default="0", nullable=False)
+    dropped: Mapped[dict[str, int] | None] = mapped_column(
+        type_=JSONVariant, nullable=True
+    )
+
+    locked_by: Mapped[str | None] = mapped_column(nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(nullable=True)
+
+    error: Mapped[str | None] = mapped_column(nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(nullable=True)
@@ -1,7 +1,9 @@
 import contextlib
 import logging
 from collections.abc import AsyncIterator
+from typing import Any
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -11,18 +13,32 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core.settings import DatabaseSettings
 from app.core.uow import SaSessionUnitOfWork
+from app.db.writer import DbWriter
 
 logger = logging.getLogger("app")
 
 
+def new_engine(cnf: DatabaseSettings, **overrides: Any) -> AsyncEngine:
+    engine = create_async_engine(url=cnf.url, **(cnf.engine_settings | overrides))
+    if cnf.is_sqlite:
+        set_sqlite_pragmas(engine, cnf.sqlite_pragmas)
+    return engine
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, str | int]) -> None:
+    """Apply ``pragmas`` to every new connection of ``engine``."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
 @contextlib.asynccontextmanager
 async def create_engine(cnf: DatabaseSettings) -> AsyncIterator[AsyncEngine]:
-    async_engine = create_async_engine(
-        url=cnf.url,
-        echo=cnf.ECHO,
-        connect_args={"timeout": cnf.TIMEOUT},
-        pool_pre_ping=True,
-    )
+    async_engine = new_engine(cnf)
     yield async_engine
     logger.debug("Disposing async engine...")
     await async_engine.dispose()
@@ -54,3 +70,26 @@ async def sa_session_uow(
     sessionmaker: async_sessionmaker[AsyncSession],
 ) -> SaSessionUnitOfWork:
     return SaSessionUnitOfWork(sessionmaker)
+
+
+@contextlib.asynccontextmanager
+async def create_db_writer(
+    cnf: DatabaseSettings, sessionmaker: async_sessionmaker[AsyncSession]
+) -> AsyncIterator[DbWriter]:
+    """On SQLite, writes go through a dedicated single-connection engine so
+    they never wait on each other's locks; reads keep the regular pool."""
+    if not (cnf.is_sqlite and cnf.SQLITE_SINGLE_WRITER):
+        yield DbWriter(SaSessionUnitOfWork(sessionmaker))
+        return
+
+    engine = new_engine(cnf, pool_size=1, max_overflow=0)
+    writer = DbWriter(
+        SaSessionUnitOfWork(await make_async_sessionmaker(engine)),
+        batching=True,
+        batch_size=cnf.WRITER_BATCH_SIZE,
+    )
+    try:
+        yield writer
+    finally:
+        await writer.aclose()
+        await engine.dispose()
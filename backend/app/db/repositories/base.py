@@ -1,5 +1,6 @@
 from typing import TypeVar
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.base import Base
@@ -11,3 +12,9 @@ class BaseRepository[TModel]:
     def __init__(self, session: AsyncSession, model: type[TModel]) -> None:
         self._session = session
         self.model = model
+
+    def _insert(self) -> sqlite.Insert | postgresql.Insert:
+        """INSERT supporting ON CONFLICT for the dialect of the session."""
+        if self._session.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(self.model)
+        return sqlite.insert(self.model)
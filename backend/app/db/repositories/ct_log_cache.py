@@ -0,0 +1,35 @@
+from collections.abc import Collection
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import utcnow
+from app.db.models.ct_log_cache import CtLogCache
+from app.db.repositories.base import BaseRepository
+
+
+class CtLogCacheRepository(BaseRepository[CtLogCache]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, CtLogCache)
+
+    async def get_many(self, root_domains: Collection[str]) -> list[CtLogCache]:
+        if not root_domains:
+            return []
+        stmt = select(self.model).where(self.model.root_domain.in_(root_domains))
+        return list((await self._session.scalars(stmt)).all())
+
+    async def upsert(self, data: list[dict[str, Any]]) -> None:
+        if not data:
+            return
+        now = utcnow()
+        rows = [item | {"updated_at": now} for item in data]
+        stmt = self._insert().values(rows)
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[self.model.root_domain],
+                set_={
+                    key: stmt.excluded[key] for key in rows[0] if key != "root_domain"
+                },
+            )
+        )
@@ -1,12 +1,17 @@
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import DomainTypes
+from app.core.metrics import DB_FLUSH_SECONDS
+from app.core.utils import utcnow
 from app.db.models.domain_info import DomainInfo
 from app.db.repositories.base import BaseRepository
 
+FLUSH_SECONDS = DB_FLUSH_SECONDS.labels("domain_info")
+
 
 class DomainInfoRepository(BaseRepository[DomainInfo]):
     def __init__(self, session: AsyncSession) -> None:
@@ -16,10 +21,13 @@ class DomainInfoRepository(BaseRepository[DomainInfo]):
         stmt = select(self.model).where(DomainInfo.domain_name == domain_name)
         return (await self._session.scalars(stmt)).one_or_none()
 
-    async def get_domain_names(self) -> list[tuple[int, str]]:
-        stmt = select(self.model.id, self.model.domain_name)
-        result = await self._session.execute(stmt)
-        return [(row.id, row.domain_name) for row in result.all()]
+    async def get_existing_names(self, domain_names: list[str]) -> set[str]:
+        if not domain_names:
+            return set()
+        stmt = select(self.model.domain_name).where(
+            self.model.domain_name.in_(domain_names)
+        )
+        return set((await self._session.scalars(stmt)).all())
 
     async def get_root_domain_names(self) -> list[str]:
         stmt = select(self.model.domain_name).where(
@@ -28,29 +36,78 @@ class DomainInfoRepository(BaseRepository[DomainInfo]):
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_stale_domain_names(
+        self, updated_before: datetime, after_id: int | None, limit: int
+    ) -> list[tuple[int, str]]:
+        stmt = (
+            select(self.model.id, self.model.domain_name)
+            .where(
+                or_(
+                    self.model.updated_at < updated_before,
+                    self.model.updated_at.is_(None),
+                )
+            )
+            .order_by(self.model.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            stmt = stmt.where(self.model.id > after_id)
+        result = await self._session.execute(stmt)
+        return [(row.id, row.domain_name) for row in result.all()]
+
     async def get_domains_info(
         self,
         limit: int,
-        offset: int,
+        offset: int = 0,
+        cursor: str | None = None,
+        filters: dict[str, Any] | None = None,
+        include_total: bool = True,
     ) -> tuple[int | None, list[DomainInfo]]:
-        total = await self._session.scalar(select(func.count()).select_from(self.model))
-        stmt = select(self.model).limit(limit).offset(offset)
+        """One page ordered by domain_name. ``cursor`` is the last domain_name
+        of the previous page and takes precedence over ``offset``."""
+        conditions = [
+            getattr(self.model, field) == value
+            for field, value in (filters or {}).items()
+        ]
+        total = None
+        if include_total:
+            total = await self._session.scalar(
+                select(func.count()).select_from(self.model).where(*conditions)
+            )
+        stmt = (
+            select(self.model)
+            .where(*conditions)
+            .order_by(self.model.domain_name)
+            .limit(limit)
+        )
+        if cursor is not None:
+            stmt = stmt.where(self.model.domain_name > cursor)
+        else:
+            stmt = stmt.offset(offset)
         result = await self._session.execute(stmt)
         return total, list(result.scalars())
 
-    async def add_domain_info(self, data: dict[str, Any]) -> DomainInfo:
-        obj = self.model(**data)
-        self._session.add(obj)
-        await self._session.flush()
-        return obj
-
-    async def bulk_insert(self, data: list[dict[str, Any]]) -> list[DomainInfo]:
-        objects = [self.model(**item) for item in data]
-        self._session.add_all(objects)
-        await self._session.flush()
-        return objects
-
-    async def update_domains_info(self, data: list[dict[str, Any]]) -> None:
-        for item in data:
-            await self._session.merge(self.model(**item))
-        await self._session.flush()
+    async def upsert(self, data: list[dict[str, Any]], batch_size: int = 500) -> None:
+        """INSERT ... ON CONFLICT (domain_name) DO UPDATE in chunks of
+        ``batch_size`` rows, one statement per chunk."""
+        if not data:
+            return
+        now = utcnow()
+        # Rows are matched on domain_name; ids of refreshed rows are not needed.
+        rows = [
+            {key: value for key, value in item.items() if key != "id"}
+            | {"updated_at": now}
+            for item in data
+        ]
+
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start : start + batch_size]
+            stmt = self._insert().values(chunk)
+            upsert = stmt.on_conflict_do_update(
+                index_elements=[self.model.domain_name],
+                set_={
+                    key: stmt.excluded[key] for key in chunk[0] if key != "domain_name"
+                },
+            )
+            with FLUSH_SECONDS.time():
+                await self._session.execute(upsert)
@@ -0,0 +1,46 @@
+from collections.abc import Collection
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import utcnow
+from app.db.models.ip_info import IpInfo
+from app.db.repositories.base import BaseRepository
+
+
+class IpInfoRepository(BaseRepository[IpInfo]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, IpInfo)
+
+    async def get_fresh(
+        self, ip_addresses: Collection[str], since: datetime
+    ) -> list[IpInfo]:
+        if not ip_addresses:
+            return []
+        stmt = select(self.model).where(
+            self.model.ip_address.in_(ip_addresses),
+            self.model.updated_at >= since,
+        )
+        return list((await self._session.scalars(stmt)).all())
+
+    async def upsert(self, data: list[dict[str, Any]]) -> None:
+        """INSERT ... ON CONFLICT (ip_address) DO UPDATE, so concurrent scans
+        caching the same IP do not race on the unique constraint."""
+        if not data:
+            return
+        now = utcnow()
+        # One row per IP: a statement may not update the same row twice.
+        rows = list(
+            {item["ip_address"]: item | {"updated_at": now} for item in data}.values()
+        )
+        stmt = self._insert().values(rows)
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[self.model.ip_address],
+                set_={
+                    key: stmt.excluded[key] for key in rows[0] if key != "ip_address"
+                },
+            )
+        )
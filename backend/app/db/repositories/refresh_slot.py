@@ -0,0 +1,27 @@
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.refresh_slot import RefreshSlot
+from app.db.repositories.base import BaseRepository
+
+
+class RefreshSlotRepository(BaseRepository[RefreshSlot]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, RefreshSlot)
+
+    async def claim(self, slot: int) -> bool:
+        """Records ``slot`` as queued; False if it already was.
+
+        The unique slot makes a concurrent claim wait for this transaction and
+        then find the row, so only one of them gets True.
+        """
+        stmt = (
+            self._insert()
+            .values(slot=slot)
+            .on_conflict_do_nothing(index_elements=[self.model.slot])
+            .returning(self.model.id)
+        )
+        return await self._session.scalar(stmt) is not None
+
+    async def delete_before(self, slot: int) -> None:
+        await self._session.execute(delete(self.model).where(self.model.slot < slot))
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import ScanJobStatus
+from app.core.utils import utcnow
+from app.db.models.scan_job import ScanJob
+from app.db.repositories.base import BaseRepository
+
+
+class ScanJobRepository(BaseRepository[ScanJob]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, ScanJob)
+
+    async def create(self, domain_name: str) -> ScanJob:
+        obj = self.model(domain_name=domain_name, status=ScanJobStatus.PENDING)
+        self._session.add(obj)
+        await self._session.flush()
+        return obj
+
+    async def create_many(self, domain_names: list[str], batch_id: str) -> list[int]:
+        """Inserts one pending job per name in a single statement and returns
+        the ids in the order of ``domain_names``."""
+        if not domain_names:
+            return []
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await self._session.scalars(
+            stmt,
+            [
+                {
+                    "domain_name": name,
+                    "batch_id": batch_id,
+                    "status": ScanJobStatus.PENDING,
+                }
+                for name in domain_names
+            ],
+        )
+        return list(result.all())
+
+    async def get(self, job_id: int) -> ScanJob | None:
+        return await self._session.get(self.model, job_id)
+
+    async def get_unfinished(self, domain_name: str) -> ScanJob | None:
+        """The oldest pending or running job of ``domain_name``."""
+        stmt = (
+            select(self.model)
+            .where(
+                self.model.domain_name == domain_name,
+                self.model.status.in_([ScanJobStatus.PENDING, ScanJobStatus.RUNNING]),
+            )
+            .order_by(self.model.id)
+            .limit(1)
+        )
+        return (await self._session.scalars(stmt)).one_or_none()
+
+    async def get_unfinished_domain_names(self, domain_names: list[str]) -> set[str]:
+        if not domain_names:
+            return set()
+        stmt = select(self.model.domain_name).where(
+            self.model.domain_name.in_(domain_names),
+            self.model.status.in_([ScanJobStatus.PENDING, ScanJobStatus.RUNNING]),
+        )
+        return set((await self._session.scalars(stmt)).all())
+
+    async def batch_exists(self, batch_id: str) -> bool:
+        stmt = select(self.model.id).where(self.model.batch_id == batch_id).limit(1)
+        return await self._session.scalar(stmt) is not None
+
+    async def claim_next(self, worker_id: str, lease_timeout: float) -> ScanJob | None:
+        """Marks the oldest pending job, or a running one whose lease has
+        expired, as running under ``worker_id`` and returns it.
+
+        The candidate row is locked with FOR UPDATE SKIP LOCKED on PostgreSQL,
+        so concurrent workers never claim the same job; SQLite serializes
+        writers and ignores the clause.
+        """
+        now = utcnow()
+        candidate = (
+            select(self.model.id)
+            .where(
+                or_(
+                    self.model.status == ScanJobStatus.PENDING,
+                    and_(
+                        self.model.status == ScanJobStatus.RUNNING,
+                        or_(
+                            self.model.lease_expires_at < now,
+                            self.model.lease_expires_at.is_(None),
+                        ),
+                    ),
+                )
+            )
+            .order_by(self.model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(self.model)
+            .where(self.model.id == candidate)
+            .values(
+                status=ScanJobStatus.RUNNING,
+                locked_by=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_timeout),
+                started_at=func.coalesce(self.model.started_at, now),
+            )
+            .returning(self.model)
+        )
+        result = await self._session.scalars(
+            stmt, execution_options={"populate_existing": True}
+        )
+        return result.one_or_none()
+
+    async def update_job(
+        self, job_id: int, owner: str | None = None, **values: Any
+    ) -> bool:
+        """Returns False if no row was updated. With ``owner`` only the worker
+        holding the job's lease can update it."""
+        stmt = update(self.model).where(self.model.id == job_id).values(**values)
+        if owner is not None:
+            stmt = stmt.where(self.model.locked_by == owner)
+        result = await self._session.execute(stmt)
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+
+    async def get_batch_summary(self, batch_id: str) -> dict[str, Any] | None:
+        """Job counts per status and summed progress counters of a batch."""
+        stmt = (
+            select(
+                self.model.status,
+                func.count(),
+                func.sum(self.model.discovered),
+                func.sum(self.model.enriched),
+                func.sum(self.model.failed),
+            )
+            .where(self.model.batch_id == batch_id)
+            .group_by(self.model.status)
+        )
+        rows = (await self._session.execute(stmt)).all()
+        if not rows:
+            return None
+        return {
+            "batch_id": batch_id,
+            "total": sum(row[1] for row in rows),
+            "jobs": {row[0].value: row[1] for row in rows},
+            "discovered": sum(row[2] or 0 for row in rows),
+            "enriched": sum(row[3] or 0 for row in rows),
+            "failed": sum(row[4] or 0 for row in rows),
+        }
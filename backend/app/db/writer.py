@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.uow import SaSessionUnitOfWork
+
+logger = logging.getLogger("app")
+
+type WriteFn[T] = Callable[[SaSessionUnitOfWork], Awaitable[T]]
+
+
+@dataclass
+class _Write:
+    fn: WriteFn[Any]
+    future: asyncio.Future[Any] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class DbWriter:
+    """Runs write callbacks, each given an open unit of work.
+
+    With ``batching`` a single background task executes them: the callbacks
+    that queued up while a transaction was running share the next one, up to
+    ``batch_size``. If one of them fails, the batch is rolled back and every
+    callback is retried in a transaction of its own, so only the failing one
+    sees the error. Callbacks must therefore be safe to run twice (upserts).
+
+    Without ``batching`` each callback gets its own transaction right away.
+    """
+
+    def __init__(
+        self, uow: SaSessionUnitOfWork, batching: bool = False, batch_size: int = 64
+    ) -> None:
+        self.uow = uow
+        self.batching = batching
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[_Write] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+
+    async def run[T](self, fn: WriteFn[T]) -> T:
+        if not self.batching:
+            async with self.uow:
+                return await fn(self.uow)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._process())
+        write = _Write(fn)
+        self._queue.put_nowait(write)
+        result: T = await write.future
+        return result
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        while not self._queue.empty():
+            write = self._queue.get_nowait()
+            if not write.future.done():
+                write.future.set_exception(RuntimeError("Database writer closed"))
+
+    async def _process(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Callers that gave up while queued are skipped.
+            batch = [write for write in batch if not write.future.done()]
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: list[_Write]) -> None:
+        try:
+            async with self.uow:
+                results = [await write.fn(self.uow) for write in batch]
+        except asyncio.CancelledError:
+            for write in batch:
+                if not write.future.done():
+                    write.future.set_exception(RuntimeError("Database writer closed"))
+            raise
+        except Exception as exc:
+            if len(batch) > 1:
+                logger.info(
+                    "Write batch failed, retrying writes one by one",
+                    extra={"size": len(batch), "result": repr(exc)},
+                )
+                for write in batch:
+                    await self._write([write])
+                return
+            if not batch[0].future.done():
+                batch[0].future.set_exception(exc)
+            return
+
+        for write, result in zip(batch, results, strict=True):
+            if not write.future.done():
+                write.future.set_result(result)
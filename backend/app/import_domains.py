@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import contextlib
+import logging
+import sys
+from pathlib import Path
+
+from app.application.scan_jobs import ScanJobService
+from app.core import di
+from app.core.enums import ScanJobStatus
+from app.core.settings import ScanSettings
+
+logger = logging.getLogger("app")
+
+UNFINISHED = (ScanJobStatus.PENDING, ScanJobStatus.RUNNING)
+
+
+def read_lines(source: str) -> list[str]:
+    if source == "-":
+        return sys.stdin.read().splitlines()
+    return Path(source).read_text(encoding="utf-8-sig").splitlines()
+
+
+async def main(source: str) -> None:
+    async with di.container, di.container.context() as context:
+        scan_jobs = await context.resolve(ScanJobService)
+        scan_cfg = await context.resolve(ScanSettings)
+
+        await scan_jobs.start()
+        try:
+            result = await scan_jobs.import_domains(read_lines(source))
+            logger.info(
+                "Import %(batch_id)s: %(queued)d queued, %(existing)d existing, "
+                "%(already_queued)d already queued, %(invalid)d invalid, "
+                "%(duplicate)d duplicate",
+                result,
+            )
+            batch_id = result["batch_id"]
+            while batch_id is not None:
+                await asyncio.sleep(scan_cfg.JOB_PROGRESS_INTERVAL)
+                batch = await scan_jobs.get_batch(batch_id)
+                if batch is None:
+                    break
+                logger.info(
+                    "Import %(batch_id)s: jobs %(jobs)s, %(discovered)d discovered, "
+                    "%(enriched)d enriched, %(failed)d failed",
+                    batch,
+                )
+                if not any(batch["jobs"].get(status.value) for status in UNFINISHED):
+                    break
+        finally:
+            await scan_jobs.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scan root domains from a CSV or text file, one per line."
+    )
+    parser.add_argument("source", help="path to the file, or - to read stdin")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main(args.source))
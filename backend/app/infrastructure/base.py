@@ -1,27 +1,178 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator
 from typing import Any
 
 import httpx
+from starlette import status
+
+from app.core.metrics import UPSTREAM_REQUESTS_IN_PROGRESS, UPSTREAM_RESPONSES
+from app.core.settings import BaseClientSettings
+from app.infrastructure.json_stream import JsonArrayDecoder
+from app.infrastructure.rate_limit import TokenBucket, backoff_delay
+from app.infrastructure.single_flight import SingleFlight
+
+logger = logging.getLogger("app")
 
 
 class BaseRequestsClient:
     timeout: int
     base_url: str
+    limits: httpx.Limits = httpx.Limits()
+
+    _client: httpx.AsyncClient | None = None
+
+    def __init__(self, cfg: BaseClientSettings) -> None:
+        self.base_url = cfg.BASE_URL
+        self.timeout = cfg.TIMEOUT
+        self.limits = httpx.Limits(
+            max_connections=cfg.MAX_CONNECTIONS,
+            max_keepalive_connections=cfg.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=cfg.KEEPALIVE_EXPIRY,
+        )
+
+        self.max_retries = cfg.MAX_RETRIES
+        self.retry_backoff = cfg.RETRY_BACKOFF
+        self.retry_backoff_max = cfg.RETRY_BACKOFF_MAX
+        self._semaphore = asyncio.Semaphore(cfg.MAX_CONCURRENCY)
+        self._bucket = (
+            TokenBucket(cfg.RATE_LIMIT, cfg.RATE_LIMIT_BURST)
+            if cfg.RATE_LIMIT > 0
+            else None
+        )
+        self._in_flight: SingleFlight[str, Any] = SingleFlight()
+        self._metrics_client = type(self).__name__
+        self._requests_in_progress = UPSTREAM_REQUESTS_IN_PROGRESS.labels(
+            self._metrics_client
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived client, so connections are reused across calls."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @contextlib.asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Concurrency and rate limits of this upstream."""
+        async with self._semaphore:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            with self._requests_in_progress.track_inprogress():
+                yield
+
+    def _count_response(self, status_code: int | str) -> None:
+        UPSTREAM_RESPONSES.labels(self._metrics_client, str(status_code)).inc()
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        if isinstance(exc, httpx.HTTPStatusError):
+            code = exc.response.status_code
+            return (
+                code == status.HTTP_429_TOO_MANY_REQUESTS
+                or code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return isinstance(exc, httpx.TransportError)
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = exc.response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.retry_backoff_max)
+        return backoff_delay(attempt, self.retry_backoff, self.retry_backoff_max)
+
+    async def _wait_before_retry(self, exc: Exception, attempt: int, path: str) -> None:
+        if attempt >= self.max_retries or not self._is_retryable(exc):
+            raise exc
+        delay = self._retry_delay(exc, attempt)
+        logger.info(
+            "Retrying request",
+            extra={"url": path, "attempt": attempt + 1, "delay": delay},
+        )
+        await asyncio.sleep(delay)
+
+    def _url(self, added_path: str) -> str:
+        if added_path:
+            return f"{self.base_url}/{added_path}"
+        return self.base_url
 
     async def _request(
         self, method: str, path: str, params: dict[str, Any] | None
     ) -> Any:
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            r = await client.request(method, path, params=params)
-            r.raise_for_status()
-            return r.json()
+        attempt = 0
+        while True:
+            try:
+                async with self._slot():
+                    try:
+                        r = await self.client.request(method, path, params=params)
+                    except httpx.TransportError:
+                        self._count_response("error")
+                        raise
+                self._count_response(r.status_code)
+                r.raise_for_status()
+                return r.json()
+            except (httpx.HTTPStatusError, httpx.TransportError) as exc:
+                await self._wait_before_retry(exc, attempt, path)
+                attempt += 1
 
     async def get(
         self, added_path: str = "", params: dict[str, Any] | None = None
     ) -> Any:
-        path = self.base_url
-        if added_path:
-            path = f"{path}/{added_path}"
-        return await self._request("GET", path, params)
+        return await self._request("GET", self._url(added_path), params)
+
+    @contextlib.asynccontextmanager
+    async def _stream(
+        self, path: str, params: dict[str, Any] | None
+    ) -> AsyncIterator[httpx.Response]:
+        """``client.stream`` that counts the response, once per request."""
+        responded = False
+        try:
+            async with self.client.stream("GET", path, params=params) as r:
+                responded = True
+                self._count_response(r.status_code)
+                yield r
+        except httpx.TransportError:
+            if not responded:
+                self._count_response("error")
+            raise
+
+    async def iter_json_array(
+        self, added_path: str = "", params: dict[str, Any] | None = None
+    ) -> AsyncGenerator[Any]:
+        """GET a JSON array and yield its elements while the body is still
+        downloading. Failures are retried only until the first element."""
+        path = self._url(added_path)
+        attempt = 0
+        yielded = False
+        while True:
+            try:
+                async with (
+                    self._slot(),
+                    self._stream(path, params) as r,
+                ):
+                    r.raise_for_status()
+                    decoder = JsonArrayDecoder()
+                    async for chunk in r.aiter_text():
+                        for item in decoder.feed(chunk):
+                            yielded = True
+                            yield item
+                    decoder.close()
+                    return
+            except (httpx.HTTPStatusError, httpx.TransportError) as exc:
+                if yielded:
+                    raise
+                await self._wait_before_retry(exc, attempt, path)
+                attempt += 1
 
     async def get_ip_info(self, ip: str) -> Any:
-        return await self.get(added_path=ip)
+        return await self._in_flight.do(ip, lambda: self.get(added_path=ip))
@@ -1,18 +1,58 @@
-from typing import Any
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 
 from app.core.settings import CrtShClientSettings
 from app.infrastructure.base import BaseRequestsClient
 
+logger = logging.getLogger("app")
+
+
+class CertificateLimitReached(Exception):
+    """More than MAX_CERTIFICATES new certificates are logged for the domain."""
+
+
+@dataclass(slots=True)
+class Certificate:
+    id: int
+    entry_timestamp: str | None
+    names: list[str]
+
 
 class CrtShClient(BaseRequestsClient):
     def __init__(self, cfg: CrtShClientSettings):
-        self.base_url = cfg.BASE_URL
-        self.timeout = cfg.TIMEOUT
-
-    async def get_subdomains(self, domain: str) -> Any:
-        return await self.get(
-            params={
-                "q": domain,
-                "output": "json",
-            },
-        )
+        super().__init__(cfg)
+        self.max_certificates = cfg.MAX_CERTIFICATES
+
+    async def iter_certificates(
+        self, domain: str, after_id: int = 0
+    ) -> AsyncIterator[Certificate]:
+        """Certificates logged for ``domain``, streamed from the response.
+
+        crt.sh cannot filter by id, so certificates with an id up to
+        ``after_id`` are skipped here without splitting their names. Raises
+        CertificateLimitReached after MAX_CERTIFICATES certificates newer than
+        ``after_id`` (0 = all).
+        """
+        # aclosing releases the connection as soon as the limit is reached.
+        async with contextlib.aclosing(
+            self.iter_json_array(params={"q": domain, "output": "json"})
+        ) as certificates:
+            count = 0
+            async for item in certificates:
+                cert_id = int(item.get("id") or 0)
+                if after_id and cert_id <= after_id:
+                    continue
+                count += 1
+                if self.max_certificates and count > self.max_certificates:
+                    logger.warning(
+                        "crt.sh certificate limit reached",
+                        extra={"domain": domain, "limit": self.max_certificates},
+                    )
+                    raise CertificateLimitReached(domain)
+                yield Certificate(
+                    id=cert_id,
+                    entry_timestamp=item.get("entry_timestamp"),
+                    names=item["name_value"].split("\n"),
+                )
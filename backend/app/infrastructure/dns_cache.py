@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import dns.exception
+import dns.message
+import dns.rdatatype
+import dns.resolver
+
+from app.core.settings import DnsResolverSettings
+
+type CacheKey = tuple[str, str]
+
+
+@dataclass(slots=True)
+class DnsCacheEntry:
+    expires_at: float
+    records: list[str]
+    error: dns.exception.DNSException | None = None
+
+
+class DnsCache:
+    """LRU cache of DNS answers keyed by (name, rdtype) that honours record TTLs.
+
+    NXDOMAIN and NoAnswer responses are cached too (negative caching), for the
+    SOA minimum of the authority section when the server provides one.
+    """
+
+    def __init__(self, cfg: DnsResolverSettings) -> None:
+        self.max_size = cfg.CACHE_MAX_SIZE
+        self.max_ttl = cfg.CACHE_MAX_TTL
+        self.negative_ttl = cfg.CACHE_NEGATIVE_TTL
+        self._entries: OrderedDict[CacheKey, DnsCacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(name: str, rdtype: str) -> CacheKey:
+        return name.lower().rstrip("."), rdtype.upper()
+
+    def get(self, name: str, rdtype: str) -> DnsCacheEntry | None:
+        key = self.make_key(name, rdtype)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, name: str, rdtype: str, records: list[str], ttl: int) -> None:
+        self._store(name, rdtype, DnsCacheEntry(self._expires_at(ttl), records))
+
+    def set_negative(
+        self, name: str, rdtype: str, error: dns.exception.DNSException
+    ) -> None:
+        ttl = self._negative_ttl(error)
+        self._store(name, rdtype, DnsCacheEntry(self._expires_at(ttl), [], error))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _store(self, name: str, rdtype: str, entry: DnsCacheEntry) -> None:
+        if self.max_size <= 0:
+            return
+        key = self.make_key(name, rdtype)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _expires_at(self, ttl: int) -> float:
+        return time.monotonic() + min(ttl, self.max_ttl)
+
+    def _negative_ttl(self, error: dns.exception.DNSException) -> int:
+        responses: list[dns.message.Message] = []
+        if isinstance(error, dns.resolver.NXDOMAIN):
+            responses = list(error.kwargs.get("responses", {}).values())
+        elif isinstance(error, dns.resolver.NoAnswer):
+            response = error.kwargs.get("response")
+            if response is not None:
+                responses = [response]
+
+        for response in responses:
+            for rrset in response.authority:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return int(min(rrset.ttl, rrset[0].minimum))
+        return self.negative_ttl
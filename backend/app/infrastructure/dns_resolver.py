@@ -0,0 +1,51 @@
+import asyncio
+
+import dns.asyncresolver
+import dns.resolver
+
+from app.core import metrics
+from app.core.settings import DnsResolverSettings
+from app.infrastructure.dns_cache import CacheKey, DnsCache
+from app.infrastructure.single_flight import SingleFlight
+
+
+class DnsResolver:
+    def __init__(self, cfg: DnsResolverSettings, cache: DnsCache) -> None:
+        self._resolver = dns.asyncresolver.Resolver(configure=not cfg.NAMESERVERS)
+        if cfg.NAMESERVERS:
+            self._resolver.nameservers = cfg.NAMESERVERS
+        self._resolver.port = cfg.PORT
+        self._resolver.timeout = cfg.TIMEOUT
+        self._resolver.lifetime = cfg.LIFETIME
+        self._semaphore = asyncio.Semaphore(cfg.MAX_CONCURRENT_QUERIES)
+        self.cache = cache
+        self._in_flight: SingleFlight[CacheKey, list[str]] = SingleFlight()
+
+    async def resolve(self, name: str, rdtype: str) -> list[str]:
+        entry = self.cache.get(name, rdtype)
+        if entry is not None:
+            if entry.error is not None:
+                raise entry.error.with_traceback(None)
+            return entry.records
+
+        # Concurrent misses for the same record share one query.
+        return await self._in_flight.do(
+            self.cache.make_key(name, rdtype), lambda: self._query(name, rdtype)
+        )
+
+    async def _query(self, name: str, rdtype: str) -> list[str]:
+        try:
+            async with self._semaphore:
+                with (
+                    metrics.DNS_QUERIES_IN_PROGRESS.track_inprogress(),
+                    metrics.DNS_QUERY_SECONDS.labels(rdtype).time(),
+                ):
+                    answer = await self._resolver.resolve(name, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as exc:
+            self.cache.set_negative(name, rdtype, exc)
+            raise
+
+        records = [r.to_text() for r in answer]
+        ttl = answer.rrset.ttl if answer.rrset is not None else 0
+        self.cache.set(name, rdtype, records, ttl)
+        return records
@@ -0,0 +1,31 @@
+import functools
+
+import tldextract
+
+from app.core.enums import DomainTypes
+from app.core.settings import DomainParserSettings
+
+
+class DomainParser:
+    """Public-suffix parsing with a preloaded TLDExtract.
+
+    With no SUFFIX_LIST_URLS the suffix list comes from the snapshot bundled
+    with tldextract, so nothing is fetched over the network. Parsing is
+    pure CPU and memoized per name, so it runs inline.
+    """
+
+    def __init__(self, cfg: DomainParserSettings) -> None:
+        self._extractor = tldextract.TLDExtract(
+            cache_dir=cfg.CACHE_DIR,
+            suffix_list_urls=cfg.SUFFIX_LIST_URLS,
+        )
+        self.parse = functools.lru_cache(maxsize=cfg.PARSE_CACHE_SIZE)(
+            self._extractor.extract_str
+        )
+        # Load the suffix list now rather than on the first scanned name.
+        self.parse("example.com")
+
+    def domain_type(self, domain: str) -> DomainTypes:
+        if self.parse(domain).subdomain:
+            return DomainTypes.SUBDOMAIN
+        return DomainTypes.ROOT
@@ -4,5 +4,4 @@ from app.infrastructure.base import BaseRequestsClient
 
 class IpInfoClient(BaseRequestsClient):
     def __init__(self, cfg: IpInfoClientSettings):
-        self.base_url = cfg.BASE_URL
-        self.timeout = cfg.TIMEOUT
+        super().__init__(cfg)
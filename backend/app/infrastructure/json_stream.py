@@ -0,0 +1,57 @@
+import json
+from typing import Any
+
+WHITESPACE = " \t\n\r"
+
+
+class JsonArrayDecoder:
+    """Incremental decoder of a top-level JSON array.
+
+    Text chunks are fed in as they arrive and every element completed so far is
+    returned; only the unfinished tail of the payload is kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        buf = self._buffer + chunk
+        items: list[Any] = []
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                break
+            if self._finished:
+                raise ValueError("Extra data after JSON array")
+            if not self._started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                self._finished = True
+                pos += 1
+                continue
+            if buf[pos] == ",":
+                pos += 1
+                continue
+            try:
+                item, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # the element is not complete yet
+            if end == len(buf) and isinstance(item, int | float):
+                break  # a number may continue in the next chunk
+            items.append(item)
+            pos = end
+        self._buffer = buf[pos:]
+        return items
+
+    def close(self) -> None:
+        if not self._finished or self._buffer.strip(WHITESPACE):
+            raise ValueError("Truncated or malformed JSON array")
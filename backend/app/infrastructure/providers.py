@@ -0,0 +1,42 @@
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+
+from app.core.settings import (
+    CrtShClientSettings,
+    IpInfoClientSettings,
+    IpWhoIsClientSettings,
+)
+from app.infrastructure.crt_sh_client import CrtShClient
+from app.infrastructure.ipinfo_client import IpInfoClient
+from app.infrastructure.ipwhois_client import IpWhoIsClient
+
+logger = logging.getLogger("app")
+
+
+@contextlib.asynccontextmanager
+async def create_crt_sh_client(cfg: CrtShClientSettings) -> AsyncIterator[CrtShClient]:
+    client = CrtShClient(cfg)
+    yield client
+    await client.aclose()
+    logger.debug("crt.sh connection pool is closed.")
+
+
+@contextlib.asynccontextmanager
+async def create_ip_who_is_client(
+    cfg: IpWhoIsClientSettings,
+) -> AsyncIterator[IpWhoIsClient]:
+    client = IpWhoIsClient(cfg)
+    yield client
+    await client.aclose()
+    logger.debug("ipwho.is connection pool is closed.")
+
+
+@contextlib.asynccontextmanager
+async def create_ip_info_client(
+    cfg: IpInfoClientSettings,
+) -> AsyncIterator[IpInfoClient]:
+    client = IpInfoClient(cfg)
+    yield client
+    await client.aclose()
+    logger.debug("ipinfo.io connection pool is closed.")
@@ -0,0 +1,60 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class _Call[V]:
+    future: asyncio.Future[V]
+    waiters: int = 0
+
+
+class SingleFlight[K: Hashable, V]:
+    """Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key starts ``fn``; callers arriving while it is
+    running await the same task and get its result or exception. Cancelling
+    an awaiter leaves the shared call running for the others, but once the
+    last one is cancelled the call is cancelled too, and that awaiter only
+    returns when it has stopped.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, _Call[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: K) -> bool:
+        call = self._calls.get(key)
+        return call is not None and not call.future.done()
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is None or call.future.done():
+            call = self._start(key, fn)
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.future.done():
+                # Callers arriving from now on start a new call.
+                self._forget(key, call)
+                call.future.cancel()
+                await asyncio.wait([call.future])
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _start(self, key: K, fn: Callable[[], Awaitable[V]]) -> _Call[V]:
+        call = _Call(asyncio.ensure_future(fn()))
+        self._calls[key] = call
+        call.future.add_done_callback(lambda _: self._forget(key, call))
+        return call
+
+    def _forget(self, key: K, call: _Call[V]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.future.done() and not call.future.cancelled():
+            # Mark the exception as retrieved when every awaiter was cancelled.
+            call.future.exception()
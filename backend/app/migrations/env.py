@@ -12,7 +12,10 @@ from app.db.models.base import Base
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", get_settings(DatabaseSettings).url)
+# "%" is the ConfigParser interpolation character; DSNs may contain it.
+config.set_main_option(
+    "sqlalchemy.url", get_settings(DatabaseSettings).url.replace("%", "%%")
+)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -40,11 +43,12 @@ async def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    cfg = get_settings(DatabaseSettings)
     connectable = create_async_engine(
-        get_settings(DatabaseSettings).url,
+        cfg.url,
         poolclass=pool.NullPool,
         future=True,
-        connect_args={"timeout": 10},
+        connect_args=cfg.connect_args,
     )
 
     async with connectable.connect() as connection:
@@ -0,0 +1,54 @@
+"""use jsonb on postgresql
+
+Revision ID: 0b6e4c2f9d13
+Revises: f2d94b7a1c08
+Create Date: 2026-10-17 18:20:41.318204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0b6e4c2f9d13"
+down_revision: str | Sequence[str] | None = "f2d94b7a1c08"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+JSON_COLUMNS = [
+    ("domain_info", "dns_settings"),
+    ("scan_job", "dropped"),
+    ("ct_log_cache", "names"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite has no JSONB; its JSON columns stay as they are.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using=f"{column}::jsonb",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using=f"{column}::json",
+        )
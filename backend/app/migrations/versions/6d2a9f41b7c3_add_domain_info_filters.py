@@ -0,0 +1,55 @@
+"""add domain_info root_domain and filter indexes
+
+Revision ID: 6d2a9f41b7c3
+Revises: 3f7b8c2d5e14
+Create Date: 2026-10-17 12:20:47.093118
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d2a9f41b7c3"
+down_revision: str | Sequence[str] | None = "3f7b8c2d5e14"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+FILTER_INDEXES = {
+    "ix_domain_info_root_domain": "root_domain",
+    "ix_domain_info_domain_type": "domain_type",
+    "ix_domain_info_geo_country": "geo_country",
+    "ix_domain_info_network_owner_name": "network_owner_name",
+    "ix_domain_info_is_active": "is_active",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("domain_info", sa.Column("root_domain", sa.String(), nullable=True))
+    # Attribute existing rows to the longest root domain they belong to.
+    op.execute(
+        """
+        UPDATE domain_info SET root_domain = (
+            SELECT r.domain_name FROM domain_info AS r
+            WHERE r.domain_type = 'root'
+              AND (
+                domain_info.domain_name = r.domain_name
+                OR domain_info.domain_name LIKE '%.' || r.domain_name
+              )
+            ORDER BY length(r.domain_name) DESC
+            LIMIT 1
+        )
+        """
+    )
+    for name, column in FILTER_INDEXES.items():
+        op.create_index(name, "domain_info", [column, "domain_name"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in FILTER_INDEXES:
+        op.drop_index(name, table_name="domain_info")
+    op.drop_column("domain_info", "root_domain")
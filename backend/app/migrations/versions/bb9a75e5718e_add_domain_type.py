@@ -17,15 +17,19 @@ down_revision: str | Sequence[str] | None = "e1183f345fd1"
 branch_labels: str | Sequence[str] | None = None
 depends_on: str | Sequence[str] | None = None
 
+DOMAIN_TYPE = sa.Enum("root", "subdomain", name="domaintype")
+
 
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
+    # add_column does not create the PostgreSQL enum type by itself.
+    DOMAIN_TYPE.create(op.get_bind(), checkfirst=True)
     op.add_column(
         "domain_info",
         sa.Column(
             "domain_type",
-            sa.Enum("root", "subdomain", name="domaintype"),
+            DOMAIN_TYPE,
             server_default="subdomain",
             nullable=False,
         ),
@@ -37,4 +41,5 @@ def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column("domain_info", "domain_type")
+    DOMAIN_TYPE.drop(op.get_bind(), checkfirst=True)
     # ### end Alembic commands ###
@@ -1,9 +1,10 @@
-import socket
+from datetime import datetime
 from typing import Literal
 
 from fastapi import HTTPException
 from pydantic import BaseModel, field_validator
 
+from app.core.enums import DomainTypes, ScanJobStatus
 from app.core.utils import normalize_domain
 
 
@@ -13,18 +14,24 @@ class DomainInfoCreate(BaseModel):
     @field_validator("domain_name", mode="before")
     @classmethod
     def normalize_and_validate_domain(cls, v: str) -> str:
+        # Whether the domain resolves is checked asynchronously by the service.
         domain = normalize_domain(v)
         if not domain:
             raise HTTPException(status_code=400, detail="Domain name cannot be empty")
-        try:
-            socket.gethostbyname(domain)
-        except socket.gaierror:
-            raise HTTPException(status_code=400, detail="Domain name not found")
         return domain
 
 
+class DomainInfoFilters(BaseModel):
+    root_domain: str | None = None
+    domain_type: DomainTypes | None = None
+    geo_country: str | None = None
+    network_owner_name: str | None = None
+    is_active: bool | None = None
+
+
 class DomainInfoRead(BaseModel):
     domain_name: str
+    root_domain: str | None = None
     ip_address: str | None = None
 
     geo_city: str | None = None
@@ -38,8 +45,46 @@ class DomainInfoRead(BaseModel):
 
 class DomainInfoResponse(BaseModel):
     items: list[DomainInfoRead]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
 
 
 class RefreshResponse(BaseModel):
     status: Literal["ok"]
+    processed: int | None = None
+    next_cursor: int | None = None
+
+
+class ScanJobRead(BaseModel):
+    id: int
+    domain_name: str
+    status: ScanJobStatus
+
+    discovered: int = 0
+    enriched: int = 0
+    failed: int = 0
+    dropped: dict[str, int] | None = None
+
+    error: str | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class ImportResponse(BaseModel):
+    batch_id: str | None
+    queued: int
+    existing: int
+    already_queued: int
+    invalid: int
+    duplicate: int
+
+
+class ImportBatchRead(BaseModel):
+    batch_id: str
+    total: int
+    jobs: dict[ScanJobStatus, int]
+
+    discovered: int = 0
+    enriched: int = 0
+    failed: int = 0
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class DnsCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_ratio: float
@@ -0,0 +1,44 @@
+import asyncio
+import contextlib
+import logging
+import signal
+
+from prometheus_client import start_http_server
+
+from app.application.refresh_scheduler import RefreshScheduler
+from app.application.scan_jobs import ScanJobService
+from app.core import di
+from app.core.settings import ScanSettings
+
+logger = logging.getLogger("app")
+
+
+async def main() -> None:
+    async with di.container, di.container.context() as context:
+        scan_jobs = await context.resolve(ScanJobService)
+        scheduler = await context.resolve(RefreshScheduler)
+        scan_cfg = await context.resolve(ScanSettings)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        if scan_cfg.WORKER_METRICS_PORT:
+            start_http_server(scan_cfg.WORKER_METRICS_PORT)
+        await scan_jobs.start()
+        if scan_cfg.REFRESH_SCHEDULER:
+            await scheduler.start()
+        logger.info("Scan worker %s started", scan_jobs.worker_id)
+        try:
+            await stop.wait()
+        finally:
+            await scheduler.stop()
+            await scan_jobs.stop()
+        logger.info("Scan worker %s stopped", scan_jobs.worker_id)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
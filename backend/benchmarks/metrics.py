@@ -0,0 +1,108 @@
+import contextlib
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
+from typing import Any
+
+# p99 differences below this are treated as noise.
+P99_NOISE_MS = 5.0
+# Below this many samples the p99 is a single measurement and too noisy to
+# compare; such stages (discover, store) still count towards throughput.
+MIN_P99_SAMPLES = 10
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, ``q`` in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def machine() -> str:
+    """CPU, core count and Python version, recorded with the baselines."""
+    cpu = platform.processor() or platform.machine()
+    with contextlib.suppress(OSError):
+        with open("/proc/cpuinfo") as f:
+            cpu = next(
+                (line.split(":", 1)[1].strip() for line in f if "model name" in line),
+                cpu,
+            )
+    return (
+        f"{cpu}, {os.cpu_count()} CPU(s), {platform.system()}, "
+        f"Python {platform.python_version()}"
+    )
+
+
+class StageTimer:
+    """Wall-clock durations per pipeline stage."""
+
+    def __init__(self) -> None:
+        self.samples: defaultdict[str, list[float]] = defaultdict(list)
+
+    @contextlib.contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - start)
+
+    def wrap[**P, R](
+        self, stage: str, fn: Callable[P, Awaitable[R]]
+    ) -> Callable[P, Coroutine[Any, Any, R]]:
+        async def timed(*args: P.args, **kwargs: P.kwargs) -> R:
+            with self.measure(stage):
+                return await fn(*args, **kwargs)
+
+        return timed
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+            }
+            for stage, values in sorted(self.samples.items())
+        }
+
+
+def find_regressions(
+    result: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Metrics of ``result`` that are worse than ``baseline`` by more than
+    ``tolerance`` (a fraction)."""
+    regressions = []
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {result['throughput']:.1f}/s < {baseline['throughput']:.1f}/s"
+        )
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(
+            f"peak RSS {result['peak_rss_mb']:.0f} MB > {baseline['peak_rss_mb']:.0f} MB"
+        )
+    for stage, stats in result["stages"].items():
+        expected = baseline["stages"].get(stage)
+        if (
+            expected
+            and stats["count"] >= MIN_P99_SAMPLES
+            and stats["p99_ms"] > expected["p99_ms"] * (1 + tolerance)
+            and stats["p99_ms"] - expected["p99_ms"] > P99_NOISE_MS
+        ):
+            regressions.append(
+                f"{stage} p99 {stats['p99_ms']:.1f} ms > {expected['p99_ms']:.1f} ms"
+            )
+    return regressions
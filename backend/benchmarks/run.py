@@ -0,0 +1,200 @@
+"""End-to-end scan benchmarks against local upstream stand-ins.
+
+    uv run python -m benchmarks.run                      # default scenarios
+    uv run python -m benchmarks.run add-10k add-50k      # selected scenarios
+    uv run python -m benchmarks.run --save-baseline      # record new baselines
+
+Each scenario runs in a fresh process against a new SQLite database. The
+result is compared with ``baselines.json``; the exit status is 1 when a metric
+regressed by more than ``--tolerance``. Baselines are only meaningful on the
+machine they were recorded on, which is stored with them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from app.application.domain_info import DomainInfoService
+from app.core.settings import (
+    CrtShClientSettings,
+    DatabaseSettings,
+    DnsResolverSettings,
+    DomainParserSettings,
+    IpInfoClientSettings,
+    IpWhoIsClientSettings,
+    ScanSettings,
+)
+from app.core.uow import SaSessionUnitOfWork
+from app.db.models.base import Base
+from app.db.providers import create_db_writer, make_async_sessionmaker, new_engine
+from app.db.repositories.domain_info import DomainInfoRepository
+from app.infrastructure.crt_sh_client import CrtShClient
+from app.infrastructure.dns_cache import DnsCache
+from app.infrastructure.dns_resolver import DnsResolver
+from app.infrastructure.domain_parser import DomainParser
+from app.infrastructure.ipinfo_client import IpInfoClient
+from app.infrastructure.ipwhois_client import IpWhoIsClient
+from benchmarks.metrics import StageTimer, find_regressions, machine, peak_rss_mb
+from benchmarks.scenarios import DEFAULT_SCENARIOS, ROOT_DOMAIN, SCENARIOS, Scenario
+from benchmarks.upstreams import upstreams
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+
+async def run_scenario(scenario: Scenario) -> dict[str, Any]:
+    logging.getLogger("app").setLevel(logging.ERROR)
+    with upstreams(scenario) as ports, tempfile.TemporaryDirectory() as tmp:
+        # The app's engine setup, so the SQLite pragmas and writer are measured.
+        db_cfg = DatabaseSettings(DSN=f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+        engine = new_engine(db_cfg)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessionmaker = await make_async_sessionmaker(engine)
+
+        async with create_db_writer(db_cfg, sessionmaker) as writer:
+            # Upstream rate limits are switched off: they would measure the limit.
+            ip_api_url = f"http://127.0.0.1:{ports['ip_api']}"
+            dns_cfg = DnsResolverSettings(NAMESERVERS=["127.0.0.1"], PORT=ports["dns"])
+            dns_cache = DnsCache(dns_cfg)
+            clients = (
+                CrtShClient(
+                    CrtShClientSettings(
+                        BASE_URL=f"http://127.0.0.1:{ports['crt_sh']}", RATE_LIMIT=0
+                    )
+                ),
+                IpWhoIsClient(IpWhoIsClientSettings(BASE_URL=ip_api_url, RATE_LIMIT=0)),
+                IpInfoClient(IpInfoClientSettings(BASE_URL=ip_api_url, RATE_LIMIT=0)),
+            )
+            service = DomainInfoService(
+                uow=SaSessionUnitOfWork(sessionmaker),
+                writer=writer,
+                crt_sh_cl=clients[0],
+                ip_who_is_cl=clients[1],
+                ip_info_cl=clients[2],
+                dns_resolver=DnsResolver(dns_cfg, dns_cache),
+                domain_parser=DomainParser(DomainParserSettings()),
+                scan_cfg=ScanSettings(),
+            )
+
+            timer = StageTimer()
+            if scenario.mode == "refresh":
+                await service.handle_domain_name(ROOT_DOMAIN)
+                dns_cache.clear()
+            instrument(service, timer)
+
+            upsert = DomainInfoRepository.upsert
+            DomainInfoRepository.upsert = timer.wrap("store", upsert)  # type: ignore[method-assign]
+            start = time.perf_counter()
+            try:
+                if scenario.mode == "refresh":
+                    await service.refresh_domains_info()
+                else:
+                    await service.handle_domain_name(ROOT_DOMAIN)
+                elapsed = time.perf_counter() - start
+            finally:
+                DomainInfoRepository.upsert = upsert  # type: ignore[method-assign]
+                for client in clients:
+                    await client.aclose()
+        await engine.dispose()
+
+    domains = len(timer.samples["resolve"])
+    return {
+        "scenario": scenario.name,
+        "domains": domains,
+        "seconds": round(elapsed, 3),
+        "throughput": round(domains / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": timer.summary(),
+    }
+
+
+def instrument(service: DomainInfoService, timer: StageTimer) -> None:
+    service.resolve_domain = timer.wrap("resolve", service.resolve_domain)  # type: ignore[method-assign]
+    service.fetch_ip_info = timer.wrap("ip_info", service.fetch_ip_info)  # type: ignore[method-assign]
+    service.get_ips_info = timer.wrap("ip_info_batch", service.get_ips_info)  # type: ignore[method-assign]
+
+    iter_target_domains = service.iter_target_domains
+
+    async def discover(*args: Any, **kwargs: Any) -> Any:
+        with timer.measure("discover"):
+            first = True
+            start = time.perf_counter()
+            async for name in iter_target_domains(*args, **kwargs):
+                if first and name != ROOT_DOMAIN:
+                    timer.samples["discover_first_name"].append(
+                        time.perf_counter() - start
+                    )
+                    first = False
+                yield name
+
+    service.iter_target_domains = discover  # type: ignore[method-assign]
+
+
+def run_isolated(scenario: Scenario) -> dict[str, Any]:
+    return asyncio.run(run_scenario(scenario))
+
+
+def format_result(result: dict[str, Any]) -> str:
+    lines = [
+        f"{result['scenario']}: {result['domains']} domains in {result['seconds']} s, "
+        f"{result['throughput']} domains/s, peak RSS {result['peak_rss_mb']} MB"
+    ]
+    for stage, stats in result["stages"].items():
+        lines.append(
+            f"  {stage:<20} n={stats['count']:<7} "
+            f"p50={stats['p50_ms']:>9.2f} ms  p99={stats['p99_ms']:>9.2f} ms"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        default=DEFAULT_SCENARIOS,
+        help=f"scenario names, one of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - SCENARIOS.keys()
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    baselines: dict[str, Any] = (
+        json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    )
+    failed = False
+    for name in args.scenarios:
+        # A fresh process per scenario, so peak RSS belongs to that run alone.
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_isolated, SCENARIOS[name]).result()
+        sys.stdout.write(format_result(result) + "\n")
+
+        if args.save_baseline:
+            baselines[name] = result | {"machine": machine()}
+        elif name in baselines:
+            recorded_on = baselines[name].get("machine")
+            if recorded_on and recorded_on != machine():
+                sys.stdout.write(f"  note: baseline recorded on {recorded_on}\n")
+            for regression in find_regressions(result, baselines[name], args.tolerance):
+                failed = True
+                sys.stdout.write(f"  REGRESSION {regression}\n")
+
+    if args.save_baseline:
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
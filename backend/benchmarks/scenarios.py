@@ -0,0 +1,69 @@
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+ROOT_DOMAIN = "scan-bench.com"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Shape of one benchmark run and of the upstreams it talks to."""
+
+    name: str
+    mode: Literal["add", "refresh"] = "add"
+    subdomains: int = 100
+    ips: int = 0  # unique IPs behind the subdomains, 0 = one per 10 names
+    dead_ratio: float = 0.1  # names answered with NXDOMAIN
+    crt_latency_ms: float = 200  # before crt.sh sends the first byte
+    http_latency_ms: float = 20  # per IP API request
+    dns_latency_ms: float = 2  # per DNS query
+    error_rate: float = 0.0  # IP API requests answered with 503
+    seed: int = 1
+
+    @property
+    def unique_ips(self) -> int:
+        return self.ips or max(1, self.subdomains // 10)
+
+    def subdomain(self, index: int) -> str:
+        return f"s{index}.{ROOT_DOMAIN}"
+
+    def index_of(self, name: str) -> int | None:
+        """Index of a generated subdomain, -1 for the root, None otherwise."""
+        if name == ROOT_DOMAIN:
+            return -1
+        label, _, parent = name.partition(".")
+        if parent != ROOT_DOMAIN or not label.startswith("s"):
+            return None
+        index = label[1:]
+        if not index.isdigit() or int(index) >= self.subdomains:
+            return None
+        return int(index)
+
+    def is_dead(self, name: str) -> bool:
+        return zlib.crc32(name.encode()) % 1000 < self.dead_ratio * 1000
+
+    def ip_of(self, name: str) -> str:
+        n = zlib.crc32(name.encode()) % self.unique_ips
+        return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("add-100", subdomains=100),
+        Scenario("add-1k", subdomains=1_000),
+        Scenario("add-10k", subdomains=10_000),
+        Scenario("add-50k", subdomains=50_000, crt_latency_ms=2_000),
+        Scenario("add-1k-flaky", subdomains=1_000, error_rate=0.05),
+        Scenario(
+            "add-1k-slow", subdomains=1_000, http_latency_ms=200, dns_latency_ms=50
+        ),
+        Scenario("refresh-1k", mode="refresh", subdomains=1_000),
+        Scenario("refresh-10k", mode="refresh", subdomains=10_000),
+    ]
+}
+
+DEFAULT_SCENARIOS = ["add-100", "add-1k", "add-1k-flaky", "refresh-1k"]
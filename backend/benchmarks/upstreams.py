@@ -0,0 +1,196 @@
+"""Local stand-ins for crt.sh, ipwho.is/ipinfo.io and DNS.
+
+They run in a separate process (see ``upstreams``), so their CPU and memory
+do not count against the scan being measured.
+"""
+
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import random
+import socket
+from collections.abc import AsyncIterator, Iterator
+from multiprocessing.connection import Connection
+from typing import Any
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.scenarios import ROOT_DOMAIN, Scenario
+
+CERTIFICATE_ID_BASE = 10_000_000_000
+CHUNK_SIZE = 1_000
+
+# Answers for every record type the scan asks for; A and AAAA depend on the name.
+STATIC_RECORDS = {
+    dns.rdatatype.MX: f"10 mx.{ROOT_DOMAIN}.",
+    dns.rdatatype.NS: f"ns1.{ROOT_DOMAIN}.",
+    dns.rdatatype.CNAME: f"edge.{ROOT_DOMAIN}.",
+    dns.rdatatype.SOA: f"ns1.{ROOT_DOMAIN}. admin.{ROOT_DOMAIN}. 1 7200 900 1209600 300",
+    dns.rdatatype.TXT: '"v=spf1 -all"',
+}
+
+
+def crt_sh_app(scenario: Scenario) -> Starlette:
+    async def certificates(request: Request) -> Response:
+        await asyncio.sleep(scenario.crt_latency_ms / 1000)
+        if request.query_params.get("q") != ROOT_DOMAIN:
+            return JSONResponse([])
+
+        async def body() -> AsyncIterator[bytes]:
+            yield b"["
+            for start in range(0, scenario.subdomains, CHUNK_SIZE):
+                items = [
+                    json.dumps(
+                        {
+                            "id": CERTIFICATE_ID_BASE + i,
+                            "entry_timestamp": "2024-01-01T00:00:00",
+                            "name_value": f"{scenario.subdomain(i)}\n*.{scenario.subdomain(i)}",
+                        }
+                    )
+                    for i in range(start, min(start + CHUNK_SIZE, scenario.subdomains))
+                ]
+                yield (b"," if start else b"") + ",".join(items).encode()
+                await asyncio.sleep(0)
+            yield b"]"
+
+        return StreamingResponse(body(), media_type="application/json")
+
+    return Starlette(routes=[Route("/", certificates)])
+
+
+def ip_api_app(scenario: Scenario) -> Starlette:
+    """Serves the fields of both ipwho.is and ipinfo.io in one response."""
+    rng = random.Random(scenario.seed)
+
+    async def ip_info(request: Request) -> Response:
+        await asyncio.sleep(scenario.http_latency_ms / 1000)
+        if rng.random() < scenario.error_rate:
+            return Response(status_code=503)
+        ip = request.path_params["ip"]
+        return JSONResponse(
+            {
+                "ip": ip,
+                "success": True,
+                "city": "Bench City",
+                "country": "Benchland",
+                "connection": {"org": f"AS{hash(ip) % 64512} Bench Networks"},
+                "anycast": ip.endswith(".1"),
+            }
+        )
+
+    return Starlette(routes=[Route("/{ip}", ip_info)])
+
+
+class DnsStandIn(asyncio.DatagramProtocol):
+    """Authoritative answers for the generated names, after a fixed delay."""
+
+    def __init__(self, scenario: Scenario) -> None:
+        self.scenario = scenario
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.DatagramTransport)
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        response = self.answer(dns.message.from_wire(data))
+        assert self.transport is not None
+        asyncio.get_running_loop().call_later(
+            self.scenario.dns_latency_ms / 1000,
+            self.transport.sendto,
+            response.to_wire(),
+            addr,
+        )
+
+    def answer(self, query: dns.message.Message) -> dns.message.Message:
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text(omit_final_dot=True).lower()
+        if self.scenario.index_of(name) is None or self.scenario.is_dead(name):
+            response.set_rcode(dns.rcode.NXDOMAIN)
+            return response
+
+        ip = self.scenario.ip_of(name)
+        records = STATIC_RECORDS | {
+            dns.rdatatype.A: ip,
+            dns.rdatatype.AAAA: "fd00::" + ip.replace(".", ":"),
+        }
+        value = records.get(question.rdtype)
+        if value is not None:
+            response.answer.append(
+                dns.rrset.from_text(question.name, 300, "IN", question.rdtype, value)
+            )
+        return response
+
+
+def _bind(kind: socket.SocketKind) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, kind)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+async def _serve(scenario: Scenario, conn: Connection) -> None:
+    servers: list[tuple[uvicorn.Server, socket.socket]] = []
+    for app in (crt_sh_app(scenario), ip_api_app(scenario)):
+        config = uvicorn.Config(
+            app, log_level="error", access_log=False, lifespan="off"
+        )
+        servers.append((uvicorn.Server(config), _bind(socket.SOCK_STREAM)))
+    tasks = [
+        asyncio.create_task(server.serve(sockets=[sock])) for server, sock in servers
+    ]
+
+    dns_sock = _bind(socket.SOCK_DGRAM)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: DnsStandIn(scenario), sock=dns_sock
+    )
+
+    while not all(server.started for server, _ in servers):
+        await asyncio.sleep(0.01)
+    conn.send(
+        {
+            "crt_sh": servers[0][1].getsockname()[1],
+            "ip_api": servers[1][1].getsockname()[1],
+            "dns": dns_sock.getsockname()[1],
+        }
+    )
+    # Runs until the parent closes its end of the pipe.
+    with contextlib.suppress(EOFError):
+        await loop.run_in_executor(None, conn.recv_bytes)
+    transport.close()
+    for server, _ in servers:
+        server.should_exit = True
+    await asyncio.gather(*tasks)
+
+
+def _main(scenario: dict[str, Any], conn: Connection) -> None:
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(Scenario(**scenario), conn))
+
+
+@contextlib.contextmanager
+def upstreams(scenario: Scenario) -> Iterator[dict[str, int]]:
+    """Starts the stand-ins in a child process and yields their ports."""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    process = ctx.Process(target=_main, args=(scenario.as_dict(), child), daemon=True)
+    process.start()
+    try:
+        if not parent.poll(30):
+            raise RuntimeError("Upstream stand-ins did not start")
+        yield parent.recv()
+    finally:
+        parent.close()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
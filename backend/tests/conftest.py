@@ -1,4 +1,5 @@
 import inspect
+import os
 import typing
 from collections.abc import AsyncIterator, Callable
 from typing import Annotated, TypeVar
@@ -25,8 +26,12 @@ from app.db.models.base import Base
 T = TypeVar("T")
 
 
+# Set to e.g. postgresql+asyncpg://postgres@localhost/test to run the suite on
+# PostgreSQL; the schema is created and dropped there.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
 engine: AsyncEngine = create_async_engine(
-    "sqlite+aiosqlite:///:memory:", echo=False, poolclass=StaticPool
+    TEST_DATABASE_URL, echo=False, poolclass=StaticPool
 )
 
 
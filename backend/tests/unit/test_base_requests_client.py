@@ -1,17 +1,28 @@
+import asyncio
+from collections.abc import AsyncIterator
+
 import httpx
 import pytest
+from prometheus_client import REGISTRY
 
+from app.core.settings import BaseClientSettings
 from app.infrastructure.base import BaseRequestsClient
 
 
-class TestClient(BaseRequestsClient):
-    base_url = "http://test"
-    timeout = 5
+class FakeClientSettings(BaseClientSettings):
+    BASE_URL: str = "http://test"
+    TIMEOUT: int = 5
+
+
+class FakeClient(BaseRequestsClient):
+    pass
 
 
 async def test_get_success(monkeypatch: pytest.MonkeyPatch) -> None:
     async def fake_request(self, method, path, params):  # noqa: ARG001
         class Resp:
+            status_code = 200
+
             def raise_for_status(self) -> None: ...
 
             def json(self) -> dict[str, bool]:
@@ -21,7 +32,7 @@ async def test_get_success(monkeypatch: pytest.MonkeyPatch) -> None:
 
     monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
 
-    client = TestClient()
+    client = FakeClient(FakeClientSettings())
     resp = await client.get("ping")
 
     assert resp == {"ok": True}
@@ -37,7 +48,7 @@ async def test_get_http_error(monkeypatch: pytest.MonkeyPatch) -> None:
 
     monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
 
-    client = TestClient()
+    client = FakeClient(FakeClientSettings())
 
     with pytest.raises(httpx.HTTPStatusError):
         await client.get("fail")
@@ -46,6 +57,8 @@ async def test_get_http_error(monkeypatch: pytest.MonkeyPatch) -> None:
 async def test_get_ip_info(monkeypatch: pytest.MonkeyPatch) -> None:
     async def fake_request(self, method, path, params):  # noqa: ARG001
         class Resp:
+            status_code = 200
+
             def raise_for_status(self) -> None: ...
 
             def json(self) -> dict[str, str]:
@@ -55,7 +68,244 @@ async def test_get_ip_info(monkeypatch: pytest.MonkeyPatch) -> None:
 
     monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
 
-    client = TestClient()
+    client = FakeClient(FakeClientSettings())
     resp = await client.get_ip_info("1.2.3.4")
 
     assert resp == {"ip": "1.2.3.4"}
+
+
+async def test_client_pool_is_reused_between_requests() -> None:
+    client = FakeClient(FakeClientSettings())
+
+    first = client.client
+    second = client.client
+
+    assert first is second
+    await client.aclose()
+
+
+async def test_pool_settings_are_applied() -> None:
+    cfg = FakeClientSettings(MAX_CONNECTIONS=7, KEEPALIVE_EXPIRY=1.5)
+    client = FakeClient(cfg)
+
+    assert client.limits.max_connections == 7
+    assert client.limits.keepalive_expiry == 1.5
+
+
+async def test_aclose_reopens_pool_on_next_use() -> None:
+    client = FakeClient(FakeClientSettings())
+    first = client.client
+
+    await client.aclose()
+
+    assert first.is_closed
+    assert client.client is not first
+    await client.aclose()
+
+
+def make_response(status_code: int, **kwargs: object) -> httpx.Response:
+    return httpx.Response(
+        status_code, request=httpx.Request("GET", "http://test"), **kwargs
+    )
+
+
+@pytest.fixture
+def no_sleep(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    delays: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr("asyncio.sleep", fake_sleep)
+    return delays
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+async def test_retries_on_retryable_status(
+    monkeypatch: pytest.MonkeyPatch, no_sleep: list[float], status_code: int
+) -> None:
+    responses = [make_response(status_code), make_response(200, json={"ok": True})]
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        return responses.pop(0)
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings(MAX_RETRIES=2))
+    resp = await client.get("ping")
+
+    assert resp == {"ok": True}
+    assert len(no_sleep) == 1
+
+
+async def test_retry_honours_retry_after(
+    monkeypatch: pytest.MonkeyPatch, no_sleep: list[float]
+) -> None:
+    responses = [
+        make_response(429, headers={"Retry-After": "7"}),
+        make_response(200, json={}),
+    ]
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        return responses.pop(0)
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings())
+    await client.get("ping")
+
+    assert no_sleep == [7.0]
+
+
+async def test_gives_up_after_max_retries(
+    monkeypatch: pytest.MonkeyPatch, no_sleep: list[float]
+) -> None:
+    calls = 0
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings(MAX_RETRIES=2))
+
+    with pytest.raises(httpx.ConnectError):
+        await client.get("ping")
+    assert calls == 3
+    assert len(no_sleep) == 2
+
+
+async def test_client_errors_are_not_retried(
+    monkeypatch: pytest.MonkeyPatch, no_sleep: list[float]
+) -> None:
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        return make_response(404)
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings())
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get("missing")
+    assert no_sleep == []
+
+
+async def test_responses_are_counted_per_status(
+    monkeypatch: pytest.MonkeyPatch, no_sleep: list[float]
+) -> None:
+    class CountedClient(BaseRequestsClient):
+        pass
+
+    responses = [
+        make_response(503),
+        httpx.ConnectError("refused"),
+        make_response(200, json={"ok": True}),
+    ]
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    await CountedClient(FakeClientSettings()).get("ping")
+
+    def count(status: str) -> float | None:
+        return REGISTRY.get_sample_value(
+            "upstream_responses_total", {"client": "CountedClient", "status": status}
+        )
+
+    assert (count("503"), count("error"), count("200")) == (1.0, 1.0, 1.0)
+    assert len(no_sleep) == 2
+
+
+async def test_concurrency_is_limited(monkeypatch: pytest.MonkeyPatch) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return make_response(200, json={})
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings(MAX_CONCURRENCY=3))
+    await asyncio.gather(*(client.get(str(i)) for i in range(10)))
+
+    assert max_in_flight == 3
+
+
+async def test_iter_json_array_streams_elements() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        for chunk in (b'[{"a": 1},', b' {"a": 2}', b"]"):
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["q"] == "x"
+        return httpx.Response(200, content=chunks())
+
+    client = FakeClient(FakeClientSettings())
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    items = [item async for item in client.iter_json_array(params={"q": "x"})]
+
+    assert items == [{"a": 1}, {"a": 2}]
+    await client.aclose()
+
+
+async def test_iter_json_array_retries_before_first_element(
+    no_sleep: list[float],
+) -> None:
+    responses = [httpx.Response(503), httpx.Response(200, content=b"[1, 2]")]
+
+    def handler(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        return responses.pop(0)
+
+    client = FakeClient(FakeClientSettings())
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    items = [item async for item in client.iter_json_array()]
+
+    assert items == [1, 2]
+    assert len(no_sleep) == 1
+    await client.aclose()
+
+
+async def test_concurrent_ip_lookups_share_one_request(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    paths: list[str] = []
+
+    async def fake_request(self, method, path, params):  # noqa: ARG001
+        paths.append(path)
+        await asyncio.sleep(0.01)
+
+        class Resp:
+            status_code = 200
+
+            def raise_for_status(self) -> None: ...
+
+            def json(self) -> dict[str, str]:
+                return {"ip": path.rsplit("/", 1)[-1]}
+
+        return Resp()
+
+    monkeypatch.setattr(httpx.AsyncClient, "request", fake_request)
+
+    client = FakeClient(FakeClientSettings())
+    results = await asyncio.gather(
+        client.get_ip_info("1.1.1.1"),
+        client.get_ip_info("1.1.1.1"),
+        client.get_ip_info("8.8.8.8"),
+    )
+
+    assert [r["ip"] for r in results] == ["1.1.1.1", "1.1.1.1", "8.8.8.8"]
+    assert len(paths) == 2
@@ -0,0 +1,67 @@
+from typing import Any
+
+from benchmarks.metrics import StageTimer, find_regressions, percentile
+from benchmarks.scenarios import SCENARIOS
+
+
+def result(throughput: float, rss: float, p99: float) -> dict[str, Any]:
+    return {
+        "throughput": throughput,
+        "peak_rss_mb": rss,
+        "stages": {"resolve": {"count": 10, "p50_ms": 1.0, "p99_ms": p99}},
+    }
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+async def test_stage_timer_records_wrapped_calls() -> None:
+    timer = StageTimer()
+
+    async def work(value: int) -> int:
+        return value * 2
+
+    timed = timer.wrap("work", work)
+
+    assert await timed(2) == 4
+    assert timer.summary()["work"]["count"] == 1
+
+
+def test_find_regressions_within_tolerance() -> None:
+    baseline = result(100.0, 100.0, 200.0)
+
+    assert find_regressions(result(90.0, 110.0, 240.0), baseline, 0.25) == []
+
+
+def test_find_regressions_reports_each_metric() -> None:
+    baseline = result(100.0, 100.0, 200.0)
+
+    regressions = find_regressions(result(50.0, 200.0, 400.0), baseline, 0.25)
+
+    assert [r.split()[0] for r in regressions] == ["throughput", "peak", "resolve"]
+
+
+def test_find_regressions_ignores_small_absolute_p99_changes() -> None:
+    baseline = result(100.0, 100.0, 1.0)
+
+    assert find_regressions(result(100.0, 100.0, 3.0), baseline, 0.25) == []
+
+
+def test_find_regressions_skips_p99_of_few_samples() -> None:
+    baseline = result(100.0, 100.0, 200.0)
+    current = result(100.0, 100.0, 400.0)
+    current["stages"]["resolve"]["count"] = 1
+
+    assert find_regressions(current, baseline, 0.25) == []
+
+
+def test_scenario_dead_hosts_follow_ratio() -> None:
+    scenario = SCENARIOS["add-10k"]
+    dead = sum(scenario.is_dead(scenario.subdomain(i)) for i in range(10_000))
+
+    assert abs(dead / 10_000 - scenario.dead_ratio) < 0.02
@@ -0,0 +1,49 @@
+from app.application.candidates import CandidateFilter, to_hostname
+
+
+def test_accepts_names_under_root() -> None:
+    candidates = CandidateFilter("example.com")
+
+    assert candidates("WWW.Example.com.") == "www.example.com"
+    assert candidates("a.b.example.com") == "a.b.example.com"
+    assert not candidates.dropped
+
+
+def test_wildcards_are_reduced_to_the_covered_name() -> None:
+    candidates = CandidateFilter("example.com")
+
+    assert candidates("*.api.example.com") == "api.example.com"
+    assert candidates("*.example.com") is None
+    assert candidates("api.example.com") is None
+    assert candidates.dropped == {"wildcard": 1, "duplicate": 1}
+
+
+def test_suffix_match_requires_label_boundary() -> None:
+    candidates = CandidateFilter("example.com")
+
+    assert candidates("notexample.com") is None
+    assert candidates("example.com.evil.org") is None
+    assert candidates.dropped == {"out_of_scope": 2}
+
+
+def test_invalid_names_are_dropped() -> None:
+    candidates = CandidateFilter("example.com")
+
+    for name in ["foo.*.example.com", "-bad.example.com", "a_b.example.com", ""]:
+        assert candidates(name) is None
+    assert candidates.dropped == {"invalid": 4}
+
+
+def test_unicode_names_are_idna_encoded() -> None:
+    candidates = CandidateFilter("example.com")
+
+    assert candidates("bücher.example.com") == "xn--bcher-kva.example.com"
+    assert candidates("xn--bcher-kva.example.com") is None
+    assert candidates.dropped == {"duplicate": 1}
+
+
+def test_to_hostname() -> None:
+    assert to_hostname(" Example.COM. ") == "example.com"
+    assert to_hostname("bücher.de") == "xn--bcher-kva.de"
+    assert to_hostname("not a domain") is None
+    assert to_hostname("-bad.com") is None
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.core.utils import gather_bounded, normalize_domain
+
+
+def test_normalize_domain() -> None:
+    assert normalize_domain("  HTTPS://user@Example.com:443/path ") == "example.com"
+    assert normalize_domain("   ") == ""
+
+
+async def test_gather_bounded_limits_concurrency_and_keeps_order() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def work(i: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if i == 3:
+            raise RuntimeError("boom")
+        return i
+
+    results = await gather_bounded((work(i) for i in range(8)), limit=2)
+
+    assert max_in_flight == 2
+    assert results[:3] == [0, 1, 2]
+    assert isinstance(results[3], RuntimeError)
+    assert results[4:] == [4, 5, 6, 7]
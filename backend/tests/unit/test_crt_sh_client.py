@@ -0,0 +1,68 @@
+import json
+
+import httpx
+import pytest
+
+from app.core.settings import CrtShClientSettings
+from app.infrastructure.crt_sh_client import CertificateLimitReached, CrtShClient
+
+PAYLOAD = (
+    b'[{"id": 10, "entry_timestamp": "2024-01-01T00:00:00",'
+    b' "name_value": "a.example.com\\nb.example.com"},'
+    b' {"id": 12, "entry_timestamp": "2024-02-01T00:00:00",'
+    b' "name_value": "c.example.com"}]'
+)
+
+
+def make_client(payload: bytes = PAYLOAD, **overrides: object) -> CrtShClient:
+    cfg = CrtShClientSettings(BASE_URL="http://crt.test", RATE_LIMIT=0, **overrides)
+    client = CrtShClient(cfg)
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda _: httpx.Response(200, content=payload))
+    )
+    return client
+
+
+async def test_iter_certificates_splits_name_values() -> None:
+    client = make_client()
+
+    certs = [cert async for cert in client.iter_certificates("example.com")]
+
+    assert [cert.id for cert in certs] == [10, 12]
+    assert certs[0].names == ["a.example.com", "b.example.com"]
+    assert certs[1].entry_timestamp == "2024-02-01T00:00:00"
+    await client.aclose()
+
+
+async def test_iter_certificates_skips_known_ids() -> None:
+    client = make_client()
+
+    certs = [cert async for cert in client.iter_certificates("example.com", 10)]
+
+    assert [cert.names for cert in certs] == [["c.example.com"]]
+    await client.aclose()
+
+
+async def test_iter_certificates_stops_at_certificate_limit() -> None:
+    client = make_client(MAX_CERTIFICATES=1)
+    names: list[str] = []
+
+    with pytest.raises(CertificateLimitReached):
+        async for cert in client.iter_certificates("example.com"):
+            names.extend(cert.names)
+
+    assert names == ["a.example.com", "b.example.com"]
+    await client.aclose()
+
+
+async def test_certificate_limit_counts_only_new_certificates() -> None:
+    payload = json.dumps(
+        [{"id": i, "name_value": f"{i}.example.com"} for i in range(1, 11)]
+    ).encode()
+    client = make_client(payload, MAX_CERTIFICATES=2)
+
+    certs = [cert async for cert in client.iter_certificates("example.com", 8)]
+
+    # Eight cached certificates are skipped without counting toward the limit.
+    assert [cert.id for cert in certs] == [9, 10]
+    await client.aclose()
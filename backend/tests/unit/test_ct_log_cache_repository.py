@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repositories.ct_log_cache import CtLogCacheRepository
+
+
+@pytest.fixture
+def repo(db_session: AsyncSession) -> CtLogCacheRepository:
+    return CtLogCacheRepository(session=db_session)
+
+
+def make_row(**overrides: object) -> dict[str, object]:
+    return {
+        "root_domain": "example.com",
+        "names": ["a.example.com"],
+        "max_certificate_id": 12_000_000_000,
+        "last_entry_timestamp": "2024-01-01T00:00:00",
+        "fetched_at": datetime(2024, 1, 1),
+    } | overrides
+
+
+async def test_upsert_inserts_and_updates(repo: CtLogCacheRepository) -> None:
+    await repo.upsert([make_row(), make_row(root_domain="other.com", names=[])])
+    await repo.upsert([make_row(names=["a.example.com", "b.example.com"])])
+
+    rows = await repo.get_many(["example.com", "missing.com"])
+    await repo._session.refresh(rows[0])
+
+    assert len(rows) == 1
+    assert rows[0].names == ["a.example.com", "b.example.com"]
+    assert rows[0].max_certificate_id == 12_000_000_000
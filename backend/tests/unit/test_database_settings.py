@@ -0,0 +1,36 @@
+from app.core.settings import BASE_DIR, DatabaseSettings
+
+
+def test_sqlite_file_by_default() -> None:
+    cfg = DatabaseSettings(DSN="", DRIVER="sqlite+aiosqlite", NAME="db.sqlite3")
+
+    assert cfg.url == f"sqlite+aiosqlite:///{BASE_DIR}/db.sqlite3"
+    assert not cfg.is_postgresql
+    assert cfg.connect_args == {"timeout": cfg.TIMEOUT}
+
+
+def test_dsn_takes_precedence() -> None:
+    dsn = "postgresql+asyncpg://app:secret@db:5432/domains"
+
+    cfg = DatabaseSettings(DSN=dsn, NAME="ignored.sqlite3")
+
+    assert cfg.url == dsn
+    assert cfg.is_postgresql
+
+
+def test_postgresql_engine_settings() -> None:
+    cfg = DatabaseSettings(
+        DSN="postgresql+asyncpg://db/domains",
+        POOL_SIZE=20,
+        MAX_OVERFLOW=5,
+        POOL_RECYCLE=600,
+        STATEMENT_CACHE_SIZE=0,
+    )
+
+    settings = cfg.engine_settings
+
+    assert (settings["pool_size"], settings["max_overflow"]) == (20, 5)
+    assert settings["pool_recycle"] == 600
+    assert settings["connect_args"]["statement_cache_size"] == 0
+    assert settings["connect_args"]["prepared_statement_cache_size"] == 0
+    assert settings["connect_args"]["server_settings"] == {"timezone": "UTC"}
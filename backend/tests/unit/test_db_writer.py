@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Self, cast
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.core.settings import DatabaseSettings
+from app.core.uow import SaSessionUnitOfWork
+from app.db.models.base import Base
+from app.db.models.ct_log_cache import CtLogCache
+from app.db.providers import create_db_writer, make_async_sessionmaker, new_engine
+from app.db.writer import DbWriter
+
+
+class CountingUow:
+    """Counts transactions and whether each one committed."""
+
+    def __init__(self) -> None:
+        self.outcomes: list[str] = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type: Any, *_: Any) -> None:
+        self.outcomes.append("rollback" if exc_type else "commit")
+
+
+def make_writer(uow: CountingUow, batch_size: int = 64) -> DbWriter:
+    return DbWriter(
+        cast(SaSessionUnitOfWork, uow), batching=True, batch_size=batch_size
+    )
+
+
+def returns(value: int) -> Any:
+    async def fn(_: SaSessionUnitOfWork) -> int:
+        return value
+
+    return fn
+
+
+async def test_queued_writes_share_one_transaction() -> None:
+    uow = CountingUow()
+    writer = make_writer(uow)
+
+    results = await asyncio.gather(*(writer.run(returns(i)) for i in range(10)))
+    await writer.aclose()
+
+    assert results == list(range(10))
+    assert uow.outcomes == ["commit"]
+
+
+async def test_batch_size_limits_transaction() -> None:
+    uow = CountingUow()
+    writer = make_writer(uow, batch_size=4)
+
+    await asyncio.gather(*(writer.run(returns(i)) for i in range(10)))
+    await writer.aclose()
+
+    assert uow.outcomes == ["commit"] * 3
+
+
+async def test_failing_write_does_not_fail_the_batch() -> None:
+    uow = CountingUow()
+    writer = make_writer(uow)
+
+    async def fail(_: SaSessionUnitOfWork) -> int:
+        raise ValueError("constraint")
+
+    results = await asyncio.gather(
+        writer.run(returns(1)),
+        writer.run(fail),
+        writer.run(returns(3)),
+        return_exceptions=True,
+    )
+    await writer.aclose()
+
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 3
+    # The batch is rolled back, then every write is retried on its own.
+    assert uow.outcomes == ["rollback", "commit", "rollback", "commit"]
+
+
+async def test_direct_mode_runs_each_write_in_its_own_transaction() -> None:
+    uow = CountingUow()
+    writer = DbWriter(cast(SaSessionUnitOfWork, uow))
+
+    assert await writer.run(returns(1)) == 1
+    assert await writer.run(returns(2)) == 2
+    assert uow.outcomes == ["commit", "commit"]
+
+
+async def test_closed_writer_fails_pending_writes() -> None:
+    writer = make_writer(CountingUow())
+    blocked = asyncio.Event()
+
+    async def wait(_: SaSessionUnitOfWork) -> None:
+        await blocked.wait()
+
+    pending = asyncio.ensure_future(writer.run(wait))
+    await asyncio.sleep(0)
+    await writer.aclose()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        await pending
+
+
+async def test_sqlite_profile(tmp_path: Path) -> None:
+    cfg = DatabaseSettings(DSN=f"sqlite+aiosqlite:///{tmp_path}/db.sqlite3")
+    engine = new_engine(cfg)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        journal_mode = await conn.scalar(text("PRAGMA journal_mode"))
+        synchronous = await conn.scalar(text("PRAGMA synchronous"))
+        busy_timeout = await conn.scalar(text("PRAGMA busy_timeout"))
+    sessionmaker = await make_async_sessionmaker(engine)
+
+    async with create_db_writer(cfg, sessionmaker) as writer:
+        assert writer.batching
+
+        async def store(i: int) -> None:
+            row = {
+                "root_domain": f"r{i}.test",
+                "names": [],
+                "max_certificate_id": 0,
+                "last_entry_timestamp": None,
+                "fetched_at": datetime(2024, 1, 1),
+            }
+            await writer.run(lambda uow: uow.ct_log_cache.upsert([row]))
+
+        async def count() -> int:
+            async with sessionmaker() as session:
+                return await session.scalar(select(func.count(CtLogCache.id))) or 0
+
+        # Reads on the main pool run alongside the writer.
+        counts = asyncio.gather(*(count() for _ in range(20)))
+        await asyncio.gather(*(store(i) for i in range(200)))
+        seen = await counts
+    total = await count()
+    await engine.dispose()
+
+    assert (journal_mode, synchronous, busy_timeout) == ("wal", 1, 5000)
+    assert all(0 <= n <= 200 for n in seen)
+    assert total == 200
@@ -0,0 +1,107 @@
+import dns.message
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import pytest
+
+from app.core.settings import DnsResolverSettings
+from app.infrastructure.dns_cache import DnsCache
+
+
+@pytest.fixture
+def cache() -> DnsCache:
+    return DnsCache(
+        DnsResolverSettings(CACHE_MAX_SIZE=2, CACHE_MAX_TTL=600, CACHE_NEGATIVE_TTL=30)
+    )
+
+
+def make_nxdomain_response(soa_ttl: int, minimum: int) -> dns.message.Message:
+    query = dns.message.make_query("missing.example.com", "A")
+    response = dns.message.make_response(query)
+    response.authority.append(
+        dns.rrset.from_text(
+            "example.com.",
+            soa_ttl,
+            "IN",
+            "SOA",
+            f"ns.example.com. admin.example.com. 1 3600 600 86400 {minimum}",
+        )
+    )
+    return response
+
+
+class TestDnsCache:
+    def test_miss_then_hit(self, cache: DnsCache) -> None:
+        assert cache.get("example.com", "A") is None
+
+        cache.set("example.com", "A", ["1.2.3.4"], ttl=60)
+        entry = cache.get("Example.com.", "a")
+
+        assert entry is not None
+        assert entry.records == ["1.2.3.4"]
+        assert cache.stats() == {
+            "size": 1,
+            "max_size": 2,
+            "hits": 1,
+            "misses": 1,
+            "hit_ratio": 0.5,
+        }
+
+    def test_expired_entry_is_evicted(
+        self, cache: DnsCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = 1000.0
+        monkeypatch.setattr("time.monotonic", lambda: now)
+        cache.set("example.com", "A", ["1.2.3.4"], ttl=60)
+
+        now += 61
+
+        assert cache.get("example.com", "A") is None
+        assert cache.stats()["size"] == 0
+
+    def test_ttl_is_capped(
+        self, cache: DnsCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("time.monotonic", lambda: 0.0)
+        cache.set("example.com", "A", ["1.2.3.4"], ttl=86400)
+
+        entry = cache.get("example.com", "A")
+
+        assert entry is not None
+        assert entry.expires_at == 600
+
+    def test_lru_eviction(self, cache: DnsCache) -> None:
+        cache.set("a.com", "A", ["1.1.1.1"], ttl=60)
+        cache.set("b.com", "A", ["2.2.2.2"], ttl=60)
+        cache.get("a.com", "A")
+        cache.set("c.com", "A", ["3.3.3.3"], ttl=60)
+
+        assert cache.get("b.com", "A") is None
+        assert cache.get("a.com", "A") is not None
+        assert cache.get("c.com", "A") is not None
+
+    def test_negative_ttl_from_soa_minimum(
+        self, cache: DnsCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("time.monotonic", lambda: 0.0)
+        response = make_nxdomain_response(soa_ttl=900, minimum=120)
+        qname = response.question[0].name
+        error = dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: response})
+
+        cache.set_negative("missing.example.com", "A", error)
+        entry = cache.get("missing.example.com", "A")
+
+        assert entry is not None
+        assert entry.error is error
+        assert entry.expires_at == 120
+
+    def test_negative_ttl_default_without_soa(
+        self, cache: DnsCache, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("time.monotonic", lambda: 0.0)
+
+        cache.set_negative("missing.example.com", "A", dns.resolver.NXDOMAIN())
+        entry = cache.get("missing.example.com", "A")
+
+        assert entry is not None
+        assert entry.expires_at == 30
@@ -0,0 +1,119 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import dns.resolver
+import pytest
+
+from app.core.settings import DnsResolverSettings
+from app.infrastructure.dns_cache import DnsCache
+from app.infrastructure.dns_resolver import DnsResolver
+
+
+class FakeRdata:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def to_text(self) -> str:
+        return self.text
+
+
+class FakeRRset:
+    ttl = 300
+
+
+class FakeAnswer(list[FakeRdata]):
+    rrset = FakeRRset()
+
+
+@pytest.fixture
+def cfg() -> DnsResolverSettings:
+    return DnsResolverSettings(
+        NAMESERVERS=["127.0.0.1"],
+        TIMEOUT=1.0,
+        LIFETIME=2.0,
+        MAX_CONCURRENT_QUERIES=2,
+    )
+
+
+@pytest.fixture
+def resolver(cfg: DnsResolverSettings) -> DnsResolver:
+    return DnsResolver(cfg, DnsCache(cfg))
+
+
+def test_resolver_is_configured_from_settings(resolver: DnsResolver) -> None:
+    assert resolver._resolver.nameservers == ["127.0.0.1"]
+    assert resolver._resolver.timeout == 1.0
+    assert resolver._resolver.lifetime == 2.0
+
+
+async def test_resolve_returns_text_records(resolver: DnsResolver) -> None:
+    resolver._resolver.resolve = AsyncMock(
+        return_value=FakeAnswer([FakeRdata("1.2.3.4")])
+    )
+
+    result = await resolver.resolve("example.com", "A")
+
+    assert result == ["1.2.3.4"]
+    resolver._resolver.resolve.assert_awaited_once_with("example.com", "A")
+
+
+async def test_resolve_limits_in_flight_queries(
+    cfg: DnsResolverSettings, resolver: DnsResolver
+) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_resolve(name: str, rdtype: str) -> FakeAnswer:  # noqa: ARG001
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return FakeAnswer()
+
+    resolver._resolver.resolve = fake_resolve
+
+    await asyncio.gather(*(resolver.resolve(f"{i}.example.com", "A") for i in range(6)))
+
+    assert max_in_flight == cfg.MAX_CONCURRENT_QUERIES
+
+
+async def test_resolve_serves_repeated_lookups_from_cache(
+    resolver: DnsResolver,
+) -> None:
+    resolver._resolver.resolve = AsyncMock(
+        return_value=FakeAnswer([FakeRdata("1.2.3.4")])
+    )
+
+    first = await resolver.resolve("example.com", "A")
+    second = await resolver.resolve("EXAMPLE.com.", "A")
+
+    assert first == second == ["1.2.3.4"]
+    resolver._resolver.resolve.assert_awaited_once()
+    assert resolver.cache.hits == 1
+
+
+async def test_resolve_caches_nxdomain(resolver: DnsResolver) -> None:
+    resolver._resolver.resolve = AsyncMock(side_effect=dns.resolver.NXDOMAIN())
+
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        await resolver.resolve("missing.example.com", "A")
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        await resolver.resolve("missing.example.com", "A")
+
+    resolver._resolver.resolve.assert_awaited_once()
+
+
+async def test_concurrent_misses_share_one_query(resolver: DnsResolver) -> None:
+    async def slow_resolve(name: str, rdtype: str) -> FakeAnswer:
+        await asyncio.sleep(0.01)
+        return FakeAnswer([FakeRdata("1.2.3.4")])
+
+    resolver._resolver.resolve = AsyncMock(side_effect=slow_resolve)
+
+    results = await asyncio.gather(
+        resolver.resolve("example.com", "A"), resolver.resolve("EXAMPLE.com.", "A")
+    )
+
+    assert results == [["1.2.3.4"], ["1.2.3.4"]]
+    resolver._resolver.resolve.assert_awaited_once()
@@ -1,7 +1,11 @@
+from datetime import datetime
+from typing import Any
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import DomainTypes
+from app.db.models.domain_info import DomainInfo
 from app.db.repositories.domain_info import DomainInfoRepository
 
 
@@ -10,17 +14,15 @@ def repo(db_session: AsyncSession) -> DomainInfoRepository:
     return DomainInfoRepository(session=db_session)
 
 
-async def test_add_domain_info(repo: DomainInfoRepository) -> None:
-    data = {"domain_name": "example.com", "domain_type": DomainTypes.ROOT}
-
-    obj = await repo.add_domain_info(data)
-
-    assert obj.id is not None
-    assert obj.domain_name == "example.com"
+async def add_domain(repo: DomainInfoRepository, data: dict[str, Any]) -> DomainInfo:
+    obj = DomainInfo(**data)
+    repo._session.add(obj)
+    await repo._session.flush()
+    return obj
 
 
 async def test_get_by_domain_name_found(repo: DomainInfoRepository) -> None:
-    await repo.add_domain_info({"domain_name": "example.com"})
+    await add_domain(repo, {"domain_name": "example.com"})
 
     obj = await repo.get_by_domain_name("example.com")
 
@@ -28,23 +30,19 @@ async def test_get_by_domain_name_found(repo: DomainInfoRepository) -> None:
     assert obj.domain_name == "example.com"
 
 
-async def test_get_domain_names(repo: DomainInfoRepository) -> None:
-    await repo.add_domain_info({"domain_name": "a.com"})
-    await repo.add_domain_info({"domain_name": "b.com"})
+async def test_get_existing_names(repo: DomainInfoRepository) -> None:
+    await add_domain(repo, {"domain_name": "a.com"})
+    await add_domain(repo, {"domain_name": "b.com"})
 
-    result = await repo.get_domain_names()
+    existing = await repo.get_existing_names(["a.com", "c.com"])
 
-    names = [name for _, name in result]
-    assert "a.com" in names
-    assert "b.com" in names
+    assert existing == {"a.com"}
 
 
 async def test_get_root_domain_names(repo: DomainInfoRepository) -> None:
-    await repo.add_domain_info(
-        {"domain_name": "root.com", "domain_type": DomainTypes.ROOT}
-    )
-    await repo.add_domain_info(
-        {"domain_name": "sub.com", "domain_type": DomainTypes.SUBDOMAIN}
+    await add_domain(repo, {"domain_name": "root.com", "domain_type": DomainTypes.ROOT})
+    await add_domain(
+        repo, {"domain_name": "sub.com", "domain_type": DomainTypes.SUBDOMAIN}
     )
 
     roots = await repo.get_root_domain_names()
@@ -54,7 +52,7 @@ async def test_get_root_domain_names(repo: DomainInfoRepository) -> None:
 
 async def test_get_domains_info_paginated(repo: DomainInfoRepository) -> None:
     for i in range(5):
-        await repo.add_domain_info({"domain_name": f"site{i}.com"})
+        await add_domain(repo, {"domain_name": f"site{i}.com"})
 
     total, items = await repo.get_domains_info(limit=2, offset=0)
 
@@ -62,22 +60,82 @@ async def test_get_domains_info_paginated(repo: DomainInfoRepository) -> None:
     assert len(items) == 2
 
 
-async def test_bulk_insert(repo: DomainInfoRepository) -> None:
+async def test_get_domains_info_keyset(repo: DomainInfoRepository) -> None:
+    for name in ["c.com", "a.com", "b.com"]:
+        await add_domain(repo, {"domain_name": name})
+
+    _, first = await repo.get_domains_info(limit=2)
+    total, rest = await repo.get_domains_info(
+        limit=2, cursor=first[-1].domain_name, include_total=False
+    )
+
+    assert [obj.domain_name for obj in first + rest] == ["a.com", "b.com", "c.com"]
+    assert total is None
+
+
+async def test_get_domains_info_filters(repo: DomainInfoRepository) -> None:
+    await add_domain(
+        repo,
+        {"domain_name": "example.com", "root_domain": "example.com", "is_active": True},
+    )
+    await add_domain(
+        repo, {"domain_name": "www.example.com", "root_domain": "example.com"}
+    )
+    await add_domain(repo, {"domain_name": "other.com", "root_domain": "other.com"})
+
+    total, items = await repo.get_domains_info(
+        limit=10, filters={"root_domain": "example.com", "is_active": True}
+    )
+
+    assert total == 1
+    assert [obj.domain_name for obj in items] == ["example.com"]
+
+
+async def test_upsert_inserts_new_rows(repo: DomainInfoRepository) -> None:
     data = [
         {"domain_name": "a.com"},
         {"domain_name": "b.com"},
     ]
 
-    objs = await repo.bulk_insert(data)
+    await repo.upsert(data)
 
-    assert len(objs) == 2
+    _, objs = await repo.get_domains_info(limit=10)
+    assert [obj.domain_name for obj in objs] == ["a.com", "b.com"]
+    assert all(obj.id is not None for obj in objs)
 
 
-async def test_update_domains_info(repo: DomainInfoRepository) -> None:
-    obj = await repo.add_domain_info({"domain_name": "update.com"})
+async def test_upsert_updates_existing_rows(repo: DomainInfoRepository) -> None:
+    obj = await add_domain(
+        repo, {"domain_name": "update.com", "updated_at": datetime(2020, 1, 1)}
+    )
 
-    await repo.update_domains_info([{"id": obj.id, "domain_name": "updated.com"}])
+    await repo.upsert(
+        [
+            {"id": None, "domain_name": "update.com", "ip_address": "1.2.3.4"},
+            {"id": None, "domain_name": "new.com", "ip_address": "5.6.7.8"},
+        ],
+        batch_size=1,
+    )
+
+    total, _ = await repo.get_domains_info(limit=10)
+    await repo._session.refresh(obj)
+    assert total == 2
+    assert obj.ip_address == "1.2.3.4"
+    assert obj.updated_at > datetime(2020, 1, 1)
+
+
+async def test_get_stale_domain_names(repo: DomainInfoRepository) -> None:
+    fresh = await add_domain(repo, {"domain_name": "fresh.com"})
+    stale = [
+        await add_domain(
+            repo, {"domain_name": f"stale{i}.com", "updated_at": datetime(2020, 1, 1)}
+        )
+        for i in range(3)
+    ]
+    cutoff = datetime(2021, 1, 1)
 
-    updated = await repo.get_by_domain_name("updated.com")
+    first = await repo.get_stale_domain_names(cutoff, after_id=None, limit=2)
+    rest = await repo.get_stale_domain_names(cutoff, after_id=first[-1][0], limit=2)
 
-    assert updated is not None
+    assert [id_ for id_, _ in first + rest] == [obj.id for obj in stale]
+    assert fresh.id not in {id_ for id_, _ in first + rest}
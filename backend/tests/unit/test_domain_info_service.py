@@ -1,11 +1,23 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock
 
+import dns.resolver
+import httpx
 import pytest
+from fastapi import HTTPException
 
-from app.application.domain_info import DomainInfoService
+from app.application.ct_log import CtLogState
+from app.application.domain_info import DomainInfoService, ScanProgress
 from app.core.enums import DomainTypes
+from app.core.settings import DomainParserSettings, ScanSettings
 from app.db.models.domain_info import DomainInfo
+from app.db.models.ip_info import IpInfo
+from app.db.writer import DbWriter
+from app.infrastructure.crt_sh_client import Certificate, CertificateLimitReached
+from app.infrastructure.domain_parser import DomainParser
 
 
 @pytest.fixture
@@ -20,6 +32,10 @@ def uow():
     uow.__aexit__.return_value = None
 
     uow.domain_info = AsyncMock()
+    uow.ip_info = AsyncMock()
+    uow.ip_info.get_fresh.return_value = []
+    uow.ct_log_cache = AsyncMock()
+    uow.ct_log_cache.get_many.return_value = []
     return uow
 
 
@@ -38,108 +54,105 @@ def ipinfo_client() -> AsyncMock:
     return AsyncMock()
 
 
+@pytest.fixture
+def dns_resolver() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture(scope="module")
+def domain_parser() -> DomainParser:
+    return DomainParser(DomainParserSettings())
+
+
 @pytest.fixture
 def service(
     uow: AsyncMock,
     crt_client: AsyncMock,
     ipwhois_client: AsyncMock,
     ipinfo_client: AsyncMock,
+    dns_resolver: AsyncMock,
+    domain_parser: DomainParser,
 ) -> DomainInfoService:
     return DomainInfoService(
         uow=uow,
+        writer=DbWriter(uow),
         crt_sh_cl=crt_client,
         ip_who_is_cl=ipwhois_client,
         ip_info_cl=ipinfo_client,
+        dns_resolver=dns_resolver,
+        domain_parser=domain_parser,
+        scan_cfg=ScanSettings(),
     )
 
 
 class TestResolveIp:
-    async def test_resolve_ip_uses_socket_gethostbyname(
-        self, monkeypatch: pytest.MonkeyPatch
+    async def test_resolve_ip_uses_a_record(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
     ) -> None:
-        called_with: dict[str, Any] = {}
-
-        def fake_gethostbyname(host: str) -> str:
-            called_with["host"] = host
-            return "1.2.3.4"
-
-        async def fake_to_thread(fn, *args, **kwargs):
-            return fn(*args, **kwargs)
+        dns_resolver.resolve.return_value = ["1.2.3.4", "5.6.7.8"]
 
-        monkeypatch.setattr("socket.gethostbyname", fake_gethostbyname)
-        monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
+        result = await service.resolve_ip("example.com")
 
-        result = await DomainInfoService.resolve_ip("example.com")
         assert result == "1.2.3.4"
-        assert called_with["host"] == "example.com"
+        dns_resolver.resolve.assert_awaited_once_with("example.com", "A")
 
+    async def test_resolve_ip_falls_back_to_aaaa(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        dns_resolver.resolve.side_effect = [dns.resolver.NoAnswer(), ["2001:db8::1"]]
 
-class TestGetDomainType:
-    async def test_root_domain(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        class FakeExtract:
-            subdomain = ""
-
-        async def fake_to_thread(fn, *args, **kwargs):
-            return FakeExtract()
+        result = await service.resolve_ip("v6.example.com")
 
-        monkeypatch.setattr("tldextract.extract", MagicMock())
-        monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
+        assert result == "2001:db8::1"
 
-        result = await DomainInfoService.get_domain_type("example.com")
-        assert result == DomainTypes.ROOT
+    async def test_resolve_ip_returns_none_for_dead_name(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        dns_resolver.resolve.side_effect = dns.resolver.NXDOMAIN()
 
-    async def test_subdomain(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        class FakeExtract:
-            subdomain = "www"
+        result = await service.resolve_ip("dead.example.com")
 
-        async def fake_to_thread(fn, *args, **kwargs):
-            return FakeExtract()
+        assert result is None
+        dns_resolver.resolve.assert_awaited_once_with("dead.example.com", "A")
 
-        monkeypatch.setattr("tldextract.extract", MagicMock())
-        monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
 
-        result = await DomainInfoService.get_domain_type("www.example.com")
-        assert result == DomainTypes.SUBDOMAIN
+class TestGetDomainType:
+    @pytest.mark.parametrize(
+        ("domain", "expected"),
+        [
+            ("example.com", DomainTypes.ROOT),
+            ("example.co.uk", DomainTypes.ROOT),
+            ("www.example.com", DomainTypes.SUBDOMAIN),
+            ("a.b.example.co.uk", DomainTypes.SUBDOMAIN),
+        ],
+    )
+    def test_domain_type(
+        self, service: DomainInfoService, domain: str, expected: DomainTypes
+    ) -> None:
+        assert service.get_domain_type(domain) == expected
 
 
 class TestGetDnsSettings:
     async def test_dns_settings_success(
-        self, monkeypatch: pytest.MonkeyPatch, service: DomainInfoService
+        self, service: DomainInfoService, dns_resolver: AsyncMock
     ) -> None:
-        class FakeAnswer:
-            def to_text(self) -> str:
-                return "1.2.3.4"
-
-        def fake_resolve(domain: str, record: str):
+        async def fake_resolve(domain: str, record: str) -> list[str]:
             assert domain == "example.com"
-            assert record == "A"
-            return [FakeAnswer()]
+            return {"A": ["1.2.3.4"], "MX": ["10 mx.example.com."]}.get(record, [])
 
-        async def fake_to_thread(fn, *args, **kwargs):
-            return fake_resolve(*args, **kwargs)
-
-        monkeypatch.setattr("dns.resolver.resolve", fake_resolve)
-        monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
-        # limit record types to A only for deterministic test
-        service.DNS_RECORD_TYPES = ["A"]
+        dns_resolver.resolve.side_effect = fake_resolve
 
         result = await service.get_dns_settings("example.com")
-        assert result == {"A": ["1.2.3.4"]}
+        assert result == {"A": ["1.2.3.4"], "MX": ["10 mx.example.com."]}
+        assert dns_resolver.resolve.await_count == len(service.DNS_RECORD_TYPES)
 
     async def test_dns_settings_error_logged_and_skipped(
         self,
-        monkeypatch: pytest.MonkeyPatch,
         service: DomainInfoService,
+        dns_resolver: AsyncMock,
         caplog: pytest.LogCaptureFixture,
     ) -> None:
-        def fake_resolve(domain: str, record: str):
-            raise RuntimeError("boom")
-
-        async def fake_to_thread(fn, *args, **kwargs):
-            return fake_resolve(*args, **kwargs)
-
-        monkeypatch.setattr("dns.resolver.resolve", fake_resolve)
-        monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
+        dns_resolver.resolve.side_effect = RuntimeError("boom")
         service.DNS_RECORD_TYPES = ["A"]
 
         with caplog.at_level("ERROR"):
@@ -148,6 +161,38 @@ class TestGetDnsSettings:
         assert result == {}
         assert any("Failed to resolve" in msg for msg in caplog.messages)
 
+    async def test_dns_settings_queries_record_types_concurrently(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_resolve(domain: str, record: str) -> list[str]:  # noqa: ARG001
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return []
+
+        dns_resolver.resolve.side_effect = fake_resolve
+
+        await service.get_dns_settings("example.com")
+
+        assert max_in_flight == len(service.DNS_RECORD_TYPES)
+
+
+def certificates(*items: tuple[int, str]) -> Any:
+    async def fake_iter_certificates(
+        domain: str,  # noqa: ARG001
+        after_id: int = 0,
+    ) -> AsyncIterator[Certificate]:
+        for cert_id, names in items:
+            if cert_id > after_id:
+                yield Certificate(cert_id, f"2024-01-0{cert_id}T00:00:00", [names])
+
+    return fake_iter_certificates
+
 
 class TestGetTargetDomains:
     async def test_get_target_domains_filters_and_deduplicates(
@@ -155,18 +200,123 @@ class TestGetTargetDomains:
         service: DomainInfoService,
         crt_client: AsyncMock,
     ) -> None:
-        service.crt_sh_cl = crt_client
-        crt_client.get_subdomains.return_value = [
-            {"name_value": "a.example.com\nb.other.com"},
-            {"name_value": "example.com"},
-        ]
+        crt_client.iter_certificates = certificates(
+            (1, "a.example.com"),
+            (2, "b.other.com"),
+            (3, "A.example.com"),
+            (4, "*.example.com"),
+            (5, "notexample.com"),
+        )
 
         result = await service.get_target_domains("example.com")
-        assert set(result) == {"example.com", "a.example.com"}
+        assert result == ["example.com", "a.example.com"]
+
+    async def test_only_newer_certificates_are_read(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+    ) -> None:
+        crt_client.iter_certificates = certificates(
+            (1, "a.example.com"), (2, "b.example.com"), (3, "c.example.com")
+        )
+        state = CtLogState(
+            "example.com",
+            names=["a.example.com", "b.example.com"],
+            max_certificate_id=2,
+            fetched_at=datetime(2024, 1, 1),
+        )
+
+        result = await service.get_target_domains("example.com", state)
+
+        assert result == [
+            "example.com",
+            "a.example.com",
+            "b.example.com",
+            "c.example.com",
+        ]
+        assert state.names == ["a.example.com", "b.example.com", "c.example.com"]
+        assert state.max_certificate_id == 3
+        assert state.last_entry_timestamp == "2024-01-03T00:00:00"
+        assert not state.stale
+
+    async def test_cached_names_are_served_when_crt_sh_fails(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+    ) -> None:
+        async def failing(domain: str, after_id: int = 0) -> AsyncIterator[Certificate]:  # noqa: ARG001
+            raise httpx.ReadTimeout("crt.sh timed out")
+            yield
+
+        crt_client.iter_certificates = failing
+        fetched_at = datetime(2024, 1, 1)
+        state = CtLogState(
+            "example.com",
+            names=["a.example.com"],
+            max_certificate_id=7,
+            fetched_at=fetched_at,
+        )
+
+        result = await service.get_target_domains("example.com", state)
+
+        assert result == ["example.com", "a.example.com"]
+        assert state.stale
+        assert (state.max_certificate_id, state.fetched_at) == (7, fetched_at)
+
+    async def test_failure_without_cache_is_raised(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+    ) -> None:
+        async def failing(domain: str, after_id: int = 0) -> AsyncIterator[Certificate]:  # noqa: ARG001
+            raise httpx.ReadTimeout("crt.sh timed out")
+            yield
+
+        crt_client.iter_certificates = failing
+
+        with pytest.raises(httpx.ReadTimeout):
+            await service.get_target_domains("example.com")
+
+    async def test_truncated_read_keeps_names_but_not_the_high_water_mark(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+    ) -> None:
+        async def truncated(
+            domain: str, after_id: int = 0
+        ) -> AsyncIterator[Certificate]:  # noqa: ARG001
+            yield Certificate(9, None, ["a.example.com"])
+            raise CertificateLimitReached(domain)
+
+        crt_client.iter_certificates = truncated
+        state = CtLogState("example.com")
+
+        await service.get_target_domains("example.com", state)
+
+        assert state.names == ["a.example.com"]
+        assert state.max_certificate_id == 0
+        assert state.fetched_at is not None
+
+    async def test_scan_persists_the_ct_state(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+        dns_resolver: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        crt_client.iter_certificates = certificates((4, "a.example.com"))
+        dns_resolver.resolve.side_effect = dns.resolver.NXDOMAIN()
 
+        await service.handle_domain_name("example.com")
 
-class TestCollectDomainInfo:
-    async def test_collect_domain_info_aggregates_clients(
+        (rows,), _ = uow.ct_log_cache.upsert.await_args
+        assert rows[0]["root_domain"] == "example.com"
+        assert rows[0]["names"] == ["a.example.com"]
+        assert rows[0]["max_certificate_id"] == 4
+
+
+class TestCollectDomainsInfo:
+    async def test_collect_domains_info_aggregates_clients(
         self,
         monkeypatch: pytest.MonkeyPatch,
         service: DomainInfoService,
@@ -176,7 +326,7 @@ class TestCollectDomainInfo:
         async def fake_resolve_ip(host: str) -> str:
             return "1.2.3.4"
 
-        async def fake_get_domain_type(domain: str) -> DomainTypes:
+        def fake_get_domain_type(domain: str) -> DomainTypes:
             return DomainTypes.ROOT
 
         service.ip_who_is_cl = ipwhois_client
@@ -198,7 +348,7 @@ class TestCollectDomainInfo:
         monkeypatch.setattr(service, "get_dns_settings", fake_get_dns_settings)
 
         data = {"domain_name": "example.com"}
-        result = await service.collect_domain_info(data)
+        [result] = await service.collect_domains_info([data])
 
         assert result["ip_address"] == "1.2.3.4"
         assert result["domain_type"] == DomainTypes.ROOT
@@ -209,6 +359,131 @@ class TestCollectDomainInfo:
         assert result["is_anycast_node"] is True
         assert result["dns_settings"] == {"A": ["1.2.3.4"]}
 
+    async def test_dead_names_are_stored_inactive_without_enrichment(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+    ) -> None:
+        async def fake_resolve_ip(host: str) -> None:  # noqa: ARG001
+            return None
+
+        def fake_get_domain_type(domain: str) -> DomainTypes:  # noqa: ARG001
+            return DomainTypes.SUBDOMAIN
+
+        get_dns_settings = AsyncMock()
+        monkeypatch.setattr(service, "resolve_ip", fake_resolve_ip)
+        monkeypatch.setattr(service, "get_domain_type", fake_get_domain_type)
+        monkeypatch.setattr(service, "get_dns_settings", get_dns_settings)
+
+        [result] = await service.collect_domains_info(
+            [{"domain_name": "dead.example.com"}]
+        )
+
+        assert result["is_active"] is False
+        assert result["ip_address"] is None
+        assert result["domain_type"] == DomainTypes.SUBDOMAIN
+        get_dns_settings.assert_not_awaited()
+        ipwhois_client.get_ip_info.assert_not_awaited()
+        ipinfo_client.get_ip_info.assert_not_awaited()
+
+    async def test_ip_apis_called_once_per_unique_ip(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        ips = {
+            "a.example.com": "1.1.1.1",
+            "b.example.com": "1.1.1.1",
+            "c.example.com": "2.2.2.2",
+        }
+
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": ips[data["domain_name"]]}
+
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        ipwhois_client.get_ip_info.return_value = {"success": True}
+        ipinfo_client.get_ip_info.return_value = {}
+
+        result = await service.collect_domains_info([{"domain_name": d} for d in ips])
+
+        assert len(result) == 3
+        assert ipwhois_client.get_ip_info.await_count == 2
+        assert ipinfo_client.get_ip_info.await_count == 2
+        uow.ip_info.upsert.assert_awaited_once()
+        args, _ = uow.ip_info.upsert.await_args
+        assert {row["ip_address"] for row in args[0]} == {"1.1.1.1", "2.2.2.2"}
+
+    async def test_fresh_cached_ips_are_not_refetched(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": "1.1.1.1"}
+
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        uow.ip_info.get_fresh.return_value = [
+            IpInfo(
+                ip_address="1.1.1.1",
+                geo_city="Cached City",
+                geo_country="CC",
+                network_owner_name="Cached Org",
+                is_active=True,
+                is_anycast_node=False,
+            )
+        ]
+
+        [result] = await service.collect_domains_info([{"domain_name": "a.com"}])
+
+        assert result["geo_city"] == "Cached City"
+        ipwhois_client.get_ip_info.assert_not_awaited()
+        ipinfo_client.get_ip_info.assert_not_awaited()
+        uow.ip_info.upsert.assert_not_awaited()
+
+    async def test_failed_cache_write_keeps_fetched_data(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": "1.1.1.1"}
+
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        ipwhois_client.get_ip_info.return_value = {"city": "Fetched"}
+        ipinfo_client.get_ip_info.return_value = {}
+        uow.ip_info.upsert.side_effect = RuntimeError("database is locked")
+
+        [result] = await service.collect_domains_info([{"domain_name": "a.com"}])
+
+        assert result["geo_city"] == "Fetched"
+
+    async def test_domain_dropped_when_ip_lookup_fails(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        ipwhois_client: AsyncMock,
+    ) -> None:
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": "1.1.1.1"}
+
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        ipwhois_client.get_ip_info.side_effect = RuntimeError("429")
+
+        result = await service.collect_domains_info([{"domain_name": "a.com"}])
+
+        assert result == []
+
 
 class TestHandleDomainName:
     async def test_handle_domain_name_filters_failed_tasks(
@@ -219,48 +494,441 @@ class TestHandleDomainName:
     ) -> None:
         domains = ["a.example.com", "b.example.com"]
 
-        async def fake_get_target_domains(domain: str) -> list[str]:
-            return domains
+        async def fake_iter_target_domains(
+            domain: str,  # noqa: ARG001
+            dropped: Any = None,  # noqa: ARG001
+            ct_state: Any = None,  # noqa: ARG001
+        ) -> AsyncIterator[str]:
+            for name in domains:
+                yield name
 
-        async def fake_collect_domain_info_ok(data: dict[str, Any]) -> dict[str, Any]:
+        async def fake_resolve_domain_ok(data: dict[str, Any]) -> dict[str, Any]:
             if data["domain_name"] == "a.example.com":
-                return {"domain_name": "a.example.com"}
+                return {"domain_name": "a.example.com", "ip_address": "1.2.3.4"}
             raise RuntimeError("boom")
 
-        monkeypatch.setattr(service, "get_target_domains", fake_get_target_domains)
-        monkeypatch.setattr(service, "collect_domain_info", fake_collect_domain_info_ok)
+        async def fake_get_ips_info(ips: Any) -> dict[str, dict[str, Any]]:
+            return {ip: {} for ip in ips}
+
+        monkeypatch.setattr(service, "iter_target_domains", fake_iter_target_domains)
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain_ok)
+        monkeypatch.setattr(service, "get_ips_info", fake_get_ips_info)
 
-        fake_domain = DomainInfo(domain_name="a.example.com")
-        fake_domain_2 = DomainInfo(domain_name="b.example.com")
-        uow.domain_info.bulk_insert.return_value = [fake_domain, fake_domain_2]
+        progress = ScanProgress()
 
-        result = await service.handle_domain_name("example.com")
-        assert result == [fake_domain, fake_domain_2]
-        uow.domain_info.bulk_insert.assert_awaited_once()
-        args, _ = uow.domain_info.bulk_insert.await_args
-        assert args[0] == [{"domain_name": "a.example.com"}]
+        await service.handle_domain_name("example.com", progress)
 
+        assert (progress.enriched, progress.failed) == (1, 1)
+        uow.domain_info.upsert.assert_awaited_once()
+        args, _ = uow.domain_info.upsert.await_args
+        assert args[0] == [{"domain_name": "a.example.com", "ip_address": "1.2.3.4"}]
+
+    async def test_rows_are_stored_in_batches(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        uow: AsyncMock,
+        crt_client: AsyncMock,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+        dns_resolver: AsyncMock,
+        domain_parser: DomainParser,
+    ) -> None:
+        service = DomainInfoService(
+            uow=uow,
+            writer=DbWriter(uow),
+            crt_sh_cl=crt_client,
+            ip_who_is_cl=ipwhois_client,
+            ip_info_cl=ipinfo_client,
+            dns_resolver=dns_resolver,
+            domain_parser=domain_parser,
+            scan_cfg=ScanSettings(UPSERT_BATCH_SIZE=2, MAX_CONCURRENT_DOMAINS=3),
+        )
+
+        async def fake_iter_target_domains(
+            domain: str,
+            dropped: Any = None,  # noqa: ARG001
+            ct_state: Any = None,  # noqa: ARG001
+        ) -> AsyncIterator[str]:
+            for i in range(5):
+                yield f"{i}.{domain}"
+
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": "1.2.3.4"}
+
+        async def fake_get_ips_info(ips: Any) -> dict[str, dict[str, Any]]:
+            return {ip: {} for ip in ips}
+
+        async def fake_upsert(rows: list[dict[str, Any]], batch_size: int) -> None:
+            assert len(rows) <= batch_size
+
+        monkeypatch.setattr(service, "iter_target_domains", fake_iter_target_domains)
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        monkeypatch.setattr(service, "get_ips_info", fake_get_ips_info)
+        uow.domain_info.upsert.side_effect = fake_upsert
+        progress = ScanProgress()
+
+        await service.handle_domain_name("example.com", progress)
+
+        stored = [
+            row["domain_name"]
+            for call in uow.domain_info.upsert.await_args_list
+            for row in call.args[0]
+        ]
+        assert sorted(stored) == [f"{i}.example.com" for i in range(5)]
+        assert uow.domain_info.upsert.await_count == 3
+        assert (progress.discovered, progress.enriched) == (5, 5)
 
-class TestAddDomain:
-    async def test_add_domain_delegates_to_handle(
+    async def test_discovery_is_held_back_while_resolution_lags(
         self,
         monkeypatch: pytest.MonkeyPatch,
         service: DomainInfoService,
+    ) -> None:
+        release = asyncio.Event()
+        yielded = 0
+
+        async def fake_iter_target_domains(
+            domain: str,
+            dropped: Any = None,  # noqa: ARG001
+            ct_state: Any = None,  # noqa: ARG001
+        ) -> AsyncIterator[str]:
+            nonlocal yielded
+            for i in range(5000):
+                yielded += 1
+                yield f"{i}.{domain}"
+
+        async def slow_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            await release.wait()
+            return data | {"ip_address": None}
+
+        monkeypatch.setattr(service, "iter_target_domains", fake_iter_target_domains)
+        monkeypatch.setattr(service, "resolve_domain", slow_resolve_domain)
+        progress = ScanProgress()
+        scan = asyncio.create_task(service.handle_domain_name("example.com", progress))
+        for _ in range(100):
+            await asyncio.sleep(0)
+
+        # One name per blocked worker, the full queue and the one waiting to be queued.
+        cfg = service.scan_cfg
+        assert yielded == cfg.MAX_CONCURRENT_DOMAINS + cfg.UPSERT_BATCH_SIZE + 1
+        release.set()
+        await scan
+        assert progress.discovered == 5000
+
+    async def test_batches_are_enriched_concurrently(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
         uow: AsyncMock,
+        crt_client: AsyncMock,
+        ipwhois_client: AsyncMock,
+        ipinfo_client: AsyncMock,
+        dns_resolver: AsyncMock,
+        domain_parser: DomainParser,
     ) -> None:
-        uow.domain_info.get_by_domain_name.return_value = None
+        service = DomainInfoService(
+            uow=uow,
+            writer=DbWriter(uow),
+            crt_sh_cl=crt_client,
+            ip_who_is_cl=ipwhois_client,
+            ip_info_cl=ipinfo_client,
+            dns_resolver=dns_resolver,
+            domain_parser=domain_parser,
+            scan_cfg=ScanSettings(UPSERT_BATCH_SIZE=1, MAX_CONCURRENT_BATCHES=2),
+        )
+        both_running = asyncio.Barrier(2)
+
+        async def fake_iter_target_domains(
+            domain: str,
+            dropped: Any = None,  # noqa: ARG001
+            ct_state: Any = None,  # noqa: ARG001
+        ) -> AsyncIterator[str]:
+            yield f"a.{domain}"
+            yield f"b.{domain}"
+
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": "1.2.3.4"}
+
+        async def fake_get_ips_info(ips: Any) -> dict[str, dict[str, Any]]:
+            # Only returns once the other batch is being enriched as well.
+            await asyncio.wait_for(both_running.wait(), 1)
+            return {ip: {} for ip in ips}
+
+        monkeypatch.setattr(service, "iter_target_domains", fake_iter_target_domains)
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        monkeypatch.setattr(service, "get_ips_info", fake_get_ips_info)
+        progress = ScanProgress()
+
+        await service.handle_domain_name("example.com", progress)
+
+        assert progress.enriched == 2
+        assert uow.domain_info.upsert.await_count == 2
+
+    async def test_discovery_error_is_raised(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        uow: AsyncMock,
+    ) -> None:
+        async def fake_iter_target_domains(
+            domain: str,
+            dropped: Any = None,  # noqa: ARG001
+            ct_state: Any = None,  # noqa: ARG001
+        ) -> AsyncIterator[str]:
+            yield domain
+            raise RuntimeError("crt.sh is down")
 
-        async def fake_handle(domain_name: str) -> list[DomainInfo]:
-            return [DomainInfo(domain_name=domain_name)]
+        monkeypatch.setattr(service, "iter_target_domains", fake_iter_target_domains)
 
-        monkeypatch.setattr(service, "handle_domain_name", fake_handle)
+        with pytest.raises(RuntimeError, match="crt.sh is down"):
+            await service.handle_domain_name("example.com")
+        uow.domain_info.upsert.assert_not_awaited()
 
-        result = await service.add_domain("example.com")
 
-        assert len(result) == 1
-        assert result[0].domain_name == "example.com"
+class TestSingleFlight:
+    async def test_concurrent_scans_of_a_root_run_once(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+    ) -> None:
+        calls = 0
+
+        async def fake_scan(
+            domain_name: str,  # noqa: ARG001
+            progress: ScanProgress,
+        ) -> None:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            progress.discovered = 4
+
+        monkeypatch.setattr(service, "_scan_domain_name", fake_scan)
+        first, second = ScanProgress(), ScanProgress()
+
+        await asyncio.gather(
+            service.handle_domain_name("example.com", first),
+            service.handle_domain_name("example.com", second),
+        )
+
+        assert calls == 1
+        assert first.discovered == second.discovered == 4
+        assert not service._scan_progress
+
+    async def test_joiner_keeps_the_scan_when_the_first_caller_leaves(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+    ) -> None:
+        release = asyncio.Event()
+
+        async def fake_scan(
+            domain_name: str,  # noqa: ARG001
+            progress: ScanProgress,
+        ) -> None:
+            progress.discovered = 3
+            await release.wait()
+
+        monkeypatch.setattr(service, "_scan_domain_name", fake_scan)
+        first = asyncio.create_task(service.handle_domain_name("example.com"))
+        await asyncio.sleep(0)
+        second_progress = ScanProgress()
+        second = asyncio.create_task(
+            service.handle_domain_name("example.com", second_progress)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        # A caller joining now still shares the counters of the running scan.
+        third_progress = ScanProgress()
+        third = asyncio.create_task(
+            service.handle_domain_name("example.com", third_progress)
+        )
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(second, third)
+
+        assert second_progress.discovered == third_progress.discovered == 3
+        assert not service._scan_progress
+
+    async def test_scan_is_cancelled_with_its_last_caller(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+    ) -> None:
+        started = asyncio.Event()
+        stopped = False
+
+        async def fake_scan(
+            domain_name: str,  # noqa: ARG001
+            progress: ScanProgress,  # noqa: ARG001
+        ) -> None:
+            nonlocal stopped
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped = True
+
+        monkeypatch.setattr(service, "_scan_domain_name", fake_scan)
+        task = asyncio.create_task(service.handle_domain_name("example.com"))
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert stopped
+        assert "example.com" not in service._scans
+
+    async def test_joined_crt_sh_read_updates_every_ct_state(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+    ) -> None:
+        crt_client.iter_certificates = certificates((5, "a.example.com"))
+        first = CtLogState("example.com", names=["b.example.com"], max_certificate_id=2)
+        second = CtLogState("example.com")
+
+        results = await asyncio.gather(
+            service.get_target_domains("example.com", first),
+            service.get_target_domains("example.com", second),
+        )
+
+        # The second caller joined the first one's read instead of its own.
+        expected = ["example.com", "b.example.com", "a.example.com"]
+        assert results[0] == results[1] == expected
+        assert second == first
+        assert (second.names, second.max_certificate_id) == (expected[1:], 5)
+
+    async def test_scan_and_refresh_of_a_root_share_one_crt_sh_read(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        release = asyncio.Event()
+        reads = 0
+
+        async def slow_certificates(
+            domain: str,  # noqa: ARG001
+            after_id: int = 0,  # noqa: ARG001
+        ) -> AsyncIterator[Certificate]:
+            nonlocal reads
+            reads += 1
+            yield Certificate(4, None, ["a.example.com"])
+            await release.wait()
+            yield Certificate(6, None, ["b.example.com"])
+
+        async def fake_resolve_domain(data: dict[str, Any]) -> dict[str, Any]:
+            return data | {"ip_address": None}
+
+        crt_client.iter_certificates = slow_certificates
+        monkeypatch.setattr(service, "resolve_domain", fake_resolve_domain)
+        progress = ScanProgress()
+        scan = asyncio.create_task(service.handle_domain_name("example.com", progress))
+        while progress.discovered < 2:
+            await asyncio.sleep(0)
+        refresh_state = CtLogState("example.com")
+        refresh = asyncio.create_task(
+            service.get_target_domains("example.com", refresh_state)
+        )
+        await asyncio.sleep(0)
+        release.set()
+        await scan
+
+        assert await refresh == ["example.com", "a.example.com", "b.example.com"]
+        assert reads == 1
+        assert progress.discovered == 3
+        assert refresh_state.max_certificate_id == 6
+        uow.ct_log_cache.upsert.assert_awaited_once()
+        assert not service._ct_feeds
+
+    async def test_crt_sh_read_is_cancelled_with_its_last_reader(
+        self,
+        service: DomainInfoService,
+        crt_client: AsyncMock,
+        uow: AsyncMock,
+    ) -> None:
+        started = asyncio.Event()
+        stopped = False
+
+        async def hanging(
+            domain: str,  # noqa: ARG001
+            after_id: int = 0,  # noqa: ARG001
+        ) -> AsyncIterator[Certificate]:
+            nonlocal stopped
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped = True
+            yield
+
+        crt_client.iter_certificates = hanging
+        task = asyncio.create_task(service.get_target_domains("example.com"))
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert stopped
+        assert "example.com" not in service._ct_reads
+        assert not service._ct_feeds
+        uow.ct_log_cache.upsert.assert_not_awaited()
+
+    async def test_concurrent_dns_settings_lookups_are_coalesced(
+        self,
+        service: DomainInfoService,
+        dns_resolver: AsyncMock,
+    ) -> None:
+        async def slow_resolve(name: str, rdtype: str) -> list[str]:  # noqa: ARG001
+            await asyncio.sleep(0.01)
+            return ["1.2.3.4"] if rdtype == "A" else []
+
+        dns_resolver.resolve.side_effect = slow_resolve
+
+        first, second = await asyncio.gather(
+            service.get_dns_settings("example.com"),
+            service.get_dns_settings("example.com"),
+        )
+
+        assert first == second == {"A": ["1.2.3.4"]}
+        assert dns_resolver.resolve.await_count == len(service.DNS_RECORD_TYPES)
+
+
+class TestEnsureDomainResolves:
+    async def test_resolving_domain_passes(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        dns_resolver.resolve.return_value = ["1.2.3.4"]
+
+        await service.ensure_domain_resolves("example.com")
+
+    async def test_unknown_domain_raises(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        dns_resolver.resolve.side_effect = dns.resolver.NXDOMAIN()
+
+        with pytest.raises(HTTPException) as exc:
+            await service.ensure_domain_resolves("not-exists.invalid")
+
+        assert exc.value.status_code == 400
+        assert exc.value.detail == "Domain name not found"
 
-        uow.domain_info.get_by_domain_name.assert_awaited_once_with("example.com")
+    async def test_slow_lookup_times_out(
+        self, service: DomainInfoService, dns_resolver: AsyncMock
+    ) -> None:
+        async def slow_resolve(name: str, rdtype: str) -> list[str]:  # noqa: ARG001
+            await asyncio.sleep(1)
+            return ["1.2.3.4"]
+
+        dns_resolver.resolve.side_effect = slow_resolve
+        service.scan_cfg = ScanSettings(VALIDATION_TIMEOUT=0.01)
+
+        with pytest.raises(HTTPException) as exc:
+            await service.ensure_domain_resolves("slow.example.com")
+
+        assert exc.value.detail == "Domain name lookup timed out"
 
 
 class TestGetDomainsInfo:
@@ -276,36 +944,35 @@ class TestGetDomainsInfo:
         result = await service.get_domains_info(limit=25, offset=0)
 
         assert result == (10, fake_domains)
-        uow.domain_info.get_domains_info.assert_awaited_once_with(limit=25, offset=0)
+        uow.domain_info.get_domains_info.assert_awaited_once_with(
+            limit=25, offset=0, cursor=None, filters=None, include_total=True
+        )
 
 
 class TestRefreshDomainsInfo:
     async def test_no_root_domains_returns_ok(
-        self, service: DomainInfoService, repo: AsyncMock
+        self, service: DomainInfoService, uow: AsyncMock
     ) -> None:
-        service.repo = repo
-        repo.get_root_domain_names.return_value = []
+        uow.domain_info.get_root_domain_names.return_value = []
         resp = await service.refresh_domains_info()
         assert resp == {"status": "ok"}
-        repo.get_domain_names.assert_not_called()
+        uow.ct_log_cache.get_many.assert_not_awaited()
 
     async def test_refresh_domains_all_exceptions(
         self,
         monkeypatch: pytest.MonkeyPatch,
         service: DomainInfoService,
-        repo: AsyncMock,
+        uow: AsyncMock,
     ) -> None:
-        service.repo = repo
-        repo.get_root_domain_names.return_value = ["example.com"]
-        repo.get_domain_names.return_value = [(1, "example.com")]
+        uow.domain_info.get_root_domain_names.return_value = ["example.com"]
 
-        async def fake_get_target(domain: str) -> list[str]:  # noqa: ARG001
+        async def fake_get_target(domain: str, ct_state: Any = None) -> list[str]:  # noqa: ARG001
             raise RuntimeError("boom")
 
         monkeypatch.setattr(service, "get_target_domains", fake_get_target)
         resp = await service.refresh_domains_info()
         assert resp == {"status": "ok"}
-        repo.update_domains_info.assert_not_called()
+        uow.domain_info.upsert.assert_not_awaited()
 
     async def test_refresh_domains_updates_when_valid_results(
         self,
@@ -314,19 +981,62 @@ class TestRefreshDomainsInfo:
         uow: AsyncMock,
     ) -> None:
         uow.domain_info.get_root_domain_names.return_value = ["example.com"]
-        uow.domain_info.get_domain_names.return_value = [(1, "example.com")]
 
-        async def fake_get_target(domain: str) -> list[str]:  # noqa: ARG001
+        async def fake_get_target(domain: str, ct_state: Any = None) -> list[str]:  # noqa: ARG001
             return ["example.com"]
 
-        async def fake_collect(data: dict[str, Any]) -> dict[str, Any]:
-            return {"domain_name": data["domain_name"], "id": 1}
+        async def fake_collect(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            return items
 
         monkeypatch.setattr(service, "get_target_domains", fake_get_target)
-        monkeypatch.setattr(service, "collect_domain_info", fake_collect)
+        monkeypatch.setattr(service, "collect_domains_info", fake_collect)
 
         resp = await service.refresh_domains_info()
 
         assert resp == {"status": "ok"}
 
-        uow.domain_info.update_domains_info.assert_awaited_once()
+        uow.domain_info.upsert.assert_awaited_once()
+        args, _ = uow.domain_info.upsert.await_args
+        assert args[0] == [{"domain_name": "example.com", "root_domain": "example.com"}]
+
+
+class TestRefreshStaleDomains:
+    async def test_refreshes_one_batch_and_returns_cursor(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        service: DomainInfoService,
+        uow: AsyncMock,
+    ) -> None:
+        uow.domain_info.get_stale_domain_names.return_value = [
+            (3, "a.example.com"),
+            (8, "b.example.com"),
+        ]
+
+        async def fake_collect(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            return items
+
+        monkeypatch.setattr(service, "collect_domains_info", fake_collect)
+
+        resp = await service.refresh_stale_domains(cursor=1, limit=2)
+
+        assert resp == {"status": "ok", "processed": 2, "next_cursor": 8}
+        kwargs = uow.domain_info.get_stale_domain_names.await_args.kwargs
+        assert kwargs["after_id"] == 1
+        assert kwargs["limit"] == 2
+        args, _ = uow.domain_info.upsert.await_args
+        assert [row["domain_name"] for row in args[0]] == [
+            "a.example.com",
+            "b.example.com",
+        ]
+
+    async def test_last_batch_has_no_cursor(
+        self,
+        service: DomainInfoService,
+        uow: AsyncMock,
+    ) -> None:
+        uow.domain_info.get_stale_domain_names.return_value = []
+
+        resp = await service.refresh_stale_domains()
+
+        assert resp == {"status": "ok", "processed": 0, "next_cursor": None}
+        uow.domain_info.upsert.assert_not_awaited()
@@ -0,0 +1,26 @@
+import pytest
+
+from app.core.enums import DomainTypes
+from app.core.settings import DomainParserSettings
+from app.infrastructure.domain_parser import DomainParser
+
+
+def test_uses_bundled_snapshot_without_network(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args: object, **kwargs: object) -> None:  # noqa: ARG001
+        raise AssertionError("the suffix list must not be fetched")
+
+    monkeypatch.setattr("requests.Session.request", fail)
+
+    parser = DomainParser(DomainParserSettings())
+
+    assert parser.domain_type("www.example.co.uk") == DomainTypes.SUBDOMAIN
+    assert parser.domain_type("example.co.uk") == DomainTypes.ROOT
+
+
+def test_parsing_is_memoized() -> None:
+    parser = DomainParser(DomainParserSettings(PARSE_CACHE_SIZE=8))
+
+    parser.domain_type("a.example.com")
+    parser.domain_type("a.example.com")
+
+    assert parser.parse.cache_info().hits >= 1
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import utcnow
+from app.db.repositories.ip_info import IpInfoRepository
+
+
+@pytest.fixture
+def repo(db_session: AsyncSession) -> IpInfoRepository:
+    return IpInfoRepository(session=db_session)
+
+
+async def test_upsert_inserts_and_updates(repo: IpInfoRepository) -> None:
+    await repo.upsert([{"ip_address": "1.1.1.1", "geo_city": "Old"}])
+    await repo.upsert(
+        [
+            {"ip_address": "1.1.1.1", "geo_city": "New"},
+            {"ip_address": "2.2.2.2", "geo_city": "Other"},
+        ]
+    )
+
+    rows = await repo.get_fresh(
+        ["1.1.1.1", "2.2.2.2"], since=utcnow() - timedelta(minutes=1)
+    )
+
+    assert {row.ip_address: row.geo_city for row in rows} == {
+        "1.1.1.1": "New",
+        "2.2.2.2": "Other",
+    }
+
+
+async def test_upsert_keeps_one_row_per_ip(repo: IpInfoRepository) -> None:
+    await repo.upsert(
+        [
+            {"ip_address": "1.1.1.1", "geo_city": "First"},
+            {"ip_address": "1.1.1.1", "geo_city": "Last"},
+        ]
+    )
+    await repo.upsert([{"ip_address": "1.1.1.1", "geo_city": "Again"}])
+
+    rows = await repo.get_fresh(["1.1.1.1"], since=utcnow() - timedelta(minutes=1))
+
+    assert [row.geo_city for row in rows] == ["Again"]
+
+
+async def test_get_fresh_skips_stale_rows(repo: IpInfoRepository) -> None:
+    await repo.upsert([{"ip_address": "1.1.1.1"}])
+
+    rows = await repo.get_fresh(["1.1.1.1"], since=utcnow() + timedelta(minutes=1))
+
+    assert rows == []
+
+
+async def test_get_fresh_with_no_ips(repo: IpInfoRepository) -> None:
+    assert await repo.get_fresh([], since=utcnow()) == []
@@ -0,0 +1,42 @@
+import pytest
+
+from app.infrastructure.json_stream import JsonArrayDecoder
+
+
+def test_elements_are_returned_as_soon_as_complete() -> None:
+    decoder = JsonArrayDecoder()
+
+    assert decoder.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert decoder.feed(': "x"}, 12') == [{"b": "x"}]
+    assert decoder.feed("3]") == [123]
+    decoder.close()
+
+
+def test_chunks_split_at_every_character() -> None:
+    payload = '[ {"name_value": "a.example.com\\nb.example.com"} , {"x": [1, 2]} ]'
+    decoder = JsonArrayDecoder()
+
+    items = [item for char in payload for item in decoder.feed(char)]
+    decoder.close()
+
+    assert items == [{"name_value": "a.example.com\nb.example.com"}, {"x": [1, 2]}]
+
+
+def test_empty_array() -> None:
+    decoder = JsonArrayDecoder()
+
+    assert decoder.feed("[]\n") == []
+    decoder.close()
+
+
+def test_non_array_payload_raises() -> None:
+    with pytest.raises(ValueError):
+        JsonArrayDecoder().feed('{"a": 1}')
+
+
+def test_truncated_payload_raises_on_close() -> None:
+    decoder = JsonArrayDecoder()
+    decoder.feed('[{"a": 1}, {"b": ')
+
+    with pytest.raises(ValueError):
+        decoder.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from app.infrastructure.rate_limit import TokenBucket, backoff_delay
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr("time.monotonic", clock.monotonic)
+    monkeypatch.setattr("asyncio.sleep", clock.sleep)
+    return clock
+
+
+async def test_burst_is_served_without_waiting(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert clock.sleeps == []
+
+
+async def test_waits_for_refill_when_empty(clock: FakeClock) -> None:
+    bucket = TokenBucket(rate=2, capacity=1)
+
+    await bucket.acquire()
+    await bucket.acquire()
+    await bucket.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert clock.now == 1.0
+
+
+def test_backoff_delay_is_capped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("random.uniform", lambda low, high: high)  # noqa: ARG005
+
+    assert backoff_delay(0, base=0.5, cap=10) == 0.5
+    assert backoff_delay(2, base=0.5, cap=10) == 2.0
+    assert backoff_delay(10, base=0.5, cap=10) == 10
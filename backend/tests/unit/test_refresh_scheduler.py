@@ -0,0 +1,74 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.application.refresh_scheduler import RefreshScheduler, shard_of
+from app.core.settings import ScanSettings
+
+ROOTS = [f"site{i}.com" for i in range(40)]
+
+
+@pytest.fixture
+def uow() -> AsyncMock:
+    uow = AsyncMock()
+    uow.__aenter__.return_value = uow
+    uow.__aexit__.return_value = None
+
+    uow.domain_info = AsyncMock()
+    uow.domain_info.get_root_domain_names.return_value = ROOTS
+    uow.scan_job = AsyncMock()
+    uow.scan_job.batch_exists.return_value = False
+    return uow
+
+
+@pytest.fixture
+def scan_jobs() -> AsyncMock:
+    scan_jobs = AsyncMock()
+    scan_jobs.enqueue_many.side_effect = lambda names, batch_id, slot: list(
+        range(len(names))
+    )
+    return scan_jobs
+
+
+@pytest.fixture
+def scheduler(uow: AsyncMock, scan_jobs: AsyncMock) -> RefreshScheduler:
+    return RefreshScheduler(
+        uow=uow,
+        scan_jobs=scan_jobs,
+        scan_cfg=ScanSettings(REFRESH_PERIOD=3600, REFRESH_SHARDS=4),
+    )
+
+
+def test_shard_of_is_stable_and_spread() -> None:
+    shards = [shard_of(name, 4) for name in ROOTS]
+
+    assert shards == [shard_of(name, 4) for name in ROOTS]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+async def test_every_root_is_queued_once_per_period(
+    scheduler: RefreshScheduler, scan_jobs: AsyncMock
+) -> None:
+    for slot in range(100, 104):
+        await scheduler.refresh_slot(slot)
+
+    queued = [
+        name for call in scan_jobs.enqueue_many.await_args_list for name in call.args[0]
+    ]
+    assert sorted(queued) == sorted(ROOTS)
+    first = scan_jobs.enqueue_many.await_args_list[0]
+    assert first.args[1] == "refresh-100"
+    assert first.kwargs["slot"] == 100
+
+
+async def test_slot_is_queued_only_once(
+    scheduler: RefreshScheduler, uow: AsyncMock, scan_jobs: AsyncMock
+) -> None:
+    uow.scan_job.batch_exists.return_value = True
+
+    assert await scheduler.refresh_slot(7) == 0
+    scan_jobs.enqueue_many.assert_not_awaited()
+
+
+def test_slot_length(scheduler: RefreshScheduler) -> None:
+    assert scheduler.slot_length == 900
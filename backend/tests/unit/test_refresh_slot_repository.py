@@ -0,0 +1,60 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.uow import SaSessionUnitOfWork
+from app.db.models.base import Base
+from app.db.models.refresh_slot import RefreshSlot
+from app.db.repositories.refresh_slot import RefreshSlotRepository
+
+
+@pytest.fixture
+def repo(db_session: AsyncSession) -> RefreshSlotRepository:
+    return RefreshSlotRepository(session=db_session)
+
+
+async def test_slot_is_claimed_once(repo: RefreshSlotRepository) -> None:
+    assert await repo.claim(7) is True
+    assert await repo.claim(7) is False
+    assert await repo.claim(8) is True
+
+
+async def test_delete_before(repo: RefreshSlotRepository) -> None:
+    for slot in (5, 6, 7):
+        await repo.claim(slot)
+
+    await repo.delete_before(7)
+
+    assert await repo.claim(6) is True
+    assert await repo.claim(7) is False
+
+
+async def test_concurrent_claims_of_a_slot(tmp_path: Path) -> None:
+    # Separate transactions need a database file or server, not :memory:.
+    url = os.environ.get("TEST_DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        url = f"sqlite+aiosqlite:///{tmp_path}/slots.sqlite3"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    uow = SaSessionUnitOfWork(async_sessionmaker(engine, expire_on_commit=False))
+
+    async def claim() -> bool:
+        async with uow:
+            claimed = await uow.refresh_slot.claim(42)
+            # Hold the transaction open while the other claim runs.
+            await asyncio.sleep(0.05)
+            return claimed
+
+    try:
+        results = await asyncio.gather(*(claim() for _ in range(4)))
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(RefreshSlot))
+        await engine.dispose()
+
+    assert sorted(results) == [False, False, False, True]
@@ -1,13 +1,14 @@
 from typing import Any
 
-import httpx
 import pytest
 from fastapi import HTTPException
 from httpx import AsyncClient
 
 from app.application.domain_info import DomainInfoService
-from app.core.enums import DomainTypes
+from app.application.scan_jobs import ScanJobService
+from app.core.enums import DomainTypes, ScanJobStatus
 from app.db.models.domain_info import DomainInfo
+from app.db.models.scan_job import ScanJob
 
 
 def make_domain(**overrides: Any) -> DomainInfo:
@@ -38,6 +39,7 @@ class TestGetDomainsInfoRoute:
             *,
             limit: int,
             offset: int,
+            **kwargs: Any,
         ) -> tuple[int, list[DomainInfo]]:
             return 1, [domain]
 
@@ -52,68 +54,113 @@ class TestGetDomainsInfoRoute:
         assert data["total"] == 1
         assert len(data["items"]) == 1
         assert data["items"][0]["domain_name"] == "example.com"
+        assert data["next_cursor"] is None
 
+    async def test_passes_cursor_and_filters(
+        self,
+        api_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        calls: list[dict[str, Any]] = []
+
+        async def fake_get_domains_info(
+            self: DomainInfoService, **kwargs: Any
+        ) -> tuple[None, list[DomainInfo]]:
+            calls.append(kwargs)
+            return None, [make_domain(domain_name="b.example.com")]
+
+        monkeypatch.setattr(
+            DomainInfoService, "get_domains_info", fake_get_domains_info
+        )
 
-class TestAddDomainRoute:
-    async def test_add_domain_success(
+        resp = await api_client.get(
+            "/api/domain-info/?limit=1&cursor=a.example.com&include_total=false"
+            "&root_domain=example.com&is_active=true"
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["total"] is None
+        assert resp.json()["next_cursor"] == "b.example.com"
+        assert calls[0]["cursor"] == "a.example.com"
+        assert calls[0]["include_total"] is False
+        assert calls[0]["filters"] == {"root_domain": "example.com", "is_active": True}
+
+
+class TestRefreshDomainsInfoRoute:
+    async def test_refresh_domains_info_ok(
         self,
         api_client: AsyncClient,
         monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        domain = make_domain()
+        async def fake_refresh(self: DomainInfoService) -> dict[str, str]:
+            return {"status": "ok"}
 
-        async def fake_add_domain(
-            self: DomainInfoService, domain_name: str
-        ) -> list[DomainInfo]:
-            return [domain]
+        monkeypatch.setattr(DomainInfoService, "refresh_domains_info", fake_refresh)
+
+        resp = await api_client.post("/api/domain-info/refresh")
 
-        monkeypatch.setattr(DomainInfoService, "add_domain", fake_add_domain)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data == {"status": "ok"}
+
+    async def test_refresh_incremental_passes_cursor(
+        self,
+        api_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def fake_refresh_stale(
+            self: DomainInfoService, cursor: int | None, limit: int | None
+        ) -> dict[str, Any]:
+            return {"status": "ok", "processed": limit, "next_cursor": cursor + 10}
+
+        monkeypatch.setattr(
+            DomainInfoService, "refresh_stale_domains", fake_refresh_stale
+        )
 
         resp = await api_client.post(
-            "/api/domain-info/",
-            json={"domain_name": "example.com"},
+            "/api/domain-info/refresh?mode=incremental&cursor=5&limit=10"
         )
 
         assert resp.status_code == 200
-        data = resp.json()
-        assert isinstance(data, list)
-        assert data[0]["domain_name"] == "example.com"
+        assert resp.json() == {"status": "ok", "processed": 10, "next_cursor": 15}
 
-    async def test_add_domain_rethrows_http_exception(
+
+class TestScanJobRoutes:
+    async def test_add_domain_queues_scan(
         self,
         api_client: AsyncClient,
         monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        async def fake_add_domain(
-            self: DomainInfoService, domain_name: str
-        ) -> list[DomainInfo]:
-            raise HTTPException(status_code=400, detail="boom")
+        async def fake_enqueue(self: ScanJobService, domain_name: str) -> ScanJob:
+            return ScanJob(
+                id=7,
+                domain_name=domain_name,
+                status=ScanJobStatus.PENDING,
+                discovered=0,
+                enriched=0,
+                failed=0,
+            )
 
-        monkeypatch.setattr(DomainInfoService, "add_domain", fake_add_domain)
+        monkeypatch.setattr(ScanJobService, "enqueue", fake_enqueue)
 
         resp = await api_client.post(
             "/api/domain-info/",
             json={"domain_name": "example.com"},
         )
 
-        assert resp.status_code == 400
-        body = resp.json()
-        assert body["detail"] == "boom"
+        assert resp.status_code == 202
+        assert resp.json()["id"] == 7
+        assert resp.json()["status"] == "pending"
 
-    async def test_add_domain_wraps_httpx_status_error(
+    async def test_add_domain_rejects_invalid_domain(
         self,
         api_client: AsyncClient,
         monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        response = httpx.Response(400, json={"detail": "external error"})
-        request = httpx.Request("GET", "http://test")
+        async def fake_enqueue(self: ScanJobService, domain_name: str) -> ScanJob:
+            raise HTTPException(status_code=400, detail="Domain name already exists")
 
-        async def fake_add_domain(
-            self: DomainInfoService, domain_name: str
-        ) -> list[DomainInfo]:
-            raise httpx.HTTPStatusError("bad", request=request, response=response)
-
-        monkeypatch.setattr(DomainInfoService, "add_domain", fake_add_domain)
+        monkeypatch.setattr(ScanJobService, "enqueue", fake_enqueue)
 
         resp = await api_client.post(
             "/api/domain-info/",
@@ -121,23 +168,102 @@ class TestAddDomainRoute:
         )
 
         assert resp.status_code == 400
-        body = resp.json()
-        assert body["detail"] == {"detail": "external error"}
-
+        assert resp.json()["detail"] == "Domain name already exists"
 
-class TestRefreshDomainsInfoRoute:
-    async def test_refresh_domains_info_ok(
+    async def test_get_scan_job(
         self,
         api_client: AsyncClient,
         monkeypatch: pytest.MonkeyPatch,
     ) -> None:
-        async def fake_refresh(self: DomainInfoService) -> dict[str, str]:
-            return {"status": "ok"}
+        async def fake_get_job(self: ScanJobService, job_id: int) -> ScanJob:
+            return ScanJob(
+                id=job_id,
+                domain_name="example.com",
+                status=ScanJobStatus.RUNNING,
+                discovered=10,
+                enriched=4,
+                failed=1,
+            )
 
-        monkeypatch.setattr(DomainInfoService, "refresh_domains_info", fake_refresh)
+        monkeypatch.setattr(ScanJobService, "get_job", fake_get_job)
 
-        resp = await api_client.post("/api/domain-info/refresh")
+        resp = await api_client.get("/api/domain-info/jobs/3")
 
         assert resp.status_code == 200
         data = resp.json()
-        assert data == {"status": "ok"}
+        assert data["status"] == "running"
+        assert (data["discovered"], data["enriched"], data["failed"]) == (10, 4, 1)
+
+    async def test_get_missing_scan_job_returns_404(
+        self,
+        api_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def fake_get_job(self: ScanJobService, job_id: int) -> None:
+            return None
+
+        monkeypatch.setattr(ScanJobService, "get_job", fake_get_job)
+
+        resp = await api_client.get("/api/domain-info/jobs/3")
+
+        assert resp.status_code == 404
+
+
+class TestImportRoutes:
+    async def test_import_reads_lines_from_body(
+        self,
+        api_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        received: list[str] = []
+
+        async def fake_import(self: ScanJobService, lines: list[str]) -> dict[str, Any]:
+            received.extend(lines)
+            return {
+                "batch_id": "abc",
+                "queued": 2,
+                "existing": 0,
+                "already_queued": 0,
+                "invalid": 0,
+                "duplicate": 0,
+            }
+
+        monkeypatch.setattr(ScanJobService, "import_domains", fake_import)
+
+        resp = await api_client.post(
+            "/api/domain-info/import",
+            content="domain\r\na.com\r\nb.com\r\n",
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert resp.status_code == 202
+        assert resp.json()["batch_id"] == "abc"
+        assert received == ["domain", "a.com", "b.com"]
+
+    async def test_get_import_summary(
+        self,
+        api_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        async def fake_get_batch(
+            self: ScanJobService, batch_id: str
+        ) -> dict[str, Any] | None:
+            if batch_id != "abc":
+                return None
+            return {
+                "batch_id": batch_id,
+                "total": 2,
+                "jobs": {"done": 1, "running": 1},
+                "discovered": 9,
+                "enriched": 7,
+                "failed": 1,
+            }
+
+        monkeypatch.setattr(ScanJobService, "get_batch", fake_get_batch)
+
+        resp = await api_client.get("/api/domain-info/imports/abc")
+        missing = await api_client.get("/api/domain-info/imports/nope")
+
+        assert resp.status_code == 200
+        assert resp.json()["jobs"] == {"done": 1, "running": 1}
+        assert missing.status_code == 404
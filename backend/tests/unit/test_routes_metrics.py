@@ -0,0 +1,23 @@
+from httpx import AsyncClient
+
+
+class TestMetricsRoute:
+    async def test_exposes_prometheus_text(self, api_client: AsyncClient) -> None:
+        resp = await api_client.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE scan_stage_duration_seconds histogram" in resp.text
+
+    async def test_request_latency_uses_route_template(
+        self, api_client: AsyncClient
+    ) -> None:
+        await api_client.get("/api/domain-info/jobs/not-a-number")
+
+        resp = await api_client.get("/metrics")
+
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/api/domain-info/jobs/{job_id}",status="422"}'
+        ) in resp.text
+        assert "not-a-number" not in resp.text
@@ -6,3 +6,10 @@ class TestHealthCheckRoute:
         resp = await api_client.get("/api/utils/health-check/")
         assert resp.status_code == 200
         assert resp.json() is True
+
+
+class TestDnsCacheStatsRoute:
+    async def test_dns_cache_stats(self, api_client: AsyncClient) -> None:
+        resp = await api_client.get("/api/utils/dns-cache/")
+        assert resp.status_code == 200
+        assert set(resp.json()) == {"size", "max_size", "hits", "misses", "hit_ratio"}
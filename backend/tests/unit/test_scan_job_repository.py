@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import ScanJobStatus
+from app.db.repositories.scan_job import ScanJobRepository
+
+
+@pytest.fixture
+def repo(db_session: AsyncSession) -> ScanJobRepository:
+    return ScanJobRepository(session=db_session)
+
+
+async def test_create_job(repo: ScanJobRepository) -> None:
+    job = await repo.create("example.com")
+
+    assert job.id is not None
+    assert job.status == ScanJobStatus.PENDING
+
+
+async def test_update_job(repo: ScanJobRepository) -> None:
+    job = await repo.create("example.com")
+
+    await repo.update_job(job.id, status=ScanJobStatus.DONE, discovered=3, enriched=2)
+    await repo._session.refresh(job)
+
+    assert job.status == ScanJobStatus.DONE
+    assert (job.discovered, job.enriched, job.failed) == (3, 2, 0)
+
+
+async def test_claim_next_takes_oldest_pending_job(repo: ScanJobRepository) -> None:
+    first = await repo.create("a.com")
+    second = await repo.create("b.com")
+
+    claimed = await repo.claim_next("worker-1", lease_timeout=30)
+    again = await repo.claim_next("worker-2", lease_timeout=30)
+
+    assert claimed is not None and claimed.id == first.id
+    assert claimed.status == ScanJobStatus.RUNNING
+    assert claimed.locked_by == "worker-1"
+    assert claimed.started_at is not None
+    assert again is not None and again.id == second.id
+    assert await repo.claim_next("worker-3", lease_timeout=30) is None
+
+
+async def test_claim_next_reclaims_expired_lease(repo: ScanJobRepository) -> None:
+    job = await repo.create("a.com")
+    await repo.claim_next("worker-1", lease_timeout=-1)
+
+    claimed = await repo.claim_next("worker-2", lease_timeout=30)
+
+    assert claimed is not None and claimed.id == job.id
+    assert claimed.locked_by == "worker-2"
+    assert not await repo.update_job(job.id, owner="worker-1", discovered=1)
+    assert await repo.update_job(job.id, owner="worker-2", discovered=1)
+
+
+async def test_create_many_keeps_input_order(repo: ScanJobRepository) -> None:
+    ids = await repo.create_many(["b.com", "a.com"], batch_id="batch")
+
+    jobs = [await repo.get(job_id) for job_id in ids]
+    assert [job.domain_name for job in jobs if job] == ["b.com", "a.com"]
+    assert all(job and job.batch_id == "batch" for job in jobs)
+
+
+async def test_get_batch_summary(repo: ScanJobRepository) -> None:
+    first, second, _ = await repo.create_many(
+        ["a.com", "b.com", "c.com"], batch_id="batch"
+    )
+    await repo.create("other.com")
+    await repo.update_job(first, status=ScanJobStatus.DONE, discovered=4, enriched=3)
+    await repo.update_job(second, status=ScanJobStatus.RUNNING, discovered=2)
+
+    summary = await repo.get_batch_summary("batch")
+
+    assert summary == {
+        "batch_id": "batch",
+        "total": 3,
+        "jobs": {"done": 1, "running": 1, "pending": 1},
+        "discovered": 6,
+        "enriched": 3,
+        "failed": 0,
+    }
+    assert await repo.get_batch_summary("missing") is None
+
+
+async def test_get_unfinished_domain_names(repo: ScanJobRepository) -> None:
+    pending = await repo.create("a.com")
+    done = await repo.create("b.com")
+    await repo.update_job(done.id, status=ScanJobStatus.DONE)
+
+    busy = await repo.get_unfinished_domain_names(["a.com", "b.com", "c.com"])
+
+    assert busy == {pending.domain_name}
+    assert await repo.batch_exists("missing") is False
+
+
+async def test_get_unfinished(repo: ScanJobRepository) -> None:
+    done = await repo.create("a.com")
+    await repo.update_job(done.id, status=ScanJobStatus.DONE)
+    pending = await repo.create("a.com")
+
+    assert await repo.get_unfinished("a.com") is pending
+    assert await repo.get_unfinished("b.com") is None
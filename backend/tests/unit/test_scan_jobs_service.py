@@ -0,0 +1,299 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.application.domain_info import ScanProgress
+from app.application.scan_jobs import ScanJobService
+from app.core.enums import ScanJobStatus
+from app.core.settings import ScanSettings
+from app.db.models.scan_job import ScanJob
+
+
+def make_uow() -> AsyncMock:
+    uow = AsyncMock()
+    uow.__aenter__.return_value = uow
+    uow.__aexit__.return_value = None
+
+    uow.scan_job = AsyncMock()
+    uow.scan_job.claim_next.return_value = None
+    uow.scan_job.get_unfinished.return_value = None
+    uow.scan_job.get_unfinished_domain_names.return_value = set()
+
+    uow.domain_info = AsyncMock()
+    uow.domain_info.get_existing_names.return_value = set()
+    return uow
+
+
+@pytest.fixture
+def uow() -> AsyncMock:
+    return make_uow()
+
+
+@pytest.fixture
+def reporter_uow() -> AsyncMock:
+    return make_uow()
+
+
+@pytest.fixture
+def domain_info_service() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture
+def service(
+    monkeypatch: pytest.MonkeyPatch,
+    uow: AsyncMock,
+    reporter_uow: AsyncMock,
+    domain_info_service: AsyncMock,
+) -> ScanJobService:
+    service = ScanJobService(
+        uow=uow,
+        domain_info_service=domain_info_service,
+        scan_cfg=ScanSettings(JOB_WORKERS=1, JOB_PROGRESS_INTERVAL=0.01),
+    )
+    monkeypatch.setattr(service, "_new_uow", lambda: reporter_uow)
+    return service
+
+
+JOB = ScanJob(id=1, domain_name="example.com")
+
+
+class TestRunJob:
+    async def test_successful_job_is_marked_done(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        async def fake_handle(domain_name: str, progress: ScanProgress) -> list[str]:
+            progress.discovered = 3
+            progress.enriched = 2
+            progress.failed = 1
+            return [domain_name]
+
+        domain_info_service.handle_domain_name.side_effect = fake_handle
+
+        await service.run_job(JOB, "worker-1")
+
+        last = uow.scan_job.update_job.await_args_list[-1]
+        assert last.kwargs["owner"] == "worker-1"
+        assert last.kwargs["status"] == ScanJobStatus.DONE
+        assert last.kwargs["error"] is None
+        assert last.kwargs["locked_by"] is None
+        assert (
+            last.kwargs["discovered"],
+            last.kwargs["enriched"],
+            last.kwargs["failed"],
+        ) == (3, 2, 1)
+
+    async def test_failed_job_records_error(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        domain_info_service.handle_domain_name.side_effect = RuntimeError("crt.sh down")
+
+        await service.run_job(JOB, "worker-1")
+
+        last = uow.scan_job.update_job.await_args_list[-1]
+        assert last.kwargs["status"] == ScanJobStatus.FAILED
+        assert "crt.sh down" in last.kwargs["error"]
+
+    async def test_progress_reports_renew_the_lease(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        reporter_uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        async def slow_handle(domain_name: str, progress: ScanProgress) -> list[str]:
+            progress.discovered = 5
+            await asyncio.sleep(0.05)
+            return [domain_name]
+
+        domain_info_service.handle_domain_name.side_effect = slow_handle
+
+        await service.run_job(JOB, "worker-1")
+
+        reports = [
+            call.kwargs for call in reporter_uow.scan_job.update_job.await_args_list
+        ]
+        # The reporter never shares the scan's unit of work.
+        assert all(
+            "status" in call.kwargs for call in uow.scan_job.update_job.await_args_list
+        )
+        assert reports
+        assert reports[0]["discovered"] == 5
+        assert reports[0]["owner"] == "worker-1"
+        assert reports[0]["lease_expires_at"] is not None
+
+    async def test_cancelled_job_is_handed_back(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        domain_info_service.handle_domain_name.side_effect = asyncio.CancelledError
+
+        with pytest.raises(asyncio.CancelledError):
+            await service.run_job(JOB, "worker-1")
+
+        last = uow.scan_job.update_job.await_args_list[-1]
+        assert last.kwargs["status"] == ScanJobStatus.PENDING
+        assert last.kwargs["locked_by"] is None
+
+
+class TestQueue:
+    async def test_enqueue_checks_duplicates_and_wakes_a_worker(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        queued: list[ScanJob] = []
+
+        async def claim_next(worker_id: str, lease_timeout: float) -> ScanJob | None:
+            return queued.pop() if queued else None
+
+        async def create(domain_name: str) -> ScanJob:
+            queued.append(JOB)
+            return JOB
+
+        uow.scan_job.claim_next.side_effect = claim_next
+        uow.scan_job.create.side_effect = create
+        # Without the wake-up the worker would sleep for a minute.
+        service.scan_cfg.JOB_POLL_INTERVAL = 60
+
+        await service.start()
+        await asyncio.sleep(0.01)
+        job = await service.enqueue("example.com")
+        await asyncio.sleep(0.01)
+        await service.stop()
+
+        assert job.id == 1
+        domain_info_service.validate_new_domain.assert_awaited_once_with("example.com")
+        domain_info_service.handle_domain_name.assert_awaited_once()
+
+    async def test_enqueue_returns_the_unfinished_job(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        uow.scan_job.get_unfinished.return_value = JOB
+
+        job = await service.enqueue("example.com")
+
+        assert job is JOB
+        uow.scan_job.get_unfinished.assert_awaited_once_with("example.com")
+        uow.scan_job.create.assert_not_awaited()
+        domain_info_service.validate_new_domain.assert_not_awaited()
+
+    async def test_workers_poll_the_shared_queue(
+        self,
+        service: ScanJobService,
+        uow: AsyncMock,
+        domain_info_service: AsyncMock,
+    ) -> None:
+        results = [JOB, None]
+
+        async def claim_next(worker_id: str, lease_timeout: float) -> ScanJob | None:
+            return results.pop() if results else None
+
+        uow.scan_job.claim_next.side_effect = claim_next
+        service.scan_cfg.JOB_POLL_INTERVAL = 0.01
+
+        await service.start()
+        await asyncio.sleep(0.05)
+        await service.stop()
+
+        worker_id = uow.scan_job.claim_next.await_args.args[0]
+        assert worker_id.startswith(service.worker_id)
+        domain_info_service.handle_domain_name.assert_awaited_once()
+
+
+class TestImportDomains:
+    async def test_new_names_are_queued_as_one_batch(
+        self, service: ScanJobService, uow: AsyncMock
+    ) -> None:
+        uow.domain_info.get_existing_names.return_value = {"old.com"}
+        uow.scan_job.get_unfinished_domain_names.return_value = {"busy.net"}
+        uow.scan_job.create_many.return_value = [11, 12]
+
+        result = await service.import_domains(
+            [
+                "domain",
+                "New.com",
+                "old.com",
+                "new.com",
+                "busy.net",
+                "b.org",
+                "not a domain",
+            ]
+        )
+
+        uow.domain_info.get_existing_names.assert_awaited_once_with(
+            ["new.com", "old.com", "busy.net", "b.org"]
+        )
+        uow.scan_job.get_unfinished_domain_names.assert_awaited_once_with(
+            ["new.com", "busy.net", "b.org"]
+        )
+        names, batch_id = uow.scan_job.create_many.await_args.args
+        assert names == ["new.com", "b.org"]
+        assert result == {
+            "batch_id": batch_id,
+            "queued": 2,
+            "existing": 1,
+            "already_queued": 1,
+            "invalid": 1,
+            "duplicate": 1,
+        }
+        assert service._wakeup.is_set()
+
+    async def test_too_many_names_are_rejected(
+        self, uow: AsyncMock, domain_info_service: AsyncMock
+    ) -> None:
+        service = ScanJobService(
+            uow=uow,
+            domain_info_service=domain_info_service,
+            scan_cfg=ScanSettings(IMPORT_MAX_DOMAINS=1),
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.import_domains(["a.com", "b.com"])
+
+        assert exc_info.value.status_code == 400
+        uow.scan_job.create_many.assert_not_awaited()
+
+
+async def test_enqueue_many_skips_names_with_unfinished_jobs(
+    service: ScanJobService, uow: AsyncMock
+) -> None:
+    uow.scan_job.get_unfinished_domain_names.return_value = {"a.com"}
+    uow.scan_job.create_many.return_value = [5]
+
+    job_ids = await service.enqueue_many(["a.com", "b.com"], "refresh-1")
+
+    assert job_ids == [5]
+    uow.scan_job.create_many.assert_awaited_once_with(["b.com"], "refresh-1")
+    assert service._wakeup.is_set()
+
+
+async def test_enqueue_many_claims_the_refresh_slot(
+    service: ScanJobService, uow: AsyncMock
+) -> None:
+    uow.refresh_slot = AsyncMock()
+    uow.refresh_slot.claim.side_effect = [True, False]
+    uow.scan_job.get_unfinished_domain_names.return_value = set()
+    uow.scan_job.create_many.return_value = [5]
+
+    assert await service.enqueue_many(["a.com"], "refresh-1", slot=100) == [5]
+    assert await service.enqueue_many(["a.com"], "refresh-1", slot=100) == []
+    uow.scan_job.create_many.assert_awaited_once()
+    # Markers more than one period (REFRESH_SHARDS slots) old are pruned.
+    uow.refresh_slot.delete_before.assert_awaited_once_with(
+        100 - service.scan_cfg.REFRESH_SHARDS
+    )
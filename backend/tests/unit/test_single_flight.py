@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert "key" not in flights
+
+
+async def test_different_keys_run_separately() -> None:
+    flights: SingleFlight[str, str] = SingleFlight()
+
+    async def echo(value: str) -> str:
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        flights.do("a", lambda: echo("a")), flights.do("b", lambda: echo("b"))
+    )
+
+    assert results == ["a", "b"]
+
+
+async def test_exception_is_shared_and_not_cached() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+
+    async def fail() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 1
+
+    with pytest.raises(RuntimeError):
+        await flights.do("key", fail)
+    assert calls == 2
+
+
+async def test_cancelled_awaiter_does_not_cancel_the_call() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+
+    async def slow() -> int:
+        await asyncio.sleep(0.02)
+        return 1
+
+    first = asyncio.create_task(flights.do("key", slow))
+    second = asyncio.create_task(flights.do("key", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_call_is_cancelled_with_its_last_awaiter() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    started = asyncio.Event()
+    stopped = False
+
+    async def slow() -> int:
+        nonlocal stopped
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            stopped = True
+        return 1
+
+    first = asyncio.create_task(flights.do("key", slow))
+    second = asyncio.create_task(flights.do("key", slow))
+    await started.wait()
+    first.cancel()
+    second.cancel()
+
+    for task in (first, second):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    # The last awaiter returned only after the call had stopped.
+    assert stopped
+    assert "key" not in flights
+
+
+async def test_call_after_cancellation_starts_afresh() -> None:
+    flights: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+
+    async def slow() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    first = asyncio.create_task(flights.do("key", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert await flights.do("key", slow) == 2
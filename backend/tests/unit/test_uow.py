@@ -0,0 +1,93 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.uow import SaSessionUnitOfWork
+from app.db.models.base import Base
+from app.db.models.ct_log_cache import CtLogCache
+
+
+@pytest.fixture
+async def uow(tmp_path: Path) -> AsyncIterator[SaSessionUnitOfWork]:
+    # Concurrent transactions need a database file or server, not :memory:.
+    url = os.environ.get("TEST_DATABASE_URL", "")
+    connect_args: dict[str, object] = {}
+    if not url.startswith("postgresql"):
+        url = f"sqlite+aiosqlite:///{tmp_path}/uow.sqlite3"
+        connect_args = {"timeout": 30}
+    engine = create_async_engine(
+        url, connect_args=connect_args, pool_size=20, max_overflow=0
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield SaSessionUnitOfWork(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    async with engine.begin() as conn:
+        await conn.execute(delete(CtLogCache))
+    await engine.dispose()
+
+
+def make_row(root: str) -> dict[str, object]:
+    return {
+        "root_domain": root,
+        "names": [],
+        "max_certificate_id": 0,
+        "last_entry_timestamp": None,
+        "fetched_at": datetime(2024, 1, 1),
+    }
+
+
+async def test_concurrent_blocks_keep_their_own_transaction(
+    uow: SaSessionUnitOfWork,
+) -> None:
+    class Rollback(Exception):
+        pass
+
+    sessions: set[int] = set()
+
+    async def request(i: int) -> None:
+        async with uow:
+            session = uow.session
+            sessions.add(id(session))
+            await uow.ct_log_cache.upsert([make_row(f"r{i}.test")])
+            # Other tasks enter and leave their blocks while this one waits.
+            await asyncio.sleep(0)
+            assert uow.session is session
+            assert uow.ct_log_cache._session is session
+            if i % 3 == 0:
+                raise Rollback
+
+    results = await asyncio.gather(
+        *(request(i) for i in range(300)), return_exceptions=True
+    )
+
+    assert all(r is None or isinstance(r, Rollback) for r in results)
+    assert len(sessions) == 300
+    async with uow:
+        roots = set(await uow.session.scalars(select(CtLogCache.root_domain)))
+        total = await uow.session.scalar(select(func.count()).select_from(CtLogCache))
+    assert roots == {f"r{i}.test" for i in range(300) if i % 3}
+    assert total == 200
+
+
+async def test_nested_block_restores_outer_session(uow: SaSessionUnitOfWork) -> None:
+    async with uow:
+        outer = uow.session
+        async with uow:
+            assert uow.session is not outer
+        assert uow.session is outer
+
+
+async def test_use_outside_block_raises(uow: SaSessionUnitOfWork) -> None:
+    async with uow:
+        pass
+
+    with pytest.raises(RuntimeError):
+        _ = uow.domain_info
@@ -1,4 +1,4 @@
-import type { DomainInfo, PaginatedDomainsResponse } from "@/types/domain"
+import type { PaginatedDomainsResponse, ScanJob } from "@/types/domain"
 
 interface ErrorResponse {
   detail?: string
@@ -17,6 +17,8 @@ function getApiUrl(): string {
 }
 
 const API_URL = getApiUrl()
+const SCAN_JOB_POLL_INTERVAL_MS = 2000
+
 export async function fetchDomains(page = 1, limit = 25): Promise<PaginatedDomainsResponse> {
   const offset = (page - 1) * limit
   const url = new URL(`${API_URL}/domain-info/`, location.origin)
@@ -50,7 +52,23 @@ export async function fetchDomains(page = 1, limit = 25): Promise<PaginatedDomai
   }
 }
 
-export async function addDomain(domain: string): Promise<DomainInfo> {
+export async function fetchScanJob(id: number): Promise<ScanJob> {
+  const res = await fetch(`${API_URL}/domain-info/jobs/${id}`)
+  if (!res.ok) {
+    let errorMessage = "Failed to load scan job"
+    try {
+      const err = (await res.json()) as ErrorResponse
+      errorMessage = err.detail ?? errorMessage
+    } catch {
+      errorMessage = res.statusText || errorMessage
+    }
+    throw new Error(errorMessage)
+  }
+  return (await res.json()) as ScanJob
+}
+
+// Queues a scan and resolves once the background job has finished.
+export async function addDomain(domain: string): Promise<ScanJob> {
   try {
     const res = await fetch(`${API_URL}/domain-info/`, {
       method: "POST",
@@ -72,7 +90,15 @@ export async function addDomain(domain: string): Promise<DomainInfo> {
       throw error
     }
 
-    return (await res.json()) as DomainInfo
+    let job = (await res.json()) as ScanJob
+    while (job.status === "pending" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, SCAN_JOB_POLL_INTERVAL_MS))
+      job = await fetchScanJob(job.id)
+    }
+    if (job.status === "failed") {
+      throw new Error(`Scan of ${job.domain_name} failed`)
+    }
+    return job
   } catch (error) {
     if (error instanceof Error) {
       throw error
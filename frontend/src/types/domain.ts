@@ -13,3 +13,15 @@ export interface PaginatedDomainsResponse {
   items: DomainInfo[]
   total: number
 }
+
+export type ScanJobStatus = "pending" | "running" | "done" | "failed"
+
+export interface ScanJob {
+  id: number
+  domain_name: string
+  status: ScanJobStatus
+  discovered: number
+  enriched: number
+  failed: number
+  error?: string | null
+}